@@ -0,0 +1,11 @@
+import asyncio
+from database_adapter import run_migrations, backfill_user_stats
+
+async def main():
+    """Foydalanuvchi statistikasini mavjud ma'lumotlardan qayta hisoblash"""
+    await run_migrations()
+    users_count = await backfill_user_stats()
+    print(f"Statistika qayta hisoblandi: {users_count} ta foydalanuvchi")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,274 @@
+import asyncio
+import logging
+import os
+import time
+from typing import Dict, List
+
+from aiogram import Bot
+from aiogram.exceptions import (
+    TelegramBadRequest, TelegramNetworkError, TelegramRetryAfter, TelegramServerError
+)
+
+from database_adapter import (
+    add_broadcast_recipients, create_broadcast_job, finish_broadcast_job,
+    get_broadcast_job, get_pending_broadcast_recipients, get_unfinished_broadcast_jobs,
+    iter_user_pages, log_action, mark_broadcast_seeded, save_broadcast_results
+)
+from rate_limit import TokenBucket
+from reachability import classify_send_error
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar. Telegram umumiy limiti ~30 xabar/soniya, shuning uchun biroz pastroq.
+# Har bir chatga bitta xabar boradi, chat limiti (1/soniya) faqat progress
+# xabarini tahrirlashga tegishli - u vaqt bo'yicha siyraklashtiriladi.
+BROADCAST_RATE = float(os.getenv("BROADCAST_RATE", "25"))
+BROADCAST_CONCURRENCY = int(os.getenv("BROADCAST_CONCURRENCY", "8"))
+BROADCAST_PROGRESS_INTERVAL = float(os.getenv("BROADCAST_PROGRESS_INTERVAL", "5"))
+BROADCAST_MAX_RETRIES = 3
+
+# Natijalarni bazaga yozish chastotasi
+FLUSH_EVERY = 100
+FLUSH_INTERVAL = 1.0
+PAGE_SIZE = 500
+
+
+def format_progress(job: Dict, finished: bool = False) -> str:
+    """Progress xabari matni"""
+    done = job['sent'] + job['blocked'] + job['failed']
+    if finished:
+        return (
+            f"📢 Ommaviy xabar yuborildi!\n\n"
+            f"✅ Muvaffaqiyatli: {job['sent']} ta\n"
+            f"🚫 Bloklaganlar: {job['blocked']} ta\n"
+            f"❌ Xatolik: {job['failed']} ta\n"
+            f"📊 Jami: {job['total']} ta foydalanuvchi"
+        )
+    return (
+        f"📢 Ommaviy xabar yuborilmoqda...\n\n"
+        f"📊 Jami foydalanuvchilar: {job['total']} ta\n"
+        f"✅ Yuborildi: {job['sent']} ta\n"
+        f"🚫 Bloklaganlar: {job['blocked']} ta\n"
+        f"❌ Xatolik: {job['failed']} ta\n"
+        f"⏳ Qoldi: {max(job['total'] - done, 0)} ta"
+    )
+
+
+class BroadcastEngine:
+    """Bir nechta parallel yuboruvchi, umumiy limit va bazadagi checkpoint bilan ommaviy xabar"""
+
+    def __init__(self, bot: Bot, rate: float = BROADCAST_RATE,
+                 concurrency: int = BROADCAST_CONCURRENCY,
+                 progress_interval: float = BROADCAST_PROGRESS_INTERVAL):
+        self.bot = bot
+        self.concurrency = concurrency
+        self.progress_interval = progress_interval
+        self.limiter = TokenBucket(rate)
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    async def start_job(self, admin_id: int, message, progress_message=None) -> int:
+        """Vazifani yaratib fonda ishga tushirish.
+
+        Qabul qiluvchilar users jadvalidan sahifalab o'qiladi va birinchi sahifa
+        yozilishi bilan yuborish boshlanadi. Bloklagan foydalanuvchilar o'tkazib yuboriladi.
+        """
+        job_id = await create_broadcast_job({
+            'admin_id': admin_id,
+            'from_chat_id': message.chat.id,
+            'message_id': message.message_id,
+            'mode': 'forward' if message.forward_origin else 'copy',
+            'progress_chat_id': progress_message.chat.id if progress_message else None,
+            'progress_message_id': progress_message.message_id if progress_message else None
+        })
+        self._launch(job_id)
+        return job_id
+
+    async def resume_unfinished(self) -> int:
+        """Qayta ishga tushganda to'xtab qolgan vazifalarni davom ettirish"""
+        jobs = await get_unfinished_broadcast_jobs()
+        for job in jobs:
+            logger.info(f"Ommaviy xabar #{job['id']} davom ettirilmoqda")
+            self._launch(job['id'])
+        return len(jobs)
+
+    def _launch(self, job_id: int):
+        task = self._tasks.get(job_id)
+        if task is None or task.done():
+            self._tasks[job_id] = asyncio.create_task(self._run(job_id))
+
+    async def stop(self):
+        """Ishlayotgan vazifalarni to'xtatish (holati 'running' qoladi va keyin davom etadi)"""
+        for task in self._tasks.values():
+            task.cancel()
+        for task in list(self._tasks.values()):
+            try:
+                await task
+            except (asyncio.CancelledError, Exception):
+                pass
+        self._tasks.clear()
+
+    async def _send(self, job: Dict, chat_id: int) -> tuple:
+        """Bitta foydalanuvchiga yuborish. (status, error) qaytaradi"""
+        for attempt in range(BROADCAST_MAX_RETRIES + 1):
+            await self.limiter.acquire()
+            try:
+                if job['mode'] == 'forward':
+                    await self.bot.forward_message(
+                        chat_id=chat_id,
+                        from_chat_id=job['from_chat_id'],
+                        message_id=job['message_id']
+                    )
+                else:
+                    await self.bot.copy_message(
+                        chat_id=chat_id,
+                        from_chat_id=job['from_chat_id'],
+                        message_id=job['message_id']
+                    )
+                return 'sent', None
+            except TelegramRetryAfter as e:
+                # Umumiy limitga yetdik - hamma yuboruvchilar to'xtaydi
+                self.limiter.pause(e.retry_after)
+                error = str(e)
+            except (TelegramNetworkError, TelegramServerError) as e:
+                await asyncio.sleep(2 ** attempt)
+                error = str(e)
+            except Exception as e:
+                if classify_send_error(e):
+                    return 'blocked', str(e)[:200]
+                if not isinstance(e, TelegramBadRequest):
+                    logger.error(f"Xabar yuborishda xatolik {chat_id}: {e}")
+                return 'failed', str(e)[:200]
+        return 'failed', error[:200]
+
+    async def _run(self, job_id: int):
+        job = await get_broadcast_job(job_id)
+        if not job:
+            return
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 4)
+        results: List[tuple] = []
+        # Hisoblagichlar qo'shib yoziladi - bir partiya ikki marta saqlanmasin
+        flush_lock = asyncio.Lock()
+        last_flush = time.monotonic()
+        last_progress = 0.0
+
+        async def flush() -> bool:
+            """Yig'ilgan natijalarni yozish. Xato bo'lsa partiya keyingi flush uchun qoladi"""
+            nonlocal last_flush
+            async with flush_lock:
+                last_flush = time.monotonic()
+                batch = results[:]
+                if not batch:
+                    return True
+                try:
+                    await save_broadcast_results(job_id, batch)
+                except Exception as e:
+                    logger.error(f"Ommaviy xabar #{job_id} natijalarini yozishda xatolik: {e}")
+                    return False
+                del results[:len(batch)]
+                return True
+
+        async def progress():
+            nonlocal last_progress
+            if not job['progress_message_id'] or time.monotonic() - last_progress < self.progress_interval:
+                return
+            last_progress = time.monotonic()
+            try:
+                await self.bot.edit_message_text(
+                    chat_id=job['progress_chat_id'],
+                    message_id=job['progress_message_id'],
+                    text=format_progress(job)
+                )
+            except Exception:
+                pass
+
+        async def worker():
+            while True:
+                user_id = await queue.get()
+                if user_id is None:
+                    return
+                if str(user_id).lstrip('-').isdigit():
+                    status, error = await self._send(job, int(user_id))
+                else:
+                    status, error = 'failed', "noto'g'ri user_id"
+                job[status] += 1
+                results.append((user_id, status, error))
+                if len(results) >= FLUSH_EVERY or time.monotonic() - last_flush >= FLUSH_INTERVAL:
+                    await flush()
+                await progress()
+
+        workers = [asyncio.create_task(worker()) for _ in range(self.concurrency)]
+
+        async def put(item):
+            """Navbatga qo'yish; yuboruvchi vaqtidan oldin to'xtasa kutib qolmaslik uchun xato"""
+            if not queue.full():
+                queue.put_nowait(item)
+                return
+            putter = asyncio.ensure_future(queue.put(item))
+            await asyncio.wait([putter, *workers], return_when=asyncio.FIRST_COMPLETED)
+            if not putter.done():
+                putter.cancel()
+                stopped = next(task for task in workers if task.done())
+                raise RuntimeError(f"yuboruvchi to'xtadi: {stopped.exception() if not stopped.cancelled() else 'bekor qilindi'}")
+
+        try:
+            # Oldingi ishga tushirishda yozilgan, lekin yuborilmaganlar
+            last_user_id = ''
+            while True:
+                page = await get_pending_broadcast_recipients(job_id, last_user_id, PAGE_SIZE)
+                if not page:
+                    break
+                for user_id in page:
+                    await put(user_id)
+                last_user_id = page[-1]
+
+            # Qolgan foydalanuvchilarni oqim bilan yozib, darhol navbatga qo'yish
+            if not job['seeded']:
+                async for users in iter_user_pages(PAGE_SIZE, reachable_only=True,
+                                                   after_rowid=job['seed_cursor'] or 0):
+                    added = await add_broadcast_recipients(
+                        job_id, [user['user_id'] for user in users], seed_cursor=users[-1]['rowid']
+                    )
+                    job['total'] += len(added)
+                    for user_id in added:
+                        await put(user_id)
+                await mark_broadcast_seeded(job_id)
+
+            for _ in workers:
+                await put(None)
+            await asyncio.gather(*workers)
+            if not await flush():
+                # Yozilmagan natijalar 'pending' qoladi - vazifa yakunlanmaydi, keyin davom ettiriladi
+                return
+        except asyncio.CancelledError:
+            for task in workers:
+                task.cancel()
+            await flush()
+            raise
+        except Exception as e:
+            logger.error(f"Ommaviy xabar #{job_id} xatolik bilan to'xtadi: {e}")
+            for task in workers:
+                task.cancel()
+            await flush()
+            return
+
+        await finish_broadcast_job(job_id)
+
+        if job['progress_message_id']:
+            try:
+                await self.bot.edit_message_text(
+                    chat_id=job['progress_chat_id'],
+                    message_id=job['progress_message_id'],
+                    text=format_progress(job, finished=True)
+                )
+            except Exception:
+                pass
+
+        await log_action(job['admin_id'], "admin_broadcast_sent", {
+            'job_id': job_id,
+            'success_count': job['sent'],
+            'blocked_count': job['blocked'],
+            'failed_count': job['failed'],
+            'total_users': job['total']
+        })
+        logger.info(f"Ommaviy xabar #{job_id} yakunlandi: {job['sent']}/{job['total']}")
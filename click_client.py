@@ -0,0 +1,152 @@
+import asyncio
+import hashlib
+import hmac
+import logging
+import os
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Click API konfiguratsiyasi
+CLICK_MERCHANT_ID = os.getenv("CLICK_MERCHANT_ID", "your_merchant_id")
+CLICK_SERVICE_ID = os.getenv("CLICK_SERVICE_ID", "your_service_id")
+CLICK_SECRET_KEY = os.getenv("CLICK_SECRET_KEY", "your_secret_key")
+CLICK_API_URL = os.getenv("CLICK_API_URL", "https://api.click.uz/v2/merchant")
+CLICK_TIMEOUT = float(os.getenv("CLICK_TIMEOUT", "10"))
+CLICK_RETRIES = int(os.getenv("CLICK_RETRIES", "2"))
+
+
+def generate_click_signature(data: str, secret_key: str = CLICK_SECRET_KEY) -> str:
+    """Click API uchun imzo yaratish"""
+    return hmac.new(
+        secret_key.encode('utf-8'),
+        data.encode('utf-8'),
+        hashlib.sha256
+    ).hexdigest()
+
+
+class ClickClient:
+    """Click API uchun async klient: bitta umumiy sessiya, timeout va cheklangan qayta urinishlar"""
+
+    def __init__(self, base_url: str = CLICK_API_URL, merchant_id: str = CLICK_MERCHANT_ID,
+                 service_id: str = CLICK_SERVICE_ID, secret_key: str = CLICK_SECRET_KEY,
+                 timeout: float = CLICK_TIMEOUT, retries: int = CLICK_RETRIES):
+        self.base_url = base_url.rstrip('/')
+        self.merchant_id = merchant_id
+        self.service_id = service_id
+        self.secret_key = secret_key
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.retries = retries
+        self._session: Optional[aiohttp.ClientSession] = None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        # Sessiya birinchi so'rovda (event loop ichida) yaratiladi va qayta ishlatiladi
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                timeout=self.timeout,
+                connector=aiohttp.TCPConnector(limit=20, ttl_dns_cache=300),
+                headers={"Content-Type": "application/json"}
+            )
+        return self._session
+
+    async def close(self):
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _sign(self, payload: Dict[str, Any], *fields: str) -> Dict[str, Any]:
+        """So'rovga imzo qo'shish (imzo berilgan maydonlar qiymatlaridan olinadi)"""
+        data_string = "".join(str(payload[field]) for field in fields)
+        payload["sign_time"] = int(datetime.now().timestamp())
+        payload["sign_string"] = generate_click_signature(data_string, self.secret_key)
+        return payload
+
+    async def _post(self, path: str, payload: Dict[str, Any], idempotent: bool) -> Dict[str, Any]:
+        """POST so'rov. Idempotent bo'lmagan so'rov faqat ulanib bo'lmaganda qayta yuboriladi"""
+        last_error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                await asyncio.sleep(0.5 * 2 ** (attempt - 1))
+            try:
+                async with self._get_session().post(f"{self.base_url}{path}", json=payload) as response:
+                    if response.status >= 500 and idempotent:
+                        last_error = f"API xatoligi: {response.status}"
+                        continue
+                    if response.status != 200:
+                        return {"success": False, "error": f"API xatoligi: {response.status}"}
+                    return {"success": True, "data": await response.json(content_type=None)}
+            except aiohttp.ClientConnectorError as e:
+                last_error = str(e)
+            except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                last_error = str(e) or type(e).__name__
+                if not idempotent:
+                    break
+            logger.warning(f"Click so'rovi muvaffaqiyatsiz ({path}, urinish {attempt + 1}): {last_error}")
+        return {"success": False, "error": last_error or "Noma'lum xatolik"}
+
+    async def create_payment(self, amount: int, user_id: int, order_id: str) -> dict:
+        """Click orqali to'lov yaratish"""
+        payload = self._sign({
+            "merchant_id": self.merchant_id,
+            "service_id": self.service_id,
+            "amount": amount,
+            "transaction_param": f"user_{user_id}_{order_id}",
+            "return_url": "https://t.me/preuz_bot",
+            "card_type": "UZCARD"
+        }, "merchant_id", "service_id", "amount", "transaction_param")
+
+        response = await self._post("/card/create", payload, idempotent=False)
+        if not response["success"]:
+            return {"success": False, "error": f"To'lov yaratishda xatolik: {response['error']}"}
+
+        result = response["data"]
+        if result.get("error_code") == 0:
+            return {
+                "success": True,
+                "payment_url": result.get("click_url"),
+                "payment_id": result.get("payment_id"),
+                "data": result
+            }
+        return {"success": False, "error": result.get("error_note", "Noma'lum xatolik")}
+
+    async def get_payment_status(self, payment_id: str) -> dict:
+        """Click to'lov holatini tekshirish"""
+        payload = self._sign({
+            "merchant_id": self.merchant_id,
+            "service_id": self.service_id,
+            "payment_id": payment_id
+        }, "merchant_id", "service_id", "payment_id")
+
+        response = await self._post("/card/status", payload, idempotent=True)
+        if not response["success"]:
+            return {"success": False, "error": f"To'lov holatini tekshirishda xatolik: {response['error']}"}
+
+        result = response["data"]
+        if result.get("error_code") == 0:
+            return {
+                "success": True,
+                "status": result.get("status"),
+                "amount": result.get("amount"),
+                "data": result
+            }
+        return {"success": False, "error": result.get("error_note", "Noma'lum xatolik")}
+
+
+# Bot bo'ylab umumiy klient
+click_client = ClickClient()
+
+
+async def create_click_payment(amount: int, user_id: int, order_id: str) -> dict:
+    """Click orqali to'lov yaratish"""
+    return await click_client.create_payment(amount, user_id, order_id)
+
+
+async def check_click_payment_status(payment_id: str) -> dict:
+    """Click to'lov holatini tekshirish"""
+    return await click_client.get_payment_status(payment_id)
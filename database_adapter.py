@@ -2,12 +2,16 @@ import sqlite3
 import asyncio
 import aiosqlite
 import os
-from datetime import datetime
-from typing import Dict, List, Optional, Any
+import json
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Any
 
 # Mavjud DataBase.db faylini ishlatish
 DATABASE_PATH = os.getenv("DATABASE_PATH", "DataBase.db")
 
+# Foydalanuvchilarni sahifalab o'qishda bitta sahifa hajmi
+USERS_PAGE_SIZE = int(os.getenv("USERS_PAGE_SIZE", "500"))
+
 async def get_user_by_tg_id(tg_id: int) -> Optional[Dict[str, Any]]:
     """Foydalanuvchini Telegram ID bo'yicha olish (mavjud database strukturasiga mos)"""
     
@@ -60,6 +64,49 @@ async def get_all_users() -> List[Dict[str, Any]]:
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
+async def iter_user_pages(page_size: int = USERS_PAGE_SIZE, reachable_only: bool = False,
+                          after_rowid: int = 0) -> AsyncIterator[List[Dict[str, Any]]]:
+    """Foydalanuvchilarni rowid bo'yicha sahifalab o'qish (xotira sahifa hajmida qoladi).
+    
+    Har bir qatorda `rowid` ham bor - uni `after_rowid` ga berib, to'xtagan joydan davom etish mumkin.
+    """
+    where = "rowid > ?"
+    if reachable_only:
+        where += " AND COALESCE(reach_status, 'unknown') NOT IN ('blocked', 'deactivated', 'not_found')"
+    
+    while True:
+        # Har sahifa uchun alohida ulanish - iterator uzoq to'xtab tursa ham bazani band qilmaydi
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                f"SELECT rowid, * FROM users WHERE {where} ORDER BY rowid LIMIT ?",
+                (after_rowid, page_size)
+            )
+            rows = await cursor.fetchall()
+        
+        if not rows:
+            return
+        page = [dict(row) for row in rows]
+        yield page
+        if len(rows) < page_size:
+            return
+        after_rowid = page[-1]['rowid']
+
+async def iter_users(page_size: int = USERS_PAGE_SIZE, reachable_only: bool = False) -> AsyncIterator[Dict[str, Any]]:
+    """Foydalanuvchilarni bittadan oqim sifatida olish"""
+    async for page in iter_user_pages(page_size, reachable_only):
+        for user in page:
+            yield user
+
+async def get_recent_users(limit: int = 5) -> List[Dict[str, Any]]:
+    """Oxirgi ro'yxatdan o'tgan foydalanuvchilar"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM users ORDER BY order_date DESC LIMIT ?", (limit,))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
 async def get_users_count() -> int:
     """Foydalanuvchilar sonini olish"""
     
@@ -81,6 +128,351 @@ async def search_users(query: str) -> List[Dict[str, Any]]:
         rows = await cursor.fetchall()
         return [dict(row) for row in rows]
 
+async def update_users_reachability(statuses: Dict[int, str]) -> int:
+    """Foydalanuvchilarning yetib borish holatini birdaniga yangilash"""
+    if not statuses:
+        return 0
+    
+    checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.executemany(
+            "UPDATE users SET reach_status = ?, reach_checked_at = ? WHERE user_id = ?",
+            [(status, checked_at, str(tg_id)) for tg_id, status in statuses.items()]
+        )
+        await db.commit()
+        return len(statuses)
+
+async def mark_users_reach_checked(tg_ids: List[int]) -> int:
+    """Hisobi mavjudligi tasdiqlangan foydalanuvchilar: tekshirish vaqti yangilanadi.
+    
+    Bloklash holati o'zgarmaydi (uni faqat haqiqiy yuborish natijasi biladi), eski
+    'deactivated'/'not_found' esa endi noto'g'ri - noma'lumga qaytariladi.
+    """
+    if not tg_ids:
+        return 0
+    
+    checked_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.executemany("""
+            UPDATE users SET
+                reach_checked_at = ?,
+                reach_status = CASE WHEN reach_status IN ('deactivated', 'not_found') THEN NULL ELSE reach_status END
+            WHERE user_id = ?
+        """, [(checked_at, str(tg_id)) for tg_id in tg_ids])
+        await db.commit()
+        return len(tg_ids)
+
+async def get_stale_users(limit: int, stale_days: int) -> List[int]:
+    """Holati hech tekshirilmagan yoki eskirgan foydalanuvchilar ID lari"""
+    cutoff = (datetime.now() - timedelta(days=stale_days)).strftime('%Y-%m-%d %H:%M:%S')
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("""
+            SELECT user_id FROM users
+            WHERE reach_checked_at IS NULL OR reach_checked_at < ?
+            ORDER BY reach_checked_at
+            LIMIT ?
+        """, (cutoff, limit))
+        rows = await cursor.fetchall()
+        return [int(row[0]) for row in rows if str(row[0]).lstrip('-').isdigit()]
+
+async def get_reachability_counts() -> Dict[str, int]:
+    """Yetib borish holatlari bo'yicha foydalanuvchilar soni"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("""
+            SELECT COALESCE(reach_status, 'unknown'), COUNT(*) FROM users GROUP BY 1
+        """)
+        rows = await cursor.fetchall()
+        return {row[0]: row[1] for row in rows}
+
+# Ommaviy xabar funksiyalari
+async def create_broadcast_job(job_data: Dict[str, Any]) -> int:
+    """Yangi ommaviy xabar vazifasini yaratish"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("""
+            INSERT INTO broadcast_jobs (
+                admin_id, from_chat_id, message_id, mode, progress_chat_id, progress_message_id
+            ) VALUES (?, ?, ?, ?, ?, ?)
+        """, (
+            job_data['admin_id'],
+            job_data['from_chat_id'],
+            job_data['message_id'],
+            job_data.get('mode', 'copy'),
+            job_data.get('progress_chat_id'),
+            job_data.get('progress_message_id')
+        ))
+        await db.commit()
+        return cursor.lastrowid
+
+async def add_broadcast_recipients(job_id: int, user_ids: List[Any], seed_cursor: Optional[int] = None) -> List[str]:
+    """Vazifaga qabul qiluvchilarni qo'shish. Faqat yangi qo'shilganlarni qaytaradi"""
+    added = []
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        for user_id in user_ids:
+            cursor = await db.execute(
+                "INSERT OR IGNORE INTO broadcast_recipients (job_id, user_id) VALUES (?, ?)",
+                (job_id, str(user_id))
+            )
+            if cursor.rowcount:
+                added.append(str(user_id))
+        await db.execute("""
+            UPDATE broadcast_jobs SET total = total + ?, seed_cursor = COALESCE(?, seed_cursor)
+            WHERE id = ?
+        """, (len(added), seed_cursor, job_id))
+        await db.commit()
+        return added
+
+async def mark_broadcast_seeded(job_id: int) -> None:
+    """Barcha qabul qiluvchilar yozib bo'linganini belgilash"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute("UPDATE broadcast_jobs SET seeded = 1 WHERE id = ?", (job_id,))
+        await db.commit()
+
+async def get_pending_broadcast_recipients(job_id: int, after_user_id: str = '', limit: int = 500) -> List[str]:
+    """Hali yuborilmagan qabul qiluvchilar (user_id bo'yicha sahifalab)"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("""
+            SELECT user_id FROM broadcast_recipients
+            WHERE job_id = ? AND user_id > ? AND status = 'pending'
+            ORDER BY user_id
+            LIMIT ?
+        """, (job_id, after_user_id, limit))
+        rows = await cursor.fetchall()
+        return [row[0] for row in rows]
+
+async def save_broadcast_results(job_id: int, results: List[tuple]) -> None:
+    """Qabul qiluvchilar holatini (user_id, status, error) va hisoblagichlarni yozish"""
+    if not results:
+        return
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.executemany(
+            "UPDATE broadcast_recipients SET status = ?, error = ? WHERE job_id = ? AND user_id = ?",
+            [(status, error, job_id, str(user_id)) for user_id, status, error in results]
+        )
+        await db.execute("""
+            UPDATE broadcast_jobs SET
+                sent = sent + ?,
+                blocked = blocked + ?,
+                failed = failed + ?
+            WHERE id = ?
+        """, (
+            sum(1 for r in results if r[1] == 'sent'),
+            sum(1 for r in results if r[1] == 'blocked'),
+            sum(1 for r in results if r[1] == 'failed'),
+            job_id
+        ))
+        await db.commit()
+
+async def get_broadcast_job(job_id: int) -> Optional[Dict[str, Any]]:
+    """Ommaviy xabar vazifasini olish"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM broadcast_jobs WHERE id = ?", (job_id,))
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+async def get_unfinished_broadcast_jobs() -> List[Dict[str, Any]]:
+    """To'xtab qolgan (jarayondagi) vazifalar"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM broadcast_jobs WHERE status = 'running' ORDER BY id")
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+async def finish_broadcast_job(job_id: int, status: str = 'done') -> None:
+    """Vazifani yakunlash"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            "UPDATE broadcast_jobs SET status = ?, finished_at = CURRENT_TIMESTAMP WHERE id = ?",
+            (status, job_id)
+        )
+        await db.commit()
+
+async def _column_exists(db, table: str, column: str) -> bool:
+    """Jadvalda ustun mavjudligini tekshirish"""
+    cursor = await db.execute(f"PRAGMA table_info({table})")
+    columns = await cursor.fetchall()
+    return any(col[1] == column for col in columns)
+
+async def run_migrations():
+    """Mavjud DataBase.db ga bot uchun kerakli jadval va ustunlarni qo'shish"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        # Harakatlar logi
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS action_logs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_tg_id INTEGER NOT NULL,
+                action TEXT NOT NULL,
+                data TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Foydalanuvchi statistikasi (har bir foydalanuvchi uchun bitta qator)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_stats (
+                user_id TEXT PRIMARY KEY,
+                total_presentations INTEGER DEFAULT 0,
+                active_days INTEGER DEFAULT 0,
+                last_activity TIMESTAMP,
+                stats_month TEXT,
+                this_month INTEGER DEFAULT 0,
+                last_month INTEGER DEFAULT 0,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        
+        # Kunlik statistika
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS user_daily_stats (
+                user_id TEXT NOT NULL,
+                day TEXT NOT NULL,
+                presentations INTEGER DEFAULT 0,
+                actions INTEGER DEFAULT 0,
+                PRIMARY KEY (user_id, day)
+            ) WITHOUT ROWID
+        """)
+        
+        # Buyurtma yakunlangan vaqt
+        if not await _column_exists(db, "orders", "completed_at"):
+            await db.execute("ALTER TABLE orders ADD COLUMN completed_at TIMESTAMP")
+        
+        # Idempotentlik kaliti: bitta callback ikki marta buyurtma yaratmasligi uchun
+        if not await _column_exists(db, "orders", "request_key"):
+            await db.execute("ALTER TABLE orders ADD COLUMN request_key TEXT")
+        await db.execute(
+            "CREATE UNIQUE INDEX IF NOT EXISTS idx_orders_request_key ON orders (request_key) WHERE request_key IS NOT NULL"
+        )
+        
+        # Foydalanuvchiga xabar yetib borishi holati (active / blocked / not_found / deactivated)
+        if not await _column_exists(db, "users", "reach_status"):
+            await db.execute("ALTER TABLE users ADD COLUMN reach_status TEXT DEFAULT 'unknown'")
+        if not await _column_exists(db, "users", "reach_checked_at"):
+            await db.execute("ALTER TABLE users ADD COLUMN reach_checked_at TIMESTAMP")
+        
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_user_id ON users (user_id)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_reach_status ON users (reach_status)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_users_reach_checked_at ON users (reach_checked_at)")
+        
+        # Ommaviy xabar vazifalari va har bir qabul qiluvchi holati
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS broadcast_jobs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                admin_id INTEGER NOT NULL,
+                from_chat_id INTEGER NOT NULL,
+                message_id INTEGER NOT NULL,
+                mode TEXT DEFAULT 'copy',
+                progress_chat_id INTEGER,
+                progress_message_id INTEGER,
+                status TEXT DEFAULT 'running',
+                total INTEGER DEFAULT 0,
+                sent INTEGER DEFAULT 0,
+                blocked INTEGER DEFAULT 0,
+                failed INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                finished_at TIMESTAMP
+            )
+        """)
+        # Click to'lovlari: yaratilganda yoziladi, fon tekshiruvchi bir marta hisoblaydi
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS pending_payments (
+                payment_id TEXT PRIMARY KEY,
+                user_tg_id INTEGER NOT NULL,
+                amount INTEGER NOT NULL,
+                order_ref TEXT,
+                status TEXT DEFAULT 'pending',
+                attempts INTEGER DEFAULT 0,
+                last_error TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                next_check_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                settled_at TIMESTAMP
+            )
+        """)
+        await db.execute(
+            "CREATE INDEX IF NOT EXISTS idx_pending_payments_due ON pending_payments (status, next_check_at)"
+        )
+        
+        # Tayyor taqdimotlar: fayl diskda saqlanmaydi, Telegram file_id lari saqlanadi
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS presentations (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER,
+                user_tg_id INTEGER NOT NULL,
+                topic TEXT,
+                pages INTEGER,
+                tariff TEXT,
+                pptx_file_id TEXT,
+                pdf_file_id TEXT,
+                status TEXT DEFAULT 'completed',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_presentations_order_id ON presentations (order_id)")
+        
+        # Buyurtma xarajati: OpenAI tokenlari, rasmlar va bosqich vaqtlari (max_tokens/model tanlash uchun)
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS order_costs (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                order_id INTEGER REFERENCES orders(id),
+                tariff TEXT,
+                pages INTEGER,
+                status TEXT,
+                text_model TEXT,
+                prompt_tokens INTEGER DEFAULT 0,
+                completion_tokens INTEGER DEFAULT 0,
+                cached_tokens INTEGER DEFAULT 0,
+                chat_calls INTEGER DEFAULT 0,
+                image_model TEXT,
+                image_size TEXT,
+                image_quality TEXT,
+                images INTEGER DEFAULT 0,
+                images_failed INTEGER DEFAULT 0,
+                cost_usd REAL DEFAULT 0,
+                queue_ms REAL,
+                text_ms REAL,
+                images_ms REAL,
+                render_ms REAL,
+                send_ms REAL,
+                total_ms REAL,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+            )
+        """)
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_order_costs_created_at ON order_costs (created_at)")
+        await db.execute("CREATE INDEX IF NOT EXISTS idx_order_costs_order_id ON order_costs (order_id)")
+        if not await _column_exists(db, "order_costs", "speculative"):
+            # Matn tasdiqlash dialogi vaqtida oldindan tayyorlangan (speculation.py)
+            await db.execute("ALTER TABLE order_costs ADD COLUMN speculative INTEGER DEFAULT 0")
+        if not await _column_exists(db, "order_costs", "images_reused"):
+            # O'xshash prompt bo'yicha image_index dan olingan rasmlar
+            await db.execute("ALTER TABLE order_costs ADD COLUMN images_reused INTEGER DEFAULT 0")
+        
+        if not await _column_exists(db, 'broadcast_jobs', 'seeded'):
+            # Qabul qiluvchilar users jadvalidan oqim bilan yoziladi:
+            # seed_cursor - oxirgi o'qilgan rowid, seeded - hammasi yozildi
+            await db.execute("ALTER TABLE broadcast_jobs ADD COLUMN seeded INTEGER DEFAULT 0")
+            await db.execute("ALTER TABLE broadcast_jobs ADD COLUMN seed_cursor INTEGER DEFAULT 0")
+        await db.execute("""
+            CREATE TABLE IF NOT EXISTS broadcast_recipients (
+                job_id INTEGER NOT NULL,
+                user_id TEXT NOT NULL,
+                status TEXT DEFAULT 'pending',
+                error TEXT,
+                PRIMARY KEY (job_id, user_id)
+            ) WITHOUT ROWID
+        """)
+        
+        await db.commit()
+
 async def init_db():
     """Ma'lumotlar bazasini ishga tushirish (faqat mavjud DataBase.db ishlatish)"""
     
@@ -91,25 +483,15 @@ async def init_db():
     
     print(f"Database yuklandi: {DATABASE_PATH}")
     
-    # Foydalanuvchilar sonini ko'rsatish
-    user_count = await get_users_count()
-    print(f"Jami foydalanuvchilar soni: {user_count}")
-    
-    # Agar foydalanuvchilar bo'lsa, bir nechtasini ko'rsatish
-    if user_count > 0:
-        users = await get_all_users()
-        print(f"Oxirgi 5 ta foydalanuvchi:")
-        for i, user in enumerate(users[:5], 1):
-            # Unicode belgilarni to'g'ri ko'rsatish
-            try:
-                name = user['name']
-                phone = user['phone_number']
-                print(f"  {i}. ID: {user['user_id']}, Ism: {name}, Telefon: {phone}")
-            except UnicodeEncodeError:
-                # Agar Unicode xatolik bo'lsa, oddiy matn ko'rsatish
-                name = str(user['name']).encode('ascii', errors='ignore').decode('ascii')
-                phone = str(user['phone_number']).encode('ascii', errors='ignore').decode('ascii')
-                print(f"  {i}. ID: {user['user_id']}, Ism: {name}, Telefon: {phone}")
+    # WAL bazada saqlanadi: o'quvchilar yozuvchini kutmaydi (per-call ulanishlar uchun ham)
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("PRAGMA journal_mode=WAL")
+        mode = (await cursor.fetchone())[0]
+        print(f"Database journal rejimi: {mode}")
+    
+    # Qo'shimcha jadval va ustunlarni yaratish.
+    # Foydalanuvchilar soni/ro'yxati bu yerda o'qilmaydi - ishga tushish jadval hajmiga bog'liq emas
+    await run_migrations()
 
 # Boshqa funksiyalar uchun placeholder'lar
 async def create_order(order_data: Dict[str, Any]) -> int:
@@ -121,17 +503,192 @@ async def get_active_order(user_tg_id: int) -> Optional[Dict[str, Any]]:
 async def update_order_status(order_id: int, status: str):
     pass
 
-async def log_action(user_tg_id: int, action: str, data: Dict[str, Any]):
-    pass
-
 async def save_presentation(presentation_data: Dict[str, Any]) -> int:
     return 0
 
 async def save_slide(slide_data: Dict[str, Any]) -> int:
     return 0
 
+# Statistika funksiyalari
+def _stats_periods(now: Optional[datetime] = None) -> Dict[str, str]:
+    """Statistika uchun kun, oy va o'tgan oy kalitlari"""
+    now = now or datetime.now()
+    first_day = now.replace(day=1)
+    prev_month = (first_day - timedelta(days=1)).strftime('%Y-%m')
+    return {
+        'day': now.strftime('%Y-%m-%d'),
+        'month': now.strftime('%Y-%m'),
+        'prev_month': prev_month,
+        'timestamp': now.strftime('%Y-%m-%d %H:%M:%S')
+    }
+
+async def _bump_presentation_stats(db, user_tg_id: int):
+    """Yakunlangan taqdimotni statistikaga qo'shish (commit chaqiruvchida)"""
+    periods = _stats_periods()
+    user_id = str(user_tg_id)
+    
+    await db.execute("""
+        INSERT INTO user_daily_stats (user_id, day, presentations, actions)
+        VALUES (?, ?, 1, 0)
+        ON CONFLICT(user_id, day) DO UPDATE SET presentations = presentations + 1
+    """, (user_id, periods['day']))
+    
+    # Oy almashganda joriy oy hisoblagichi o'tgan oyga suriladi
+    await db.execute("""
+        INSERT INTO user_stats (user_id, total_presentations, stats_month, this_month, last_month)
+        VALUES (?, 1, ?, 1, 0)
+        ON CONFLICT(user_id) DO UPDATE SET
+            total_presentations = total_presentations + 1,
+            last_month = CASE
+                WHEN stats_month = excluded.stats_month THEN last_month
+                WHEN stats_month = ? THEN this_month
+                ELSE 0 END,
+            this_month = CASE
+                WHEN stats_month = excluded.stats_month THEN this_month + 1
+                ELSE 1 END,
+            stats_month = excluded.stats_month,
+            updated_at = CURRENT_TIMESTAMP
+    """, (user_id, periods['month'], periods['prev_month']))
+
+async def log_action(user_tg_id: int, action: str, data: Optional[Dict[str, Any]] = None) -> int:
+    """Foydalanuvchi harakatini log qilish va statistikani yangilash"""
+    try:
+        periods = _stats_periods()
+        user_id = str(user_tg_id)
+        
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            cursor = await db.execute(
+                "INSERT INTO action_logs (user_tg_id, action, data, created_at) VALUES (?, ?, ?, ?)",
+                (
+                    user_tg_id,
+                    action,
+                    json.dumps(data, ensure_ascii=False, default=str) if data else None,
+                    periods['timestamp']
+                )
+            )
+            log_id = cursor.lastrowid
+            
+            # Kunlik harakatlar soni
+            await db.execute("""
+                INSERT INTO user_daily_stats (user_id, day, presentations, actions)
+                VALUES (?, ?, 0, 1)
+                ON CONFLICT(user_id, day) DO UPDATE SET actions = actions + 1
+            """, (user_id, periods['day']))
+            
+            # Bugungi birinchi harakat bo'lsa - yangi faol kun
+            cursor = await db.execute(
+                "SELECT actions FROM user_daily_stats WHERE user_id = ? AND day = ?",
+                (user_id, periods['day'])
+            )
+            new_active_day = 1 if (await cursor.fetchone())[0] == 1 else 0
+            
+            await db.execute("""
+                INSERT INTO user_stats (user_id, active_days, last_activity, stats_month)
+                VALUES (?, ?, ?, ?)
+                ON CONFLICT(user_id) DO UPDATE SET
+                    active_days = active_days + excluded.active_days,
+                    last_activity = excluded.last_activity,
+                    updated_at = CURRENT_TIMESTAMP
+            """, (user_id, new_active_day, periods['timestamp'], periods['month']))
+            
+            await db.commit()
+            return log_id
+            
+    except Exception as e:
+        print(f"Harakatni log qilishda xatolik: {e}")
+        return 0
+
 async def get_user_statistics(user_tg_id: int) -> Dict[str, Any]:
-    return {}
+    """Foydalanuvchi statistikasini olish (user_stats jadvalidagi bitta qatordan)"""
+    empty_stats = {
+        'total_presentations': 0,
+        'this_month': 0,
+        'last_month': 0,
+        'active_days': 0,
+        'last_activity': 'Hali yo\'q'
+    }
+    try:
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM user_stats WHERE user_id = ?", (str(user_tg_id),)
+            )
+            row = await cursor.fetchone()
+            
+            if not row:
+                return empty_stats
+            
+            # Saqlangan oy eskirgan bo'lsa, hisoblagichlarni o'qishda surish
+            periods = _stats_periods()
+            if row['stats_month'] == periods['month']:
+                this_month, last_month = row['this_month'], row['last_month']
+            elif row['stats_month'] == periods['prev_month']:
+                this_month, last_month = 0, row['this_month']
+            else:
+                this_month, last_month = 0, 0
+            
+            return {
+                'total_presentations': row['total_presentations'] or 0,
+                'this_month': this_month or 0,
+                'last_month': last_month or 0,
+                'active_days': row['active_days'] or 0,
+                'last_activity': row['last_activity'] or empty_stats['last_activity']
+            }
+            
+    except Exception as e:
+        print(f"Statistikani olishda xatolik: {e}")
+        return empty_stats
+
+async def backfill_user_stats() -> int:
+    """Statistika jadvallarini mavjud buyurtmalar va loglardan qayta hisoblash"""
+    periods = _stats_periods()
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute("DELETE FROM user_daily_stats")
+        await db.execute("DELETE FROM user_stats")
+        
+        # Jonli hisoblagichlar lokal vaqt bo'yicha (_stats_periods), action_logs ham lokal vaqtda yoziladi.
+        # orders vaqtlari CURRENT_TIMESTAMP (UTC) - kun shu sababli 'localtime' bilan olinadi
+        await db.execute("""
+            INSERT INTO user_daily_stats (user_id, day, presentations, actions)
+            SELECT user_id, day, SUM(presentations), SUM(actions) FROM (
+                SELECT CAST(user_tg_id AS TEXT) AS user_id,
+                       DATE(COALESCE(completed_at, created_at), 'localtime') AS day,
+                       1 AS presentations, 0 AS actions
+                FROM orders WHERE status = 'completed'
+                UNION ALL
+                SELECT CAST(user_tg_id AS TEXT), DATE(created_at), 0, 1
+                FROM action_logs
+            )
+            WHERE day IS NOT NULL
+            GROUP BY user_id, day
+        """)
+        
+        await db.execute("""
+            INSERT INTO user_stats (
+                user_id, total_presentations, active_days, last_activity,
+                stats_month, this_month, last_month
+            )
+            SELECT d.user_id,
+                   SUM(d.presentations),
+                   SUM(d.actions > 0),
+                   l.last_activity,
+                   ?,
+                   SUM(CASE WHEN substr(d.day, 1, 7) = ? THEN d.presentations ELSE 0 END),
+                   SUM(CASE WHEN substr(d.day, 1, 7) = ? THEN d.presentations ELSE 0 END)
+            FROM user_daily_stats d
+            LEFT JOIN (
+                SELECT CAST(user_tg_id AS TEXT) AS user_id, MAX(created_at) AS last_activity
+                FROM action_logs GROUP BY user_tg_id
+            ) l ON l.user_id = d.user_id
+            GROUP BY d.user_id
+        """, (periods['month'], periods['month'], periods['prev_month']))
+        
+        cursor = await db.execute("SELECT COUNT(*) FROM user_stats")
+        users_count = (await cursor.fetchone())[0]
+        
+        await db.commit()
+        return users_count
 
 async def get_user_balance(user_tg_id: int) -> Dict[str, Any]:
     """Foydalanuvchi balansini olish"""
@@ -322,6 +879,147 @@ async def add_transaction(user_tg_id: int, amount: int, transaction_type: str, d
         print(f"Tranzaksiya qo'shishda xatolik: {e}")
         return 0
 
+# Click to'lovlari
+async def create_pending_payment(payment_id: str, user_tg_id: int, amount: int, order_ref: str = None) -> bool:
+    """Yaratilgan to'lovni kutilayotganlar ro'yxatiga yozish"""
+    try:
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            await db.execute("""
+                INSERT OR IGNORE INTO pending_payments (payment_id, user_tg_id, amount, order_ref, created_at, next_check_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+            """, (str(payment_id), user_tg_id, amount, order_ref, now, now))
+            await db.commit()
+            return True
+    except Exception as e:
+        print(f"To'lovni yozishda xatolik: {e}")
+        return False
+
+async def get_pending_payment(payment_id: str) -> Optional[Dict[str, Any]]:
+    """To'lovni lokal jadvaldan olish"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("SELECT * FROM pending_payments WHERE payment_id = ?", (str(payment_id),))
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+async def get_due_pending_payments(limit: int = 50) -> List[Dict[str, Any]]:
+    """Tekshirish vaqti kelgan to'lovlar"""
+    now = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("""
+            SELECT * FROM pending_payments
+            WHERE status = 'pending' AND next_check_at <= ?
+            ORDER BY next_check_at
+            LIMIT ?
+        """, (now, limit))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+async def get_next_payment_check_at() -> Optional[datetime]:
+    """Eng yaqin tekshirish vaqti (kutilayotgan to'lov bo'lmasa None)"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("SELECT MIN(next_check_at) FROM pending_payments WHERE status = 'pending'")
+        row = await cursor.fetchone()
+        if not row or not row[0]:
+            return None
+        return datetime.strptime(row[0], '%Y-%m-%d %H:%M:%S')
+
+async def reschedule_pending_payments(schedule: List[tuple]) -> None:
+    """Keyingi tekshirish vaqtini yozish: [(payment_id, next_check_at, error), ...]"""
+    if not schedule:
+        return
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.executemany("""
+            UPDATE pending_payments
+            SET attempts = attempts + 1, next_check_at = ?, last_error = ?
+            WHERE payment_id = ? AND status = 'pending'
+        """, [(next_check_at.strftime('%Y-%m-%d %H:%M:%S'), error, str(payment_id))
+              for payment_id, next_check_at, error in schedule])
+        await db.commit()
+
+async def mark_payment_due(payment_id: str) -> None:
+    """To'lovni navbatdagi tekshiruvga qo'yish (foydalanuvchi "tekshirish" ni bosganda)"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        await db.execute(
+            "UPDATE pending_payments SET next_check_at = ? WHERE payment_id = ? AND status = 'pending'",
+            (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), str(payment_id))
+        )
+        await db.commit()
+
+async def settle_pending_payment(payment_id: str, status: str, amount: Optional[int] = None) -> Optional[Dict[str, Any]]:
+    """To'lovni yakunlash. Tasdiqlangan bo'lsa balans va tranzaksiya shu tranzaksiyada yoziladi.
+    
+    Holat faqat 'pending' dan o'zgaradi, shuning uchun bir to'lov faqat bir marta hisoblanadi.
+    Yakunlangan to'lov qaytadi, allaqachon yakunlangan bo'lsa None.
+    """
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("""
+            UPDATE pending_payments
+            SET status = ?, amount = COALESCE(?, amount), settled_at = ?
+            WHERE payment_id = ? AND status = 'pending'
+        """, (status, amount, datetime.now().strftime('%Y-%m-%d %H:%M:%S'), str(payment_id)))
+        if not cursor.rowcount:
+            await db.rollback()
+            return None
+        
+        cursor = await db.execute("SELECT * FROM pending_payments WHERE payment_id = ?", (str(payment_id),))
+        payment = dict(await cursor.fetchone())
+        
+        if status == 'confirmed':
+            user_id = str(payment['user_tg_id'])
+            cursor = await db.execute("""
+                UPDATE user_balances
+                SET cash_balance = cash_balance + ?, total_balance = total_balance + ?, updated_at = CURRENT_TIMESTAMP
+                WHERE user_id = ?
+            """, (payment['amount'], payment['amount'], user_id))
+            if not cursor.rowcount:
+                await db.execute("""
+                    INSERT INTO user_balances (user_id, cash_balance, referral_balance, total_balance, created_at, updated_at)
+                    VALUES (?, ?, 0, ?, CURRENT_TIMESTAMP, CURRENT_TIMESTAMP)
+                """, (user_id, payment['amount'], payment['amount']))
+            await db.execute(
+                "INSERT INTO transactions (user_id, amount, transaction_type, description) VALUES (?, ?, ?, ?)",
+                (user_id, payment['amount'], 'click_topup', f"Click to'lov #{payment['payment_id']}")
+            )
+        
+        await db.commit()
+        return payment
+
+async def get_expiring_pending_payments(max_age_hours: int, limit: int = 50) -> List[Dict[str, Any]]:
+    """Muddati o'tgan, tekshirish vaqti kelgan kutilayotgan to'lovlar"""
+    now = datetime.now()
+    cutoff = (now - timedelta(hours=max_age_hours)).strftime('%Y-%m-%d %H:%M:%S')
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute("""
+            SELECT * FROM pending_payments
+            WHERE status = 'pending' AND created_at < ? AND next_check_at <= ?
+            ORDER BY created_at
+            LIMIT ?
+        """, (cutoff, now.strftime('%Y-%m-%d %H:%M:%S'), limit))
+        rows = await cursor.fetchall()
+        return [dict(row) for row in rows]
+
+async def expire_pending_payment(payment_id: str) -> bool:
+    """Kutilayotgan to'lovni 'expired' qilish (Click oxirgi tekshiruvda ham tasdiqlamagan bo'lsa)"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        cursor = await db.execute("""
+            UPDATE pending_payments SET status = 'expired', settled_at = ?
+            WHERE payment_id = ? AND status = 'pending'
+        """, (datetime.now().strftime('%Y-%m-%d %H:%M:%S'), str(payment_id)))
+        await db.commit()
+        return cursor.rowcount > 0
+
 async def get_referral_rewards() -> Dict[str, int]:
     """Referral bonuslarini olish"""
     try:
@@ -371,17 +1069,15 @@ async def create_order(order_data: Dict[str, Any]) -> int:
         async with aiosqlite.connect(DATABASE_PATH) as db:
             cursor = await db.execute(
                 """INSERT INTO orders (
-                    user_tg_id, tariff, topic, slides_count, 
-                    design_style, color_scheme, status, created_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)""",
+                    user_tg_id, tariff, topic, pages, status, request_key, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)""",
                 (
                     order_data['user_tg_id'],
                     order_data['tariff'],
                     order_data['topic'],
-                    order_data['slides_count'],
-                    order_data['design_style'],
-                    order_data['color_scheme'],
-                    order_data['status']
+                    order_data['pages'],
+                    order_data.get('status', 'pending'),
+                    order_data.get('request_key')
                 )
             )
             await db.commit()
@@ -390,15 +1086,82 @@ async def create_order(order_data: Dict[str, Any]) -> int:
         print(f"Buyurtma yaratishda xatolik: {e}")
         return 0
 
+async def create_paid_order(order_data: Dict[str, Any], amount: int, description: str) -> int:
+    """Buyurtma yaratish va uning narxini balansdan yechish - bitta tranzaksiyada.
+    
+    Buyurtma (request_key bilan) yozilmasa pul ham yechilmaydi va aksincha.
+    amount 0 bo'lsa (bepul buyurtma) faqat buyurtma yoziladi. Xatolik yoki balans yetmasa 0.
+    """
+    try:
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            cursor = await db.execute(
+                """INSERT INTO orders (
+                    user_tg_id, tariff, topic, pages, status, request_key, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)""",
+                (
+                    order_data['user_tg_id'],
+                    order_data['tariff'],
+                    order_data['topic'],
+                    order_data['pages'],
+                    order_data.get('status', 'pending'),
+                    order_data.get('request_key')
+                )
+            )
+            order_id = cursor.lastrowid
+            
+            if amount > 0:
+                user_id = str(order_data['user_tg_id'])
+                # Balans shu UPDATE ichida tekshiriladi - parallel yechimlar manfiyga tushirmaydi
+                cursor = await db.execute("""
+                    UPDATE user_balances
+                    SET cash_balance = cash_balance - ?, total_balance = total_balance - ?, updated_at = CURRENT_TIMESTAMP
+                    WHERE user_id = ? AND total_balance >= ?
+                """, (amount, amount, user_id, amount))
+                if not cursor.rowcount:
+                    await db.rollback()
+                    return 0
+                await db.execute(
+                    "INSERT INTO transactions (user_id, amount, transaction_type, description) VALUES (?, ?, ?, ?)",
+                    (user_id, amount, 'debit', description)
+                )
+            
+            await db.commit()
+            return order_id
+    except Exception as e:
+        print(f"To'langan buyurtma yaratishda xatolik: {e}")
+        return 0
+
+async def get_order_by_request_key(request_key: str) -> Optional[Dict[str, Any]]:
+    """Idempotentlik kaliti bo'yicha avval yaratilgan buyurtma"""
+    try:
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                "SELECT * FROM orders WHERE request_key = ? LIMIT 1", (request_key,)
+            )
+            row = await cursor.fetchone()
+            return dict(row) if row else None
+    except Exception as e:
+        print(f"Buyurtmani kalit bo'yicha olishda xatolik: {e}")
+        return None
+
 async def update_order_status(order_id: int, status: str) -> bool:
     """Buyurtma holatini yangilash"""
     try:
         async with aiosqlite.connect(DATABASE_PATH) as db:
             if status == 'completed':
-                await db.execute(
-                    "UPDATE orders SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ?",
+                # Faqat birinchi marta yakunlanganda statistikaga qo'shiladi
+                cursor = await db.execute(
+                    "UPDATE orders SET status = ?, completed_at = CURRENT_TIMESTAMP WHERE id = ? AND status != 'completed'",
                     (status, order_id)
                 )
+                if cursor.rowcount:
+                    cursor = await db.execute(
+                        "SELECT user_tg_id FROM orders WHERE id = ?", (order_id,)
+                    )
+                    row = await cursor.fetchone()
+                    if row:
+                        await _bump_presentation_stats(db, row[0])
             else:
                 await db.execute(
                     "UPDATE orders SET status = ? WHERE id = ?",
@@ -412,13 +1175,92 @@ async def update_order_status(order_id: int, status: str) -> bool:
         return False
 
 async def save_presentation(presentation_data: Dict[str, Any]) -> bool:
-    """Taqdimot ma'lumotlarini saqlash"""
+    """Taqdimot ma'lumotlarini (Telegram file_id lari bilan) saqlash"""
     try:
-        # Bu funksiya taqdimot ma'lumotlarini saqlash uchun ishlatiladi
-        # Hozircha faqat log qilamiz
-        print(f"Taqdimot saqlandi: {presentation_data}")
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            await db.execute("""
+                INSERT INTO presentations (
+                    order_id, user_tg_id, topic, pages, tariff, pptx_file_id, pdf_file_id, status
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                presentation_data.get('order_id'),
+                presentation_data['user_tg_id'],
+                presentation_data.get('topic'),
+                presentation_data.get('pages'),
+                presentation_data.get('tariff'),
+                presentation_data.get('pptx_file_id'),
+                presentation_data.get('pdf_file_id'),
+                presentation_data.get('status', 'completed')
+            ))
+            await db.commit()
         return True
     except Exception as e:
         print(f"Taqdimot saqlashda xatolik: {e}")
         return False
 
+async def get_presentation_by_order(order_id: int) -> Optional[Dict[str, Any]]:
+    """Buyurtma bo'yicha taqdimot (qayta yuborish uchun file_id lar)"""
+    
+    async with aiosqlite.connect(DATABASE_PATH) as db:
+        db.row_factory = aiosqlite.Row
+        cursor = await db.execute(
+            "SELECT * FROM presentations WHERE order_id = ? ORDER BY id DESC LIMIT 1", (order_id,)
+        )
+        row = await cursor.fetchone()
+        return dict(row) if row else None
+
+async def save_order_cost(cost_data: Dict[str, Any]) -> bool:
+    """Buyurtma xarajati va bosqich vaqtlarini saqlash (order_costs.OrderCost.to_row)"""
+    try:
+        columns = ", ".join(cost_data)
+        placeholders = ", ".join("?" for _ in cost_data)
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            await db.execute(
+                f"INSERT INTO order_costs ({columns}) VALUES ({placeholders})", tuple(cost_data.values())
+            )
+            await db.commit()
+        return True
+    except Exception as e:
+        print(f"Buyurtma xarajatini saqlashda xatolik: {e}")
+        return False
+
+async def get_order_cost_report(days: int = 7) -> Dict[str, List[Dict[str, Any]]]:
+    """Oxirgi `days` kundagi xarajat va kechikish: tarif bo'yicha va kun bo'yicha"""
+    aggregates = """
+        COUNT(*) AS orders,
+        SUM(status = 'completed') AS completed,
+        SUM(speculative) AS speculative,
+        ROUND(SUM(cost_usd), 4) AS cost_usd,
+        ROUND(AVG(cost_usd), 4) AS avg_cost_usd,
+        ROUND(AVG(prompt_tokens)) AS avg_prompt_tokens,
+        ROUND(AVG(completion_tokens)) AS avg_completion_tokens,
+        ROUND(AVG(cached_tokens)) AS avg_cached_tokens,
+        ROUND(AVG(images), 2) AS avg_images,
+        SUM(images_failed) AS images_failed,
+        SUM(images_reused) AS images_reused,
+        ROUND(AVG(queue_ms)) AS avg_queue_ms,
+        ROUND(AVG(text_ms)) AS avg_text_ms,
+        ROUND(AVG(images_ms)) AS avg_images_ms,
+        ROUND(AVG(render_ms)) AS avg_render_ms,
+        ROUND(AVG(send_ms)) AS avg_send_ms,
+        ROUND(AVG(total_ms)) AS avg_total_ms,
+        ROUND(MAX(total_ms)) AS max_total_ms
+    """
+    since = (datetime.utcnow() - timedelta(days=days)).strftime('%Y-%m-%d %H:%M:%S')
+    try:
+        async with aiosqlite.connect(DATABASE_PATH) as db:
+            db.row_factory = aiosqlite.Row
+            cursor = await db.execute(
+                f"SELECT tariff, {aggregates} FROM order_costs WHERE created_at >= ? "
+                "GROUP BY tariff ORDER BY cost_usd DESC", (since,)
+            )
+            by_tariff = [dict(row) for row in await cursor.fetchall()]
+            cursor = await db.execute(
+                f"SELECT DATE(created_at) AS day, {aggregates} FROM order_costs WHERE created_at >= ? "
+                "GROUP BY day ORDER BY day DESC", (since,)
+            )
+            by_day = [dict(row) for row in await cursor.fetchall()]
+        return {"by_tariff": by_tariff, "by_day": by_day}
+    except Exception as e:
+        print(f"Xarajat hisobotini olishda xatolik: {e}")
+        return {"by_tariff": [], "by_day": []}
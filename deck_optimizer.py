@@ -0,0 +1,348 @@
+"""PPTX hajmini kamaytirish: rasmlarni ko'rsatilgan o'lchamiga moslash, keraksiz qismlarni olib tashlash.
+
+python-pptx saqlagan paket (zip) ustida ishlaydi - render pool ichida, render'dan keyin:
+    - slayddagi har bir rasm ko'rsatilgan o'lchami x DECK_IMAGE_DPI gacha kichraytiriladi va
+      shaffoflik bo'lmasa JPEG ga (aks holda optimallashgan PNG) qayta kodlanadi - faqat kichikroq
+      bo'lsa almashtiriladi;
+    - shablondagi ishlatilmagan slide layout'lar va printer sozlamalari olib tashlanadi;
+    - XML qismlar eng yuqori deflate darajasida, rasmlar siqilmasdan (ular allaqachon siqilgan) yoziladi.
+
+    python -m deck_optimizer deck.pptx [--out optimized.pptx]
+"""
+import hashlib
+import logging
+import math
+import os
+import posixpath
+import threading
+import time
+import zipfile
+from collections import OrderedDict
+from io import BytesIO
+from typing import Any, Dict, List, Tuple
+
+from lxml import etree
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+DECK_OPTIMIZE = os.getenv("DECK_OPTIMIZE", "1") == "1"
+DECK_IMAGE_DPI = int(os.getenv("DECK_IMAGE_DPI", "150"))
+DECK_JPEG_QUALITY = int(os.getenv("DECK_JPEG_QUALITY", "85"))
+EMU_PER_INCH = 914400
+
+CONTENT_TYPES = "[Content_Types].xml"
+NS = {
+    "a": "http://schemas.openxmlformats.org/drawingml/2006/main",
+    "p": "http://schemas.openxmlformats.org/presentationml/2006/main",
+    "r": "http://schemas.openxmlformats.org/officeDocument/2006/relationships",
+    "rel": "http://schemas.openxmlformats.org/package/2006/relationships",
+    "ct": "http://schemas.openxmlformats.org/package/2006/content-types",
+}
+REL_LAYOUT = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/slideLayout"
+REL_PRINTER = "http://schemas.openxmlformats.org/officeDocument/2006/relationships/printerSettings"
+IMAGE_EXTENSIONS = (".png", ".jpeg", ".jpg")
+# Fon rasmlari har bir taqdimotda bir xil - qayta kodlash natijasi (har bir worker'da) keshlanadi
+FIT_CACHE_SIZE = 32
+
+_fit_cache: "OrderedDict[tuple, Tuple[bytes, str]]" = OrderedDict()
+# Render oqimlari (RENDER_POOL=thread) va image_index oqimi keshni bir vaqtda ishlatadi
+_fit_cache_lock = threading.Lock()
+
+
+def fit_image(data: bytes, width_in: float, height_in: float, dpi: int = DECK_IMAGE_DPI,
+              quality: int = DECK_JPEG_QUALITY) -> Tuple[bytes, str]:
+    """Rasmni width_in x height_in dyuymga `dpi` bilan moslash: (bytes, 'jpeg' yoki 'png').
+
+    Rasm faqat kichraytiriladi (nisbati saqlanadi, ramkani to'liq qoplaydi). Shaffof piksellar
+    bo'lsa PNG qoladi, aks holda JPEG.
+    """
+    key = (hashlib.sha1(data).digest(), round(width_in, 3), round(height_in, 3), dpi, quality)
+    with _fit_cache_lock:
+        result = _fit_cache.get(key)
+        if result is not None:
+            _fit_cache.move_to_end(key)
+            return result
+    # Qayta kodlash qulfdan tashqarida - boshqa oqimlar kutib qolmaydi
+    result = _fit_image(data, width_in, height_in, dpi, quality)
+    with _fit_cache_lock:
+        _fit_cache[key] = result
+        if len(_fit_cache) > FIT_CACHE_SIZE:
+            _fit_cache.popitem(last=False)
+    return result
+
+
+def clear_fit_cache():
+    """Qayta kodlash keshini tozalash (benchmark har bir o'lchovda haqiqiy narxni ko'rsin)"""
+    with _fit_cache_lock:
+        _fit_cache.clear()
+
+
+def _fit_image(data: bytes, width_in: float, height_in: float, dpi: int, quality: int) -> Tuple[bytes, str]:
+    image = Image.open(BytesIO(data))
+    image.load()
+    target_w = max(1, math.ceil(width_in * dpi))
+    target_h = max(1, math.ceil(height_in * dpi))
+    scale = max(target_w / image.width, target_h / image.height)
+    if scale < 1:
+        image = image.resize((max(1, round(image.width * scale)), max(1, round(image.height * scale))),
+                             Image.LANCZOS)
+
+    has_alpha = image.mode in ("RGBA", "LA") or (image.mode == "P" and "transparency" in image.info)
+    if has_alpha and image.convert("RGBA").getchannel("A").getextrema()[0] < 255:
+        output = BytesIO()
+        image.save(output, "PNG", optimize=True)
+        return output.getvalue(), "png"
+
+    output = BytesIO()
+    image.convert("RGB").save(output, "JPEG", quality=quality, optimize=True, progressive=True)
+    return output.getvalue(), "jpeg"
+
+
+def _rels_name(part: str) -> str:
+    directory, name = posixpath.split(part)
+    return posixpath.join(directory, "_rels", f"{name}.rels")
+
+
+def _resolve(part: str, target: str) -> str:
+    return posixpath.normpath(posixpath.join(posixpath.dirname(part), target))
+
+
+def _relationships(files: Dict[str, bytes], part: str) -> List[etree._Element]:
+    data = files.get(_rels_name(part))
+    return list(etree.fromstring(data)) if data else []
+
+
+class _Package:
+    """Zip ichidagi qismlar (nom -> bytes) va ular ustida kichik amallar"""
+
+    def __init__(self, data: bytes):
+        with zipfile.ZipFile(BytesIO(data)) as archive:
+            self.order = archive.namelist()
+            self.files = {name: archive.read(name) for name in self.order}
+
+    def xml(self, name: str) -> etree._Element:
+        return etree.fromstring(self.files[name])
+
+    def set_xml(self, name: str, root: etree._Element):
+        self.files[name] = etree.tostring(root, xml_declaration=True, encoding="UTF-8", standalone=True)
+
+    def remove(self, name: str):
+        self.files.pop(name, None)
+        self.files.pop(_rels_name(name), None)
+        types = self.xml(CONTENT_TYPES)
+        for override in types.findall("ct:Override", NS):
+            if override.get("PartName") == f"/{name}":
+                types.remove(override)
+        self.set_xml(CONTENT_TYPES, types)
+
+    def drop_relationships(self, part: str, predicate) -> List[str]:
+        """part.rels dan predicate(rel) bo'yicha bog'lanishlarni olib tashlash, ularning Id lari"""
+        rels_name = _rels_name(part)
+        if rels_name not in self.files:
+            return []
+        root = self.xml(rels_name)
+        removed = []
+        for rel in list(root):
+            if predicate(rel):
+                removed.append(rel.get("Id"))
+                root.remove(rel)
+        if removed:
+            self.set_xml(rels_name, root)
+        return removed
+
+    def save(self) -> bytes:
+        output = BytesIO()
+        with zipfile.ZipFile(output, "w") as archive:
+            for name in self.order:
+                if name not in self.files:
+                    continue
+                # Rasmlar allaqachon siqilgan - qayta siqish faqat vaqt oladi
+                if name.lower().endswith(IMAGE_EXTENSIONS):
+                    archive.writestr(name, self.files[name], compress_type=zipfile.ZIP_STORED)
+                else:
+                    archive.writestr(name, self.files[name], compress_type=zipfile.ZIP_DEFLATED, compresslevel=9)
+        return output.getvalue()
+
+
+def _slides(package: _Package) -> List[str]:
+    return [name for name in package.files
+            if name.startswith("ppt/slides/") and name.endswith(".xml") and "/_rels/" not in name]
+
+
+def _drop_unused_layouts(package: _Package, slides: List[str]) -> int:
+    used = {_resolve(slide, rel.get("Target")) for slide in slides
+            for rel in _relationships(package.files, slide) if rel.get("Type") == REL_LAYOUT}
+    unused = [name for name in package.files
+              if name.startswith("ppt/slideLayouts/") and name.endswith(".xml")
+              and "/_rels/" not in name and name not in used]
+    if not unused:
+        return 0
+
+    masters = [name for name in package.files
+               if name.startswith("ppt/slideMasters/") and name.endswith(".xml") and "/_rels/" not in name]
+    for master in masters:
+        removed_ids = package.drop_relationships(
+            master, lambda rel: rel.get("Type") == REL_LAYOUT and _resolve(master, rel.get("Target")) in unused
+        )
+        if removed_ids:
+            root = package.xml(master)
+            id_list = root.find("p:sldLayoutIdLst", NS)
+            for layout_id in list(id_list if id_list is not None else []):
+                if layout_id.get(f"{{{NS['r']}}}id") in removed_ids:
+                    id_list.remove(layout_id)
+            package.set_xml(master, root)
+    for name in unused:
+        package.remove(name)
+    return len(unused)
+
+
+def _drop_printer_settings(package: _Package) -> int:
+    part = "ppt/presentation.xml"
+    targets = [_resolve(part, rel.get("Target")) for rel in _relationships(package.files, part)
+               if rel.get("Type") == REL_PRINTER]
+    package.drop_relationships(part, lambda rel: rel.get("Type") == REL_PRINTER)
+    for name in targets:
+        package.remove(name)
+    return len(targets)
+
+
+def _displayed_sizes(package: _Package, slides: List[str]) -> Dict[str, Tuple[float, float]]:
+    """media qismi -> slaydlarda ko'rsatilgan eng katta o'lcham (dyuym).
+
+    Slayd rasmlari (p:pic) dan boshqa joyda ishlatilgan media (layout, fon to'ldirish) tegilmaydi.
+    """
+    sizes: Dict[str, Tuple[float, float]] = {}
+    other_uses = set()
+    for slide in slides:
+        targets = {rel.get("Id"): _resolve(slide, rel.get("Target")) for rel in _relationships(package.files, slide)
+                   if rel.get("TargetMode") != "External"}
+        pictures = set()
+        for pic in package.xml(slide).iter(f"{{{NS['p']}}}pic"):
+            blip = pic.find(".//a:blip", NS)
+            ext = pic.find("p:spPr/a:xfrm/a:ext", NS)
+            if blip is None or ext is None:
+                continue
+            media = targets.get(blip.get(f"{{{NS['r']}}}embed"))
+            if media is None:
+                continue
+            pictures.add(media)
+            width, height = int(ext.get("cx")) / EMU_PER_INCH, int(ext.get("cy")) / EMU_PER_INCH
+            old = sizes.get(media, (0.0, 0.0))
+            sizes[media] = (max(old[0], width), max(old[1], height))
+        other_uses.update(media for media in targets.values() if media.startswith("ppt/media/") and media not in pictures)
+
+    for name in package.files:
+        if name.endswith(".rels") and not name.startswith("ppt/slides/"):
+            source = name.replace("_rels/", "")[:-len(".rels")]
+            for rel in etree.fromstring(package.files[name]):
+                if rel.get("TargetMode") != "External":
+                    other_uses.add(_resolve(source, rel.get("Target")))
+    return {media: size for media, size in sizes.items() if media not in other_uses}
+
+
+def _rename_media(package: _Package, old: str, new: str):
+    old_base, new_base = posixpath.basename(old), posixpath.basename(new)
+    for name in list(package.files):
+        if name.endswith(".rels") and old_base.encode() in package.files[name]:
+            root = package.xml(name)
+            source = name.replace("_rels/", "")[:-len(".rels")]
+            changed = False
+            for rel in root:
+                if rel.get("TargetMode") != "External" and _resolve(source, rel.get("Target")) == old:
+                    rel.set("Target", posixpath.join(posixpath.dirname(rel.get("Target")), new_base))
+                    changed = True
+            if changed:
+                package.set_xml(name, root)
+    package.files[new] = package.files.pop(old)
+    package.order[package.order.index(old)] = new
+
+    extension = posixpath.splitext(new)[1][1:]
+    types = package.xml(CONTENT_TYPES)
+    if not any(default.get("Extension") == extension for default in types.findall("ct:Default", NS)):
+        default = etree.SubElement(types, f"{{{NS['ct']}}}Default")
+        default.set("Extension", extension)
+        default.set("ContentType", f"image/{'jpeg' if extension in ('jpg', 'jpeg') else extension}")
+        # Default lar Override lardan oldin turishi kerak
+        types.remove(default)
+        types.insert(0, default)
+        package.set_xml(CONTENT_TYPES, types)
+
+
+def _optimize_images(package: _Package, slides: List[str], dpi: int, quality: int) -> Tuple[int, int, int]:
+    count, before, after = 0, 0, 0
+    for media, (width_in, height_in) in _displayed_sizes(package, slides).items():
+        original = package.files.get(media)
+        if original is None or not media.lower().endswith(IMAGE_EXTENSIONS):
+            continue
+        try:
+            data, kind = fit_image(original, width_in, height_in, dpi, quality)
+        except Exception as e:
+            logger.warning(f"Rasmni optimallashtirib bo'lmadi ({media}): {e}")
+            continue
+        if len(data) >= len(original):
+            continue
+        count += 1
+        before += len(original)
+        after += len(data)
+        package.files[media] = data
+        stem, extension = posixpath.splitext(media)
+        if extension.lower().lstrip(".") != kind and not (kind == "jpeg" and extension.lower() == ".jpg"):
+            _rename_media(package, media, f"{stem}.{kind}")
+    return count, before, after
+
+
+def optimize_pptx(data: bytes, dpi: int = DECK_IMAGE_DPI, quality: int = DECK_JPEG_QUALITY) -> Tuple[bytes, Dict[str, Any]]:
+    """PPTX baytlarini optimallashtirish: (yangi baytlar, hisobot).
+
+    Xatolik bo'lsa asl fayl qaytariladi (hisobotda 'error').
+    """
+    started = time.perf_counter()
+    report: Dict[str, Any] = {"before": len(data)}
+    try:
+        package = _Package(data)
+        slides = _slides(package)
+        report["layouts_removed"] = _drop_unused_layouts(package, slides)
+        report["parts_removed"] = report["layouts_removed"] + _drop_printer_settings(package)
+        report["images"], report["images_before"], report["images_after"] = _optimize_images(package, slides, dpi, quality)
+        optimized = package.save()
+    except Exception as e:
+        logger.error(f"PPTX optimallashtirishda xatolik: {e}")
+        report.update(after=len(data), error=str(e), ms=round((time.perf_counter() - started) * 1000, 1))
+        return data, report
+
+    if len(optimized) >= len(data):
+        optimized = data
+    report["after"] = len(optimized)
+    report["ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return optimized, report
+
+
+def format_report(name: str, report: Dict[str, Any]) -> str:
+    before, after = report["before"], report["after"]
+    saved = (1 - after / before) * 100 if before else 0
+    line = (f"{name}: {before / 1024:,.0f} KB -> {after / 1024:,.0f} KB (-{saved:.0f}%), "
+            f"{report.get('images', 0)} rasm, {report.get('parts_removed', 0)} qism olib tashlandi, {report['ms']} ms")
+    if report.get("error"):
+        line += f", xatolik: {report['error']}"
+    return line
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="PPTX faylini optimallashtirish")
+    parser.add_argument("deck", help="PPTX fayl")
+    parser.add_argument("--out", help="natija fayli (berilmasa <nom>.optimized.pptx)")
+    parser.add_argument("--dpi", type=int, default=DECK_IMAGE_DPI)
+    parser.add_argument("--quality", type=int, default=DECK_JPEG_QUALITY)
+    args = parser.parse_args()
+
+    with open(args.deck, "rb") as f:
+        optimized, result = optimize_pptx(f.read(), args.dpi, args.quality)
+    out = args.out or f"{os.path.splitext(args.deck)[0]}.optimized.pptx"
+    with open(out, "wb") as f:
+        f.write(optimized)
+    print(format_report(os.path.basename(args.deck), result))
+    print(out)
@@ -0,0 +1,339 @@
+import asyncio
+import json
+import logging
+import os
+import sys
+import time
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Mapping, Optional, Set, Tuple
+
+import aiosqlite
+from aiogram.fsm.state import State
+from aiogram.fsm.storage.base import BaseStorage, DefaultKeyBuilder, KeyBuilder, StateType, StorageKey
+
+from database_adapter import DATABASE_PATH
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+FSM_STORAGE = os.getenv("FSM_STORAGE", "sqlite")
+FSM_TTL = int(os.getenv("FSM_TTL", str(7 * 24 * 60 * 60)))
+FSM_FLUSH_DELAY = float(os.getenv("FSM_FLUSH_DELAY", "0.2"))
+FSM_CACHE_SIZE = int(os.getenv("FSM_CACHE_SIZE", "10000"))
+FSM_MEMORY_TTL = int(os.getenv("FSM_MEMORY_TTL", "3600"))
+
+# Shundan katta ma'lumot zlib bilan siqiladi
+COMPRESS_THRESHOLD = 256
+CLEANUP_INTERVAL = 600
+
+_RAW = b"j"
+_ZLIB = b"z"
+
+
+def encode_data(data: Mapping[str, Any]) -> Optional[bytes]:
+    """Ma'lumotni ixcham JSON (+ kattasi zlib) ko'rinishiga o'tkazish"""
+    if not data:
+        return None
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    if len(raw) > COMPRESS_THRESHOLD:
+        return _ZLIB + zlib.compress(raw)
+    return _RAW + raw
+
+
+def decode_data(blob: Optional[bytes]) -> Dict[str, Any]:
+    if not blob:
+        return {}
+    if blob[:1] == _ZLIB:
+        return json.loads(zlib.decompress(blob[1:]))
+    return json.loads(blob[1:])
+
+
+def _state_name(state: StateType) -> Optional[str]:
+    return state.state if isinstance(state, State) else state
+
+
+class _Entry:
+    __slots__ = ("state", "data", "dirty", "touched_at")
+
+    def __init__(self, state: Optional[str], data: Dict[str, Any], touched_at: float):
+        self.state = state
+        self.data = data
+        self.dirty = False
+        self.touched_at = touched_at
+
+
+class SQLiteStorage(BaseStorage):
+    """SQLite da saqlanadigan FSM storage.
+
+    O'qish va yozish xotiradagi keshdan o'tadi, o'zgarishlar FSM_FLUSH_DELAY dan keyin
+    bitta tranzaksiyada yoziladi - bitta handler ichidagi bir nechta update_data
+    bazaga bitta yozuv bo'lib tushadi. FSM_TTL dan ko'p harakatsiz suhbatlar o'chiriladi.
+    """
+
+    def __init__(self, path: str = DATABASE_PATH, key_builder: Optional[KeyBuilder] = None,
+                 ttl: int = FSM_TTL, flush_delay: float = FSM_FLUSH_DELAY,
+                 cache_size: int = FSM_CACHE_SIZE, default_state: StateType = None):
+        self.path = path
+        self.default_state = _state_name(default_state)
+        self.key_builder = key_builder or DefaultKeyBuilder(with_destiny=True)
+        self.ttl = ttl
+        self.flush_delay = flush_delay
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[str, _Entry]" = OrderedDict()
+        self._db: Optional[aiosqlite.Connection] = None
+        self._db_lock = asyncio.Lock()
+        self._flush_handle: Optional[asyncio.TimerHandle] = None
+        self._flush_task: Optional[asyncio.Task] = None
+        self._last_cleanup = 0.0
+
+    async def _connection(self) -> aiosqlite.Connection:
+        # FSM juda ko'p chaqiriladi, shuning uchun bitta doimiy ulanish ishlatiladi
+        if self._db is None:
+            self._db = await aiosqlite.connect(self.path)
+            await self._db.execute("PRAGMA journal_mode=WAL")
+            await self._db.execute("""
+                CREATE TABLE IF NOT EXISTS fsm_storage (
+                    key TEXT PRIMARY KEY,
+                    state TEXT,
+                    data BLOB,
+                    updated_at INTEGER NOT NULL
+                ) WITHOUT ROWID
+            """)
+            await self._db.execute("CREATE INDEX IF NOT EXISTS idx_fsm_storage_updated_at ON fsm_storage (updated_at)")
+            await self._db.commit()
+        return self._db
+
+    async def _entry(self, key: StorageKey) -> _Entry:
+        storage_key = self.key_builder.build(key)
+        entry = self._cache.get(storage_key)
+        now = time.time()
+
+        if entry is not None and now - entry.touched_at > self.ttl:
+            entry = None
+            self._cache.pop(storage_key, None)
+
+        if entry is None:
+            async with self._db_lock:
+                db = await self._connection()
+                cursor = await db.execute(
+                    "SELECT state, data, updated_at FROM fsm_storage WHERE key = ?", (storage_key,)
+                )
+                row = await cursor.fetchone()
+            if row and now - row[2] <= self.ttl:
+                loaded = _Entry(row[0], decode_data(row[1]), row[2])
+            else:
+                loaded = _Entry(self.default_state, {}, now)
+            # Kutish paytida boshqa coroutine yuklab, o'zgartirgan bo'lishi mumkin
+            entry = self._cache.setdefault(storage_key, loaded)
+        else:
+            self._cache.move_to_end(storage_key)
+
+        # Faqat o'qilayotgan suhbat ham faol hisoblanadi - vaqtini vaqti-vaqti bilan yangilaymiz
+        if entry.state not in (None, self.default_state) and now - entry.touched_at > self.ttl / 4:
+            self._mark_dirty(entry)
+        return entry
+
+    def _mark_dirty(self, entry: _Entry):
+        entry.dirty = True
+        entry.touched_at = time.time()
+        if self._flush_handle is None and (self._flush_task is None or self._flush_task.done()):
+            loop = asyncio.get_running_loop()
+            self._flush_handle = loop.call_later(self.flush_delay, self._start_flush)
+
+    def _start_flush(self):
+        self._flush_handle = None
+        self._flush_task = asyncio.ensure_future(self.flush())
+
+    async def flush(self):
+        """Keshdagi o'zgarishlarni bazaga yozish"""
+        dirty = [(key, entry) for key, entry in self._cache.items() if entry.dirty]
+        for _, entry in dirty:
+            entry.dirty = False
+
+        upserts = []
+        deletes = []
+        for key, entry in dirty:
+            # Standart holat saqlanmaydi - yo'q yozuv shu holatga teng
+            if entry.state in (None, self.default_state) and not entry.data:
+                deletes.append((key,))
+            else:
+                upserts.append((key, entry.state, encode_data(entry.data), int(entry.touched_at)))
+
+        try:
+            async with self._db_lock:
+                db = await self._connection()
+                if upserts:
+                    await db.executemany("""
+                        INSERT INTO fsm_storage (key, state, data, updated_at) VALUES (?, ?, ?, ?)
+                        ON CONFLICT(key) DO UPDATE SET
+                            state = excluded.state, data = excluded.data, updated_at = excluded.updated_at
+                    """, upserts)
+                if deletes:
+                    await db.executemany("DELETE FROM fsm_storage WHERE key = ?", deletes)
+
+                if time.time() - self._last_cleanup > CLEANUP_INTERVAL:
+                    self._last_cleanup = time.time()
+                    await db.execute("DELETE FROM fsm_storage WHERE updated_at < ?", (int(time.time() - self.ttl),))
+                await db.commit()
+        except Exception as e:
+            logger.error(f"FSM holatini yozishda xatolik: {e}")
+            for _, entry in dirty:
+                entry.dirty = True
+
+        # Keshni chegaralash (faqat yozib bo'lingan yozuvlar chiqariladi)
+        while len(self._cache) > self.cache_size:
+            key, entry = next(iter(self._cache.items()))
+            if entry.dirty:
+                self._cache.move_to_end(key)
+                break
+            self._cache.popitem(last=False)
+
+        # Yozish paytida yangi o'zgarishlar kelgan bo'lsa
+        if any(entry.dirty for entry in self._cache.values()) and self._flush_handle is None:
+            self._flush_handle = asyncio.get_running_loop().call_later(self.flush_delay, self._start_flush)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        entry = await self._entry(key)
+        entry.state = _state_name(state)
+        self._mark_dirty(entry)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        return (await self._entry(key)).state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, not {type(data).__name__}")
+        entry = await self._entry(key)
+        entry.data = data.copy()
+        self._mark_dirty(entry)
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        return (await self._entry(key)).data.copy()
+
+    def gauges(self) -> Dict[str, int]:
+        """Monitoring uchun ko'rsatkichlar"""
+        return {
+            'resident_entries': len(self._cache),
+            'dirty_entries': sum(1 for entry in self._cache.values() if entry.dirty),
+        }
+
+    async def close(self) -> None:
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        if self._flush_task and not self._flush_task.done():
+            await self._flush_task
+        await self.flush()
+        if self._db is not None:
+            await self._db.close()
+            self._db = None
+
+
+class BoundedMemoryStorage(BaseStorage):
+    """Xotirada saqlanadigan, hajmi faol foydalanuvchilar soniga bog'liq FSM storage.
+
+    - TTL dan ko'p harakatsiz yozuvlar timing wheel orqali o'chiriladi;
+    - holat satrlari intern qilinadi, ma'lumot ixcham bytes ko'rinishida saqlanadi;
+    - standart holat (MENU) va bo'sh ma'lumot umuman saqlanmaydi, yo'q yozuv
+      o'qilganda standart holat qaytadi.
+    """
+
+    def __init__(self, ttl: int = FSM_MEMORY_TTL, default_state: StateType = None,
+                 resolution: Optional[int] = None):
+        self.ttl = ttl
+        self.default_state = _state_name(default_state)
+        if self.default_state is not None:
+            self.default_state = sys.intern(self.default_state)
+        # Wheel qadami: TTL ning 1/60 qismi, lekin kamida 1 soniya
+        self.resolution = resolution or max(1, ttl // 60)
+        # key -> (holat, ma'lumot, wheel_slot)
+        self._records: Dict[Tuple, Tuple[Optional[str], Optional[bytes], int]] = {}
+        self._wheel: Dict[int, Set[Tuple]] = {}
+        self._swept_slot = self._slot(time.time())
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+
+    def _slot(self, timestamp: float) -> int:
+        return int(timestamp // self.resolution)
+
+    @staticmethod
+    def _key(key: StorageKey) -> Tuple:
+        return (key.bot_id, key.chat_id, key.user_id, key.thread_id, key.business_connection_id, key.destiny)
+
+    def _sweep(self, now: float):
+        """Muddati o'tgan wheel slotlaridagi yozuvlarni o'chirish"""
+        last_expired = self._slot(now - self.ttl)
+        while self._swept_slot <= last_expired:
+            for record_key in self._wheel.pop(self._swept_slot, ()):
+                self._records.pop(record_key, None)
+                self.evicted += 1
+            self._swept_slot += 1
+
+    def _get(self, key: StorageKey) -> Optional[Tuple[Optional[str], Optional[bytes], int]]:
+        self._sweep(time.time())
+        record = self._records.get(self._key(key))
+        if record is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return record
+
+    def _put(self, key: StorageKey, state: Optional[str], blob: Optional[bytes]):
+        now = time.time()
+        self._sweep(now)
+        record_key = self._key(key)
+        old = self._records.get(record_key)
+        if old is not None:
+            self._wheel.get(old[2], set()).discard(record_key)
+
+        if state in (None, self.default_state) and blob is None:
+            self._records.pop(record_key, None)
+            return
+
+        slot = self._slot(now)
+        self._records[record_key] = (sys.intern(state) if state else state, blob, slot)
+        self._wheel.setdefault(slot, set()).add(record_key)
+
+    async def set_state(self, key: StorageKey, state: StateType = None) -> None:
+        record = self._get(key)
+        self._put(key, _state_name(state), record[1] if record else None)
+
+    async def get_state(self, key: StorageKey) -> Optional[str]:
+        record = self._get(key)
+        return record[0] if record else self.default_state
+
+    async def set_data(self, key: StorageKey, data: Mapping[str, Any]) -> None:
+        if not isinstance(data, dict):
+            raise TypeError(f"Data must be a dict, not {type(data).__name__}")
+        record = self._get(key)
+        self._put(key, record[0] if record else self.default_state, encode_data(data))
+
+    async def get_data(self, key: StorageKey) -> Dict[str, Any]:
+        record = self._get(key)
+        return decode_data(record[1]) if record else {}
+
+    def gauges(self) -> Dict[str, int]:
+        """Monitoring uchun ko'rsatkichlar"""
+        data_bytes = sum(len(record[1]) for record in self._records.values() if record[1])
+        return {
+            'resident_entries': len(self._records),
+            'wheel_slots': len(self._wheel),
+            # Taxminiy: dict yozuvi + kalit tuple + qiymat tuple ~ 250 bayt
+            'approx_bytes': len(self._records) * 250 + data_bytes,
+            'data_bytes': data_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evicted': self.evicted,
+        }
+
+    async def close(self) -> None:
+        pass
+
+
+def create_storage(default_state: StateType = None) -> BaseStorage:
+    """FSM_STORAGE bo'yicha storage tanlash: sqlite (standart) yoki memory"""
+    if FSM_STORAGE == "memory":
+        return BoundedMemoryStorage(default_state=default_state)
+    return SQLiteStorage(default_state=default_state)
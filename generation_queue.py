@@ -0,0 +1,229 @@
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+GENERATION_CONCURRENCY = int(os.getenv("GENERATION_CONCURRENCY", "6"))
+# Har bir tarif uchun ajratilgan slotlar (boshqa tariflar ularni egallay olmaydi)
+GENERATION_RESERVED = os.getenv("GENERATION_RESERVED", "SMART=1,STANDARD=1")
+# Navbatda shuncha soniya kutgan buyurtma bir pog'ona yuqori tarif bilan tenglashadi
+GENERATION_AGING_SECONDS = float(os.getenv("GENERATION_AGING_SECONDS", "60"))
+# Navbatda kutish uchun maqsad (p95, soniya) - pullik tariflar
+GENERATION_WAIT_SLO = os.getenv("GENERATION_WAIT_SLO", "SMART=30,STANDARD=60")
+# Ustuvorlik tartibi; bo'sh bo'lsa TARIFFS dagi sahifa narxi bo'yicha (qimmatrog'i oldinda)
+GENERATION_PRIORITIES = os.getenv("GENERATION_PRIORITIES", "")
+WAIT_SAMPLES = 1000
+
+
+def parse_tariff_map(spec: str) -> Dict[str, float]:
+    """'SMART=1,STANDARD=1' -> {'SMART': 1.0, 'STANDARD': 1.0}"""
+    result = {}
+    for item in spec.split(","):
+        if "=" in item:
+            tariff, value = item.split("=", 1)
+            result[tariff.strip()] = float(value)
+    return result
+
+
+def tariff_priorities() -> Dict[str, float]:
+    """Tarif -> asosiy ustuvorlik (0 - eng yuqori)"""
+    if GENERATION_PRIORITIES:
+        return parse_tariff_map(GENERATION_PRIORITIES)
+    from handlers.common import TARIFFS
+
+    ranked = sorted(TARIFFS, key=lambda tariff: -TARIFFS[tariff]["price_per_page"])
+    return {tariff: float(rank) for rank, tariff in enumerate(ranked)}
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 2)
+
+
+class _Job:
+    __slots__ = ("tariff", "key", "enqueued_at", "future")
+
+    def __init__(self, tariff: str, key: float, future: asyncio.Future):
+        self.tariff = tariff
+        self.key = key
+        self.enqueued_at = time.monotonic()
+        self.future = future
+
+
+class GenerationQueue:
+    """Taqdimot generatsiyalari uchun tarif ustuvorligi, aging va ajratilgan slotlar.
+
+    Bir vaqtda `concurrency` tagacha generatsiya ishlaydi, qolganlari navbatda kutadi.
+    Bo'shagan slot eng kichik samarali ustuvorlikdagi buyurtmaga beriladi:
+    ustuvorlik - kutgan_soniya / aging_seconds. Aging hamma uchun bir xil tezlikda bo'lgani
+    uchun tartib kaliti o'zgarmaydi: ustuvorlik + navbatga kirgan_vaqt / aging_seconds.
+    Shu sabab har bir tarifning navbati oddiy FIFO, bepul buyurtmalar esa och qolmaydi.
+
+    Ajratilgan slotlar: tarifda hozir ishlayotganlar `reserved` dan kam bo'lsa, shuncha slot
+    boshqa tariflarga berilmaydi - SMART to'lqin ortida ham darhol boshlanadi. Ajratilgan
+    tariflarda navbat bo'lmasa, bo'sh slot boshqalarga beriladi. Ajratilganlar yig'indisi
+    har doim `concurrency` dan kam (kamida bitta slot hamma uchun ochiq).
+    """
+
+    def __init__(self, concurrency: int = GENERATION_CONCURRENCY,
+                 reserved: Optional[Dict[str, float]] = None,
+                 aging_seconds: float = GENERATION_AGING_SECONDS,
+                 slo: Optional[Dict[str, float]] = None,
+                 priorities: Optional[Dict[str, float]] = None):
+        self.concurrency = max(1, concurrency)
+        self.reserved = self._fit_reserved(parse_tariff_map(GENERATION_RESERVED) if reserved is None else reserved)
+        self.aging_seconds = max(aging_seconds, 0.001)
+        self.slo = parse_tariff_map(GENERATION_WAIT_SLO) if slo is None else slo
+        self._priorities = priorities
+        self._waiting: Dict[str, Deque[_Job]] = defaultdict(deque)
+        self._running: Dict[str, int] = defaultdict(int)
+        self._tasks = set()
+        self._waits: Dict[str, Deque[float]] = defaultdict(lambda: deque(maxlen=WAIT_SAMPLES))
+        self._slo_misses: Dict[str, int] = defaultdict(int)
+        self.submitted = 0
+
+    def _fit_reserved(self, reserved: Dict[str, float]) -> Dict[str, int]:
+        """Ajratilgan slotlarni concurrency - 1 gacha kamaytirish (ro'yxat oxiridagi tariflardan)"""
+        fitted = {tariff: int(count) for tariff, count in reserved.items() if int(count) > 0}
+        excess = sum(fitted.values()) - (self.concurrency - 1)
+        if excess > 0:
+            for tariff in reversed(list(fitted)):
+                cut = min(excess, fitted[tariff])
+                fitted[tariff] -= cut
+                excess -= cut
+            logger.warning(f"GENERATION_RESERVED ({reserved}) concurrency={self.concurrency} uchun ko'p - "
+                           f"{fitted} ishlatiladi")
+        return fitted
+
+    @property
+    def priorities(self) -> Dict[str, float]:
+        if self._priorities is None:
+            self._priorities = tariff_priorities()
+        return self._priorities
+
+    def _base_priority(self, tariff: str) -> float:
+        # Noma'lum tarif eng pastda
+        return self.priorities.get(tariff, max(self.priorities.values(), default=0) + 1)
+
+    def submit(self, tariff: str, factory: Callable[[float], Awaitable[Any]]) -> asyncio.Task:
+        """Generatsiyani navbatga qo'yish. factory(kutilgan_soniya) slot berilganda chaqiriladi.
+
+        Qaytgan task navbatda kutish va ishning o'zini o'z ichiga oladi.
+        """
+        self.submitted += 1
+        task = asyncio.create_task(self._run(tariff, factory))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+        return task
+
+    async def _run(self, tariff: str, factory: Callable[[float], Awaitable[Any]]):
+        loop = asyncio.get_running_loop()
+        job = _Job(tariff, 0.0, loop.create_future())
+        job.key = self._base_priority(tariff) + job.enqueued_at / self.aging_seconds
+        self._waiting[tariff].append(job)
+        self._dispatch()
+        try:
+            await job.future
+        except asyncio.CancelledError:
+            if job.future.done() and not job.future.cancelled():
+                # Slot berilgan edi - qaytarish
+                self._release(tariff)
+            raise
+
+        waited = time.monotonic() - job.enqueued_at
+        self._record_wait(tariff, waited)
+        try:
+            return await factory(waited)
+        finally:
+            self._release(tariff)
+
+    def _release(self, tariff: str):
+        self._running[tariff] -= 1
+        self._dispatch()
+
+    def _can_start(self, tariff: str, free: int) -> bool:
+        # Boshqa tariflar uchun hali band qilinmagan ajratilgan slotlar
+        held = sum(max(0, count - self._running[other])
+                   for other, count in self.reserved.items() if other != tariff)
+        if free > held:
+            return True
+        # Ajratilgan tariflarda kutayotgan buyurtma bo'lmasa slot bekor turmaydi
+        return not any(self._has_waiting(other)
+                       for other, count in self.reserved.items() if other != tariff and count > 0)
+
+    def _has_waiting(self, tariff: str) -> bool:
+        # get: _dispatch _waiting ustida aylanayotganda yangi kalit qo'shilmasin
+        return any(not job.future.done() for job in self._waiting.get(tariff, ()))
+
+    def _dispatch(self):
+        """Bo'sh slotlarni navbatdagi eng ustuvor buyurtmalarga berish"""
+        while True:
+            free = self.concurrency - sum(self._running.values())
+            if free <= 0:
+                return
+            best = None
+            for tariff, jobs in self._waiting.items():
+                while jobs and jobs[0].future.done():
+                    jobs.popleft()
+                if jobs and self._can_start(tariff, free) and (best is None or jobs[0].key < best.key):
+                    best = jobs[0]
+            if best is None:
+                return
+            self._waiting[best.tariff].popleft()
+            self._running[best.tariff] += 1
+            best.future.set_result(None)
+
+    def _record_wait(self, tariff: str, waited: float):
+        self._waits[tariff].append(waited)
+        slo = self.slo.get(tariff)
+        if slo is not None and waited > slo:
+            self._slo_misses[tariff] += 1
+            logger.warning(f"Generatsiya navbati: {tariff} buyurtmasi {waited:.1f} s kutdi (SLO {slo:.0f} s)")
+
+    def position(self, tariff: str) -> int:
+        """Yangi buyurtma hozir navbatga kirsa, oldida nechta buyurtma bo'ladi (taxminiy)"""
+        key = self._base_priority(tariff) + time.monotonic() / self.aging_seconds
+        return sum(1 for jobs in self._waiting.values() for job in jobs
+                   if not job.future.done() and job.key <= key)
+
+    async def drain(self, timeout: Optional[float] = None):
+        """Navbatdagi va ishlayotgan barcha generatsiyalar tugashini kutish"""
+        if self._tasks:
+            await asyncio.wait(set(self._tasks), timeout=timeout)
+
+    def snapshot(self) -> Dict[str, Any]:
+        tariffs = set(self._waiting) | set(self._running) | set(self._waits)
+        per_tariff = {}
+        for tariff in sorted(tariffs, key=self._base_priority):
+            waits = list(self._waits[tariff])
+            p95 = _percentile(waits, 0.95)
+            slo = self.slo.get(tariff)
+            per_tariff[tariff] = {
+                "waiting": sum(1 for job in self._waiting[tariff] if not job.future.done()),
+                "running": self._running[tariff],
+                "reserved": int(self.reserved.get(tariff, 0)),
+                "started": len(waits),
+                "wait_p50_s": _percentile(waits, 0.5),
+                "wait_p95_s": p95,
+                "wait_max_s": round(max(waits), 2) if waits else 0.0,
+                "slo_s": slo,
+                "slo_misses": self._slo_misses[tariff],
+                "slo_ok": None if slo is None else p95 <= slo,
+            }
+        return {
+            "concurrency": self.concurrency,
+            "running": sum(self._running.values()),
+            "submitted": self.submitted,
+            "tariffs": per_tariff,
+        }
+
+
+# Jarayon bo'ylab yagona navbat
+generation_queue = GenerationQueue()
@@ -0,0 +1,244 @@
+import asyncio
+import cProfile
+import io
+import logging
+import os
+import pstats
+import random
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Deque, Dict, List, Optional, Tuple
+
+from aiogram import BaseMiddleware, Dispatcher
+from aiogram.types import TelegramObject, Update
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+HANDLER_SLOW_MS = float(os.getenv("HANDLER_SLOW_MS", "1000"))
+HANDLER_PROFILE_RATE = float(os.getenv("HANDLER_PROFILE_RATE", "0.02"))
+HANDLER_SLOW_SAMPLES = int(os.getenv("HANDLER_SLOW_SAMPLES", "50"))
+
+# Histogram chegaralari (ms), oxirgisi - qolgan hammasi
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, float("inf"))
+PROFILE_LINES = 25
+UNHANDLED = "unhandled"
+
+
+class Histogram:
+    """Bitta (handler, update turi) uchun davomiylik histogrammasi"""
+
+    __slots__ = ("count", "total_ms", "max_ms", "slow", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.slow = 0
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def observe(self, duration_ms: float, slow: bool):
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+        self.slow += slow
+        for i, bound in enumerate(BUCKETS_MS):
+            if duration_ms <= bound:
+                self.buckets[i] += 1
+                break
+
+    def percentile(self, q: float) -> float:
+        """Histogramdan taxminiy percentil (bucket yuqori chegarasi, oxirgisi uchun max)"""
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return round(min(bound, self.max_ms), 1)
+        return round(self.max_ms, 1)
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total_ms / self.count, 1) if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "p99_ms": self.percentile(0.99),
+            "max_ms": round(self.max_ms, 1),
+            "slow": self.slow,
+        }
+
+
+def _format_task_stack(task: asyncio.Task, limit: int = 40) -> str:
+    """Task qayerda kutib turganini (await zanjiri bo'ylab) matn ko'rinishida olish.
+
+    Task.print_stack() to'xtab turgan korutinaning faqat tashqi freymini ko'rsatadi,
+    shuning uchun cr_await zanjiri qo'lda aylanib chiqiladi.
+    """
+    frames = []
+    awaitable = task.get_coro()
+    while awaitable is not None and len(frames) < limit:
+        frame = (getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+                 or getattr(awaitable, "ag_frame", None))
+        if frame is None:
+            break
+        frames.append(traceback.FrameSummary(frame.f_code.co_filename, frame.f_lineno, frame.f_code.co_name))
+        awaitable = (getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+                     or getattr(awaitable, "ag_await", None))
+
+    text = "".join(traceback.StackSummary.from_list(frames).format())
+    if awaitable is not None:
+        text += f"  kutilmoqda: {awaitable!r}\n"
+    return text
+
+
+class HandlerMetrics:
+    """Handler davomiyligi histogrammalari va sekin chaqiruvlar namunalari (halqa bufer)"""
+
+    def __init__(self, slow_ms: float = HANDLER_SLOW_MS, profile_rate: float = HANDLER_PROFILE_RATE,
+                 max_samples: int = HANDLER_SLOW_SAMPLES):
+        self.slow_ms = slow_ms
+        self.profile_rate = profile_rate
+        self.histograms: Dict[Tuple[str, str], Histogram] = {}
+        self.samples: Deque[Dict[str, Any]] = deque(maxlen=max_samples)
+        self._sample_id = 0
+        # Bir vaqtda faqat bitta cProfile ishlashi mumkin
+        self._profiling = False
+
+    def observe(self, handler: str, update_type: str, duration_ms: float):
+        key = (handler, update_type)
+        histogram = self.histograms.get(key)
+        if histogram is None:
+            histogram = self.histograms[key] = Histogram()
+        histogram.observe(duration_ms, duration_ms >= self.slow_ms)
+
+    def add_sample(self, handler: str, update_type: str, duration_ms: float,
+                   kind: str, text: str, user_id: Optional[int] = None):
+        self._sample_id += 1
+        self.samples.append({
+            "id": self._sample_id,
+            "at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+            "handler": handler,
+            "update_type": update_type,
+            "duration_ms": round(duration_ms, 1),
+            "user_id": user_id,
+            "kind": kind,
+            "text": text,
+        })
+
+    def get_sample(self, sample_id: int) -> Optional[Dict[str, Any]]:
+        for sample in self.samples:
+            if sample["id"] == sample_id:
+                return sample
+        return None
+
+    def slowest(self, limit: int = 10) -> List[Dict[str, Any]]:
+        """p95 bo'yicha eng sekin handlerlar"""
+        rows = [
+            {"handler": handler, "update_type": update_type, **histogram.summary()}
+            for (handler, update_type), histogram in self.histograms.items()
+        ]
+        rows.sort(key=lambda row: (row["p95_ms"], row["max_ms"]), reverse=True)
+        return rows[:limit]
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "slow_ms": self.slow_ms,
+            "handlers": self.slowest(limit=len(self.histograms)),
+            "samples": [{k: v for k, v in s.items() if k != "text"} for s in self.samples],
+        }
+
+
+# Jarayon bo'ylab yagona yig'uvchi
+handler_metrics = HandlerMetrics()
+
+
+class HandlerNameMiddleware(BaseMiddleware):
+    """Ichki middleware: tanlangan handler nomini tashqi middleware'ga yetkazadi"""
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        timing = data.get("handler_timing")
+        handler_object = data.get("handler")
+        if timing is not None and handler_object is not None:
+            callback = handler_object.callback
+            module = getattr(callback, "__module__", "").rsplit(".", 1)[-1]
+            timing["handler"] = f"{module}.{getattr(callback, '__name__', repr(callback))}"
+        return await handler(event, data)
+
+
+class HandlerTimingMiddleware(BaseMiddleware):
+    """Tashqi middleware: har bir update'ni handler nomi va update turi bo'yicha o'lchaydi.
+
+    Chegara (HANDLER_SLOW_MS) oshsa, o'sha paytdagi task steki yoziladi. Chaqiruvlarning
+    HANDLER_PROFILE_RATE qismi cProfile ostida ishlaydi va sekin bo'lsa profili saqlanadi
+    (profil shu vaqtda ishlagan boshqa tasklarni ham o'z ichiga oladi).
+    """
+
+    def __init__(self, metrics: HandlerMetrics = handler_metrics):
+        self.metrics = metrics
+
+    async def __call__(self, handler: Callable[[TelegramObject, Dict[str, Any]], Awaitable[Any]],
+                       event: TelegramObject, data: Dict[str, Any]) -> Any:
+        update_type = event.event_type if isinstance(event, Update) else type(event).__name__
+        timing: Dict[str, Any] = {}
+        data["handler_timing"] = timing
+
+        # Chegaradan oshganda handler qayerda turganini yozib olish
+        task = asyncio.current_task()
+        stack_timer = None
+        if task is not None:
+            def capture_stack():
+                timing["stack"] = _format_task_stack(task)
+            stack_timer = asyncio.get_running_loop().call_later(self.metrics.slow_ms / 1000, capture_stack)
+
+        profiler = None
+        if not self.metrics._profiling and random.random() < self.metrics.profile_rate:
+            self.metrics._profiling = True
+            profiler = cProfile.Profile()
+            profiler.enable()
+
+        started = time.perf_counter()
+        try:
+            return await handler(event, data)
+        finally:
+            duration_ms = (time.perf_counter() - started) * 1000
+            if profiler is not None:
+                profiler.disable()
+                self.metrics._profiling = False
+            if stack_timer is not None:
+                stack_timer.cancel()
+
+            name = timing.get("handler", UNHANDLED)
+            self.metrics.observe(name, update_type, duration_ms)
+            if duration_ms >= self.metrics.slow_ms:
+                self._record_slow(name, update_type, duration_ms, timing, profiler, data)
+
+    def _record_slow(self, name: str, update_type: str, duration_ms: float,
+                     timing: Dict[str, Any], profiler: Optional[cProfile.Profile], data: Dict[str, Any]):
+        user = data.get("event_from_user")
+        user_id = user.id if user else None
+        if profiler is not None:
+            out = io.StringIO()
+            pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(PROFILE_LINES)
+            kind, text = "profile", out.getvalue()
+        elif "stack" in timing:
+            kind, text = "stack", timing["stack"]
+        else:
+            # Event loop bloklangan: taymer handler tugagunicha ishlay olmadi
+            kind, text = "blocked", "Stek olinmadi: handler event loop'ni bloklagan (sinxron kod)."
+        self.metrics.add_sample(name, update_type, duration_ms, kind, text, user_id)
+        logger.warning(f"Sekin handler: {name} ({update_type}) {duration_ms:.0f} ms, namuna: {kind}")
+
+
+def setup_handler_metrics(dp: Dispatcher, metrics: HandlerMetrics = handler_metrics):
+    """Dispatcher'ga o'lchov middleware'larini ulash (ichki middleware barcha routerlarga tarqaladi)"""
+    dp.update.outer_middleware(HandlerTimingMiddleware(metrics))
+    name_middleware = HandlerNameMiddleware()
+    for event_name, observer in dp.observers.items():
+        if event_name not in ("update", "error"):
+            observer.middleware(name_middleware)
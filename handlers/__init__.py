@@ -0,0 +1,31 @@
+"""Bot handler routerlari.
+
+Tartib muhim: aiogram update'ni birinchi mos kelgan handlerga beradi, shuning uchun
+routerlar eski bot.py dagi ro'yxatdan o'tish tartibini saqlagan holda ulanadi.
+"""
+import importlib
+import logging
+import time
+from typing import Dict
+
+from aiogram import Dispatcher
+
+logger = logging.getLogger(__name__)
+
+ROUTERS = ("onboarding", "ordering", "services", "admin", "payments")
+
+# Router nomi -> import vaqti (ms), /metrics va ishga tushish hisobotida ko'rsatiladi
+ROUTER_IMPORT_MS: Dict[str, float] = {}
+
+
+def setup_routers(dp: Dispatcher) -> Dict[str, float]:
+    """Routerlarni import qilib dispatcher'ga ulash va import vaqtini o'lchash"""
+    for name in ROUTERS:
+        started = time.perf_counter()
+        module = importlib.import_module(f"{__name__}.{name}")
+        ROUTER_IMPORT_MS[name] = round((time.perf_counter() - started) * 1000, 1)
+        dp.include_router(module.router)
+
+    report = ", ".join(f"{name} {ms} ms" for name, ms in ROUTER_IMPORT_MS.items())
+    logger.info(f"Routerlar yuklandi: {report}")
+    return ROUTER_IMPORT_MS
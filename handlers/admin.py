@@ -0,0 +1,623 @@
+"""Admin buyruqlari: ommaviy xabar, bir kishiga xabar, statistika, buyurtma xarajatlari, balans, referral va /slow"""
+from aiogram import Router, types, F
+from aiogram.exceptions import TelegramBadRequest
+from aiogram.filters import Command, CommandObject, StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton, BufferedInputFile
+
+from states import OnboardingStates
+from database_adapter import (
+    get_user_by_tg_id, get_user_balance, update_user_balance, deduct_user_balance,
+    get_referral_rewards, update_referral_rewards, log_action, get_order_cost_report
+)
+from reachability import get_stats_snapshot
+from handler_metrics import handler_metrics
+from loader import bot, broadcast_engine
+from handlers.common import get_main_keyboard, get_admin_keyboard, is_admin
+
+router = Router(name="admin")
+
+
+@router.message(Command("admin"))
+async def admin_panel(message: types.Message, state: FSMContext):
+    """Admin panel"""
+    if not message.from_user or not await is_admin(message.from_user.id):
+        await message.answer("❌ Sizda admin huquqi yo'q!")
+        return
+    
+    await message.answer(
+        "🔧 Admin Panel\n\n"
+        "Quyidagi funksiyalardan birini tanlang:",
+        reply_markup=get_admin_keyboard(),
+    )
+    await state.set_state(OnboardingStates.MENU)
+
+# Admin funksiyalari
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "📢 Ommaviy xabar")
+async def broadcast_menu(message: types.Message, state: FSMContext):
+    """Ommaviy xabar menyusi"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    # Bekor qilish tugmasi
+    cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_broadcast")]
+    ])
+    
+    await message.answer(
+        "📢 Ommaviy xabar yuborish\n\n"
+        "Yubormoqchi bo'lgan xabaringizni yuboring:",
+        reply_markup=cancel_keyboard
+    )
+    await state.set_state(OnboardingStates.BROADCAST_MESSAGE)
+
+# Ommaviy xabar bekor qilish
+@router.callback_query(F.data == "cancel_broadcast")
+async def cancel_broadcast(callback: types.CallbackQuery, state: FSMContext):
+    """Ommaviy xabar yuborishni bekor qilish"""
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    await callback.message.edit_text(
+        "❌ Ommaviy xabar yuborish bekor qilindi!",
+        reply_markup=None
+    )
+    
+    await callback.answer("Ommaviy xabar bekor qilindi!")
+    await state.set_state(OnboardingStates.MENU)
+
+# Ommaviy xabar yuborish funksiyasi
+@router.message(StateFilter(OnboardingStates.BROADCAST_MESSAGE))
+async def process_broadcast_message(message: types.Message, state: FSMContext):
+    """Ommaviy xabarni qayta ishlash"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    try:
+        # Boshlash xabarini yuborish
+        progress_msg = await message.answer("📢 Ommaviy xabar yuborilmoqda...")
+        
+        # Yuborish fonda ketadi, progress xabari vaqt bo'yicha yangilanadi
+        await broadcast_engine.start_job(message.from_user.id, message, progress_message=progress_msg)
+        
+        await message.answer(
+            "✅ Ommaviy xabar navbatga qo'yildi! Natija yuqoridagi xabarda yangilanib boradi.",
+            reply_markup=get_admin_keyboard()
+        )
+        
+    except Exception as e:
+        await message.answer(
+            f"❌ Xabar yuborishda xatolik!\n\n"
+            f"Xatolik: {str(e)}",
+            reply_markup=get_admin_keyboard(),
+        )
+    
+    await state.set_state(OnboardingStates.MENU)
+
+# Bekor qilish tugmasi
+@router.callback_query(F.data == "cancel_broadcast")
+async def cancel_broadcast_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Ommaviy xabarni bekor qilish"""
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    await callback.message.edit_text(
+        "❌ Ommaviy xabar bekor qilindi",
+    )
+    await state.set_state(OnboardingStates.MENU)
+    await callback.answer()
+
+# Bir kishiga xabar bekor qilish
+@router.callback_query(F.data == "cancel_user_message")
+async def cancel_user_message_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Bir kishiga xabarni bekor qilish"""
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    await callback.message.edit_text(
+        "❌ Bir kishiga xabar bekor qilindi",
+    )
+    await state.set_state(OnboardingStates.MENU)
+    await callback.answer()
+
+# Bir kishiga xabar yuborish
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "💬 Bir kishiga xabar")
+async def send_to_user_menu(message: types.Message, state: FSMContext):
+    """Bir kishiga xabar menyusi"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    # Bekor qilish tugmasi
+    cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_user_message")]
+    ])
+    
+    await message.answer(
+        "💬 Bir kishiga xabar yuborish\n\n"
+        "Foydalanuvchi ID sini kiriting:",
+        reply_markup=cancel_keyboard
+    )
+    await state.set_state(OnboardingStates.USER_ID_INPUT)
+
+@router.message(StateFilter(OnboardingStates.USER_ID_INPUT))
+async def process_user_id(message: types.Message, state: FSMContext):
+    """Foydalanuvchi ID ni qayta ishlash"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    try:
+        user_id = int(message.text.strip())
+        user = await get_user_by_tg_id(user_id)
+        
+        if user:
+            await state.update_data(target_user_id=user_id)
+            
+            # Bekor qilish tugmasi
+            cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_user_message")]
+            ])
+            
+            full_name = user.get('name', 'Nomalum')
+            username = user.get('username', 'Nomalum')
+            created_at = user.get('created_at', 'Nomalum')
+            
+            await message.answer(
+                f"✅ Foydalanuvchi topildi!\n\n"
+                f"👤 Ism: {full_name}\n"
+                f"📱 Username: @{username}\n"
+                f"📅 Qo'shilgan: {created_at}\n\n"
+                f"Yubormoqchi bo'lgan xabaringizni yuboring:",
+                reply_markup=cancel_keyboard
+            )
+            await state.set_state(OnboardingStates.USER_MESSAGE)
+        else:
+            await message.answer(
+                "❌ Foydalanuvchi topilmadi!\n\n"
+                "To'g'ri ID kiriting yoki qaytadan urinib ko'ring:",
+                reply_markup=get_admin_keyboard()
+            )
+            await state.set_state(OnboardingStates.MENU)
+            
+    except ValueError:
+        await message.answer(
+            "❌ Noto'g'ri ID format!\n\n"
+            "Faqat raqam kiriting:",
+            reply_markup=get_admin_keyboard()
+        )
+        await state.set_state(OnboardingStates.MENU)
+
+@router.message(StateFilter(OnboardingStates.USER_MESSAGE))
+async def process_user_message(message: types.Message, state: FSMContext):
+    """Foydalanuvchiga xabarni yuborish"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    data = await state.get_data()
+    target_user_id = data.get('target_user_id')
+    
+    try:
+        # Agar xabar matn bo'lsa
+        if message.text:
+            await bot.send_message(
+                chat_id=target_user_id,
+                text=message.text if "" in message.text else None
+            )
+        # Agar xabar forward qilingan bo'lsa
+        elif message.forward_from or message.forward_from_chat:
+            await bot.forward_message(
+                chat_id=target_user_id,
+                from_chat_id=message.chat.id,
+                message_id=message.message_id
+            )
+        # Agar xabar rasm bo'lsa
+        elif message.photo:
+            await bot.send_photo(
+                chat_id=target_user_id,
+                photo=message.photo[-1].file_id,
+                caption=message.caption if message.caption else None
+            )
+        # Agar xabar video bo'lsa
+        elif message.video:
+            await bot.send_video(
+                chat_id=target_user_id,
+                video=message.video.file_id,
+                caption=message.caption if message.caption else None
+            )
+        # Agar xabar hujjat bo'lsa
+        elif message.document:
+            await bot.send_document(
+                chat_id=target_user_id,
+                document=message.document.file_id,
+                caption=message.caption if message.caption else None
+            )
+        # Boshqa holatda
+        else:
+            await bot.copy_message(
+                chat_id=target_user_id,
+                from_chat_id=message.chat.id,
+                message_id=message.message_id
+            )
+        
+        await message.answer(
+            f"✅ Xabar muvaffaqiyatli yuborildi!\n\n"
+            f"👤 Foydalanuvchi ID: {target_user_id}",
+            reply_markup=get_admin_keyboard(),
+        )
+        
+        # Log qilish
+        await log_action(message.from_user.id, "admin_message_sent", {
+            'target_user_id': target_user_id,
+            'message_type': 'text' if message.text else 'media'
+        })
+        
+    except Exception as e:
+        await message.answer(
+            f"❌ Xabar yuborishda xatolik!\n\n"
+            f"Xatolik: {str(e)}",
+            reply_markup=get_admin_keyboard(),
+        )
+    
+    await state.set_state(OnboardingStates.MENU)
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "📊 Statistika")
+async def admin_statistics(message: types.Message):
+    """Admin statistika"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    try:
+        # Fon vazifasi yangilab turadigan snapshotdan o'qish
+        snapshot = await get_stats_snapshot()
+        total_users = snapshot['total']
+        active_users = snapshot['active']
+        activity_rate = (active_users / total_users * 100) if total_users else 0
+        
+        stats_text = (
+            f"📊 Umumiy statistika\n\n"
+            f"👥 Jami foydalanuvchilar: {total_users:,}\n"
+            f"✅ Faol foydalanuvchilar: {active_users:,}\n"
+            f"🚫 Blok qilinganlar: {snapshot['unreachable']:,}\n"
+            f"❔ Hali tekshirilmagan: {snapshot['unknown']:,}\n"
+            f"📈 Faollik darajasi: {activity_rate:.1f}%\n\n"
+            f"🕐 Oxirgi yangilanish: {snapshot['updated_at']}"
+        )
+        
+        costs_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="💸 Buyurtma xarajatlari", callback_data="stats_costs")]
+        ])
+        await message.answer(stats_text, parse_mode="Markdown", reply_markup=costs_keyboard)
+        
+    except Exception as e:
+        await message.answer(
+            f"❌ Statistika olishda xatolik!\n\n"
+            f"Xatolik: {str(e)}",
+        )
+
+def format_order_costs(report: dict) -> str:
+    """get_order_cost_report natijasi - admin uchun matn"""
+    lines = ["💸 Buyurtma xarajatlari (7 kun)", ""]
+    if not report['by_tariff']:
+        lines.append("Hali ma'lumot yo'q")
+    for row in report['by_tariff']:
+        lines.append(
+            f"{row['tariff']}: {row['orders']} ta ({row['completed']} tayyor), ${row['cost_usd']:.2f} "
+            f"(o'rtacha ${row['avg_cost_usd']:.3f})\n"
+            f"  tokenlar: {row['avg_prompt_tokens']:.0f} kirish / {row['avg_completion_tokens']:.0f} chiqish "
+            f"/ {row['avg_cached_tokens']:.0f} kesh, rasmlar: {row['avg_images']} (xato {row['images_failed']}, "
+            f"qayta ishlatilgan {row['images_reused'] or 0})\n"
+            f"  vaqt (s): navbat {row['avg_queue_ms'] / 1000:.1f}, matn {row['avg_text_ms'] / 1000:.1f}, "
+            f"rasm {row['avg_images_ms'] / 1000:.1f}, render {row['avg_render_ms'] / 1000:.1f}, "
+            f"yuborish {row['avg_send_ms'] / 1000:.1f}, jami {row['avg_total_ms'] / 1000:.1f} "
+            f"(max {row['max_total_ms'] / 1000:.1f})"
+        )
+    if report['by_day']:
+        lines += ["", "Kunlar bo'yicha:"]
+        for row in report['by_day']:
+            lines.append(
+                f"{row['day']}: {row['orders']} ta, ${row['cost_usd']:.2f}, "
+                f"o'rtacha {row['avg_total_ms'] / 1000:.1f} s"
+            )
+    return "\n".join(lines)
+
+# Statistika xabaridagi tugma - yangi xabar, "Yangilash" - o'sha xabarni tahrirlash
+@router.callback_query(F.data.in_(["stats_costs", "stats_costs_refresh"]))
+async def show_order_costs(callback: types.CallbackQuery):
+    """Buyurtma xarajatlari va kechikishi (oxirgi 7 kun): tarif va kun bo'yicha"""
+    if not await is_admin(callback.from_user.id):
+        return
+    await callback.answer("💸 Xarajatlar...")
+    
+    text = format_order_costs(await get_order_cost_report(days=7))
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🔄 Yangilash", callback_data="stats_costs_refresh")]
+    ])
+    if callback.data == "stats_costs":
+        await callback.message.answer(text, reply_markup=keyboard)
+        return
+    try:
+        await callback.message.edit_text(text, reply_markup=keyboard)
+    except TelegramBadRequest:
+        # Ma'lumot o'zgarmagan ("message is not modified")
+        pass
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "💰 Balans boshqarish")
+async def balance_management_menu(message: types.Message, state: FSMContext):
+    """Balans boshqarish menyusi"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    # Bekor qilish tugmasi
+    cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_balance")]
+    ])
+    
+    await message.answer(
+        "💰 Balans boshqarish\n\n"
+        "Foydalanuvchi ID sini kiriting:",
+        reply_markup=cancel_keyboard
+    )
+    await state.set_state(OnboardingStates.BALANCE_USER_ID)
+
+@router.message(StateFilter(OnboardingStates.BALANCE_USER_ID))
+async def process_balance_user_id(message: types.Message, state: FSMContext):
+    """Balans boshqarish uchun foydalanuvchi ID ni qayta ishlash"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    try:
+        user_id = int(message.text.strip())
+        user = await get_user_by_tg_id(user_id)
+        
+        if user:
+            balance = await get_user_balance(user_id)
+            await state.update_data(target_user_id=user_id)
+            
+            # Balans boshqarish tugmalari
+            balance_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="➕ Balans qo'shish", callback_data="add_balance")],
+                [InlineKeyboardButton(text="➖ Balans kamaytirish", callback_data="subtract_balance")],
+                [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_balance")]
+            ])
+            
+            full_name = user.get('name', 'Nomalum')
+            username = user.get('username', 'Nomalum')
+            
+            await message.answer(
+                f"👤 Foydalanuvchi: {full_name}\n"
+                f"📱 Username: @{username}\n"
+                f"💳 Joriy balans: {balance['total_balance']:,} so'm\n\n"
+                f"Balans boshqarish uchun amalni tanlang:",
+                reply_markup=balance_keyboard
+            )
+            await state.set_state(OnboardingStates.BALANCE_ACTION)
+        else:
+            await message.answer(
+                "❌ Foydalanuvchi topilmadi!\n\n"
+                "To'g'ri ID kiriting yoki qaytadan urinib ko'ring:",
+                reply_markup=get_admin_keyboard()
+            )
+            await state.set_state(OnboardingStates.MENU)
+            
+    except ValueError:
+        await message.answer(
+            "❌ Noto'g'ri ID format!\n\n"
+            "Faqat raqam kiriting:",
+            reply_markup=get_admin_keyboard()
+        )
+        await state.set_state(OnboardingStates.MENU)
+
+@router.callback_query(F.data.in_(["add_balance", "subtract_balance"]))
+async def balance_action_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Balans amalini tanlash"""
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    action = "qo'shish" if callback.data == "add_balance" else "kamaytirish"
+    emoji = "➕" if callback.data == "add_balance" else "➖"
+    
+    await callback.message.edit_text(
+        f"{emoji} Balans {action}\n\n"
+        f"Qancha so'm {action}ni kiriting:",
+    )
+    
+    await state.update_data(balance_action=callback.data)
+    await state.set_state(OnboardingStates.BALANCE_AMOUNT)
+    await callback.answer()
+
+@router.message(StateFilter(OnboardingStates.BALANCE_AMOUNT))
+async def process_balance_amount(message: types.Message, state: FSMContext):
+    """Balans miqdorini qayta ishlash"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    try:
+        amount = int(message.text.strip())
+        if amount <= 0:
+            raise ValueError("Miqdor musbat bo'lishi kerak")
+        
+        data = await state.get_data()
+        user_id = data.get('target_user_id')
+        action = data.get('balance_action')
+        
+        if action == "add_balance":
+            success = await update_user_balance(user_id, amount, 'cash')
+            if success:
+                action_text = "qo'shildi"
+                emoji = "✅"
+            else:
+                action_text = "qo'shishda xatolik"
+                emoji = "❌"
+        else:
+            success = await deduct_user_balance(user_id, amount)
+            if success:
+                action_text = "kamaytirildi"
+                emoji = "✅"
+            else:
+                action_text = "kamaytirishda xatolik (yetarli mablag' yo'q)"
+                emoji = "❌"
+        
+        # Balansni yangilash
+        balance = await get_user_balance(user_id)
+        user = await get_user_by_tg_id(user_id)
+        
+        full_name = user.get('full_name', 'Nomalum')
+        
+        await message.answer(
+            f"{emoji} Balans muvaffaqiyatli {action_text}!\n\n"
+            f"👤 Foydalanuvchi: {full_name}\n"
+            f"💰 Yangi balans: {balance['total_balance']:,} so'm\n"
+            f"💳 Naqt balans: {balance['cash_balance']:,} so'm\n"
+            f"🎁 Referral balans: {balance['referral_balance']:,} so'm",
+            reply_markup=get_admin_keyboard(),
+        )
+        
+        # Log qilish
+        await log_action(message.from_user.id, "admin_balance_change", {
+            'target_user_id': user_id,
+            'action': action,
+            'amount': amount,
+            'new_balance': balance['total_balance']
+        })
+        
+    except ValueError as e:
+        await message.answer(
+            f"❌ Noto'g'ri miqdor!\n\n"
+            f"Xatolik: {str(e)}\n"
+            f"Faqat musbat raqam kiriting:",
+            reply_markup=get_admin_keyboard()
+        )
+    
+    await state.set_state(OnboardingStates.MENU)
+
+# Balans boshqarish bekor qilish
+@router.callback_query(F.data == "cancel_balance")
+async def cancel_balance_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Balans boshqarishni bekor qilish"""
+    if not await is_admin(callback.from_user.id):
+        return
+    
+    await callback.message.edit_text(
+        "❌ Balans boshqarish bekor qilindi",
+    )
+    await state.set_state(OnboardingStates.MENU)
+    await callback.answer()
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "⚙️ Referral sozlamalari")
+async def referral_settings_menu(message: types.Message):
+    """Referral sozlamalari menyusi"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    # Hozirgi referral sozlamalari
+    rewards = await get_referral_rewards()
+    
+    current_settings = (
+        "⚙️ Referral sozlamalari\n\n"
+        "💰 Hozirgi bonuslar:\n"
+        f"• Taklif qilgan: {rewards['referrer_reward']:,} so'm\n"
+        f"• Taklif qilingan: {rewards['referred_reward']:,} so'm\n\n"
+        "📝 Sozlash uchun:\n"
+        "Quyidagi formatda yuboring:\n"
+        "`referral: taklif_qilgan: 1500, taklif_qilingan: 700`"
+    )
+    
+    await message.answer(
+        current_settings,
+    )
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "🏠 Asosiy menyu")
+async def back_to_main_menu(message: types.Message):
+    """Asosiy menyuga qaytish"""
+    await message.answer(
+        "🏠 Asosiy menyu\n\n"
+        "Quyidagi tugmalardan birini tanlang:",
+        reply_markup=get_main_keyboard(),
+    )
+
+# Referral sozlamalarini qabul qilish
+@router.message(StateFilter(OnboardingStates.MENU), F.text.regexp(r'^referral:\s*taklif_qilgan:\s*(\d+),\s*taklif_qilingan:\s*(\d+)$'))
+async def process_referral_settings(message: types.Message):
+    """Referral sozlamalarini qabul qilish"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    try:
+        # Matnni parse qilish
+        text = message.text.strip()
+        parts = text.split(',')
+        
+        referrer_amount = int(parts[0].split(':')[2].strip())
+        referred_amount = int(parts[1].split(':')[1].strip())
+        
+        # Referral bonuslarini yangilash
+        success = await update_referral_rewards(referrer_amount, referred_amount)
+        
+        if success:
+            await message.answer(
+                f"✅ Referral sozlamalari yangilandi!\n\n"
+                f"💰 Yangi bonuslar:\n"
+                f"• Taklif qilgan: {referrer_amount:,} so'm\n"
+                f"• Taklif qilingan: {referred_amount:,} so'm\n\n"
+                f"🔄 Endi yangi referrallar uchun bu bonuslar ishlatiladi.",
+            )
+            
+            # Log qilish
+            await log_action(message.from_user.id, "admin_referral_settings_changed", {
+                'referrer_reward': referrer_amount,
+                'referred_reward': referred_amount
+            })
+        else:
+            await message.answer(
+                "❌ Sozlamalarni yangilashda xatolik!\n\n"
+                "Iltimos, qaytadan urinib ko'ring.",
+            )
+            
+    except Exception as e:
+        await message.answer(
+            f"❌ Noto'g'ri format!\n\n"
+            f"To'g'ri format: `referral: taklif_qilgan: 1500, taklif_qilingan: 700`\n\n"
+            f"Xatolik: {str(e)}",
+        )
+
+# Sekin handlerlar: /slow - ro'yxat, /slow <id> - namuna (stek yoki profil) fayl sifatida
+@router.message(Command("slow"))
+async def slow_handlers(message: types.Message, command: CommandObject):
+    """Eng sekin handlerlar va ularning namunalari"""
+    if not await is_admin(message.from_user.id):
+        return
+    
+    if command.args and command.args.strip().isdigit():
+        sample = handler_metrics.get_sample(int(command.args.strip()))
+        if not sample:
+            await message.answer("❌ Bunday namuna topilmadi (bufer to'lganda eskilari o'chadi).")
+            return
+        header = (
+            f"{sample['handler']} ({sample['update_type']}) - {sample['duration_ms']:.0f} ms\n"
+            f"Vaqt: {sample['at']}, foydalanuvchi: {sample['user_id']}, turi: {sample['kind']}\n\n"
+        )
+        await message.answer_document(
+            BufferedInputFile((header + sample['text']).encode('utf-8'), filename=f"slow_{sample['id']}.txt"),
+            caption=f"🐢 Namuna #{sample['id']}: {sample['handler']} {sample['duration_ms']:.0f} ms"
+        )
+        return
+    
+    rows = handler_metrics.slowest(limit=10)
+    if not rows:
+        await message.answer("📭 Hali o'lchangan handlerlar yo'q.")
+        return
+    
+    lines = [f"🐢 Eng sekin handlerlar (p95 bo'yicha, chegara {handler_metrics.slow_ms:.0f} ms)\n"]
+    for row in rows:
+        lines.append(
+            f"• {row['handler']} [{row['update_type']}]\n"
+            f"  {row['count']} ta, o'rtacha {row['avg_ms']:.0f} ms, p95 {row['p95_ms']:.0f} ms, "
+            f"max {row['max_ms']:.0f} ms, sekin: {row['slow']}"
+        )
+    
+    samples = list(handler_metrics.samples)[-10:]
+    if samples:
+        lines.append("\n📋 Oxirgi sekin chaqiruvlar (/slow <id>):")
+        for sample in reversed(samples):
+            lines.append(f"#{sample['id']} {sample['at']} {sample['handler']} {sample['duration_ms']:.0f} ms ({sample['kind']})")
+    
+    await message.answer("\n".join(lines))
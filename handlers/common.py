@@ -0,0 +1,104 @@
+"""Routerlar uchun umumiy: tariflar, klaviaturalar va admin tekshiruvi"""
+from aiogram.types import ReplyKeyboardMarkup, KeyboardButton, InlineKeyboardMarkup, InlineKeyboardButton
+from aiogram.utils.keyboard import ReplyKeyboardBuilder, InlineKeyboardBuilder
+
+from loader import ADMIN_IDS
+
+
+# Tariflar haqida ma'lumot
+TARIFFS = {
+    "START": {
+        "name": "Start tarifi 🚀",
+        "price": "Bepul (1 marta)",
+        "price_per_page": 2000,
+        "features": ["1 marta bepul", "Har sahifa 2000 so'm", "PPT format"]
+    },
+    "STANDARD": {
+        "name": "Standard tarifi 💎",
+        "price": "4,500 so'm", 
+        "price_per_page": 4500,
+        "features": ["Professional dizayn", "PPT format"]
+    },
+    "SMART": {
+        "name": "Smart tarifi 🧠",
+        "price": "6,500 so'm", 
+        "price_per_page": 6500,
+        "features": ["Smart dizayn", "PPT + PDF format", "AI optimizatsiya"]
+    }
+}
+
+def get_main_keyboard() -> ReplyKeyboardMarkup:
+    """Asosiy menyu klaviaturasi"""
+    builder = ReplyKeyboardBuilder()
+    # Birinchi qator - 2 ta tugma
+    builder.row(
+        KeyboardButton(text="📊 Taqdimot tayyorlash"),
+        KeyboardButton(text="📝 Mustaqil ishlar")
+    )
+    # Ikkinchi qator - 2 ta tugma
+    builder.row(
+        KeyboardButton(text="🔧 Boshqa xizmatlar"),
+        KeyboardButton(text="🎮 Sehrli o'yin")
+    )
+    # Uchinchi qator - 2 ta tugma
+    builder.row(
+        KeyboardButton(text="💰 Balansim"),
+        KeyboardButton(text="ℹ️ Bot haqida")
+    )
+    # To'rtinchi qator - 1 ta tugma
+    builder.row(KeyboardButton(text="📞 Aloqa uchun"))
+    return builder.as_markup(resize_keyboard=True, one_time_keyboard=False)
+
+# Admin tekshirish funksiyasi
+async def is_admin(user_id: int) -> bool:
+    """Foydalanuvchi admin ekanligini tekshirish"""
+    return user_id in ADMIN_IDS
+
+def get_admin_keyboard() -> ReplyKeyboardMarkup:
+    """Admin asosiy klaviaturasi"""
+    builder = ReplyKeyboardBuilder()
+    # Birinchi qator - 2 ta tugma
+    builder.row(
+        KeyboardButton(text="📢 Ommaviy xabar"),
+        KeyboardButton(text="💬 Bir kishiga xabar")
+    )
+    # Ikkinchi qator - 2 ta tugma
+    builder.row(
+        KeyboardButton(text="📊 Statistika"),
+        KeyboardButton(text="💰 Balans boshqarish")
+    )
+    # Uchinchi qator - 1 ta tugma
+    builder.row(
+        KeyboardButton(text="⚙️ Referral sozlamalari")
+    )
+    # To'rtinchi qator - 1 ta tugma
+    builder.row(
+        KeyboardButton(text="🏠 Asosiy menyu")
+    )
+    return builder.as_markup(resize_keyboard=True, one_time_keyboard=False)
+
+def get_contact_keyboard() -> ReplyKeyboardMarkup:
+    """Kontakt bo'lishish klaviaturasi"""
+    builder = ReplyKeyboardBuilder()
+    builder.row(KeyboardButton(text="📱 Telefon raqamni bo'lishish", request_contact=True))
+    builder.row(KeyboardButton(text="⏩ O'tkazib yuborish"))
+    return builder.as_markup(resize_keyboard=True, one_time_keyboard=True)
+
+def get_tariff_keyboard() -> InlineKeyboardMarkup:
+    """Tarif tanlash uchun inline klaviatura"""
+    builder = InlineKeyboardBuilder()
+    
+    for tariff_key, tariff_info in TARIFFS.items():
+        builder.row(InlineKeyboardButton(
+            text=f"{tariff_info['name']} - {tariff_info['price']}",
+            callback_data=f"tariff_{tariff_key}"
+        ))
+    
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_menu"))
+    return builder.as_markup()
+
+def get_back_keyboard() -> InlineKeyboardMarkup:
+    """Orqaga qaytish uchun klaviatura"""
+    builder = InlineKeyboardBuilder()
+    builder.row(InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_menu"))
+    return builder.as_markup()
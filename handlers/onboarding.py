@@ -0,0 +1,154 @@
+"""Ro'yxatdan o'tish: /start, ism va telefon raqami"""
+import logging
+
+from aiogram import Router, types, F
+from aiogram.filters import Command, StateFilter
+from aiogram.fsm.context import FSMContext
+
+from states import OnboardingStates
+from database_adapter import get_user_by_tg_id, create_user, create_referral
+from handlers.common import get_main_keyboard, get_contact_keyboard
+
+router = Router(name="onboarding")
+
+
+@router.message(Command("start"))
+async def start_handler(message: types.Message, state: FSMContext):
+    """Bot ishga tushganda birinchi handler"""
+    try:
+        if not message.from_user:
+            return
+        
+        # Referral havola tekshirish
+        referral_id = None
+        if len(message.text.split()) > 1:
+            start_param = message.text.split()[1]
+            if start_param.startswith('ref_'):
+                try:
+                    referral_id = int(start_param.replace('ref_', ''))
+                    # Agar o'zini taklif qilmoqchi bo'lsa
+                    if referral_id == message.from_user.id:
+                        referral_id = None
+                except ValueError:
+                    referral_id = None
+        
+        user = await get_user_by_tg_id(message.from_user.id)
+        
+        if user:
+            # Agar foydalanuvchi mavjud bo'lsa, menyuga o'tkazish
+            full_name = user.get('name', 'Foydalanuvchi')
+            await message.answer(
+                f"Assalomu alaykum, {full_name}! 👋\n\n"
+                "Qaytganingizdan xursandmiz. Quyidagi tugmalardan birini tanlang:",
+                reply_markup=get_main_keyboard()
+            )
+            await state.set_state(OnboardingStates.MENU)
+        else:
+            # Yangi foydalanuvchi uchun ro'yxatdan o'tish
+            welcome_text = (
+                "Assalomu alaykum va xush kelibsiz! 👋\n\n"
+                "Men sizga professional taqdimotlar tayyorlashda yordam beradigan botman.\n\n"
+            )
+            
+            # Agar referral havola orqali kelgan bo'lsa
+            if referral_id:
+                referrer = await get_user_by_tg_id(referral_id)
+                if referrer:
+                    referrer_name = referrer.get('full_name', 'Do\'stingiz')
+                    welcome_text += f"🎉 Sizni {referrer_name} taklif qildi!\n\n"
+                    # Referral yaratish
+                    await create_referral(referral_id, message.from_user.id)
+            
+            welcome_text += "Keling, tanishib olaylik! Ism-familiyangizni kiriting:"
+            
+            await message.answer(
+                welcome_text,
+                reply_markup=types.ReplyKeyboardRemove()
+            )
+            await state.set_state(OnboardingStates.ASK_FULLNAME)
+    
+    except Exception as e:
+        logging.error(f"Start handler xatoligi: {e}")
+        await message.answer(
+            "❌ Xatolik yuz berdi. Iltimos, qaytadan urinib ko'ring.",
+            reply_markup=types.ReplyKeyboardRemove()
+        )
+
+@router.message(StateFilter(OnboardingStates.ASK_FULLNAME))
+async def process_fullname(message: types.Message, state: FSMContext):
+    """Ism-familiyani qayta ishlash"""
+    full_name = message.text.strip()
+    
+    if len(full_name) < 2:
+        await message.answer("Iltimos, to'liq ism-familiyangizni kiriting:")
+        return
+    
+    await state.update_data(full_name=full_name)
+    
+    await message.answer(
+        f"Rahmat, {full_name}! 👍\n\n"
+        "Endi telefon raqamingizni bo'lishingiz mumkin yoki o'tkazib yuborishingiz mumkin:",
+        reply_markup=get_contact_keyboard()
+    )
+    await state.set_state(OnboardingStates.ASK_CONTACT)
+
+@router.message(StateFilter(OnboardingStates.ASK_CONTACT), F.contact)
+async def process_contact(message: types.Message, state: FSMContext):
+    """Kontakt ma'lumotlarini qayta ishlash"""
+    contact = message.contact
+    
+    await state.update_data(
+        phone=contact.phone_number,
+        contact_shared=True
+    )
+    
+    await finish_registration(message, state)
+
+@router.message(StateFilter(OnboardingStates.ASK_CONTACT), F.text == "⏩ O'tkazib yuborish")
+async def skip_contact(message: types.Message, state: FSMContext):
+    """Kontaktni o'tkazib yuborish"""
+    await state.update_data(
+        phone=None,
+        contact_shared=False
+    )
+    
+    await finish_registration(message, state)
+
+async def finish_registration(message: types.Message, state: FSMContext):
+    """Ro'yxatdan o'tishni yakunlash"""
+    data = await state.get_data()
+    
+    if not message.from_user:
+        return
+    
+    # Foydalanuvchini ma'lumotlar bazasiga saqlash
+    user_data = {
+        'tg_id': message.from_user.id,
+        'username': message.from_user.username,
+        'full_name': data.get('full_name'),
+        'phone': data.get('phone'),
+        'contact_shared': data.get('contact_shared', False)
+    }
+    
+    await create_user(user_data)
+    
+    # Referral funksiyalari hozircha ishlamaydi
+    referral_confirmed = False
+    
+    welcome_text = (
+        f"🎉 Ro'yxatdan o'tish muvaffaqiyatli yakunlandi!\n\n"
+        f"Salom, {data.get('full_name')}! Endi siz botning barcha imkoniyatlaridan foydalanishingiz mumkin.\n\n"
+    )
+    
+    # Agar referral tasdiqlangan bo'lsa
+    if referral_confirmed:
+        welcome_text += "🎁 Bonus: Sizga referral bonus sifatida 500 so'm qo'shildi!\n\n"
+    
+    welcome_text += "Quyidagi tugmalardan birini tanlang:"
+    
+    await message.answer(
+        welcome_text,
+        reply_markup=get_main_keyboard()
+    )
+    
+    await state.set_state(OnboardingStates.MENU)
@@ -0,0 +1,779 @@
+"""Taqdimot buyurtmasi: mavzu, sahifalar, tarif, tasdiqlash va yaratish"""
+import asyncio
+import logging
+import os
+
+from aiogram import Router, types, F
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from states import OnboardingStates, OrderStates
+from database_adapter import (
+    get_user_by_tg_id, get_user_balance, get_user_free_orders_count,
+    log_action, create_order, create_paid_order, update_order_status, save_presentation,
+    get_order_by_request_key, save_order_cost
+)
+from loader import bot, format_time
+from idempotency import DONE, IN_FLIGHT, USER_CAP, generation_registry, request_key
+from generation_queue import generation_queue
+from speculation import speculative_slots
+import order_costs
+from handlers.common import TARIFFS, get_main_keyboard, get_tariff_keyboard, get_back_keyboard
+
+router = Router(name="ordering")
+
+# Takroriy "Ha" bosilganda (yoki Telegram callback'ni qayta yuborganda) javoblar
+DUPLICATE_ANSWERS = {
+    IN_FLIGHT: "⏳ Bu buyurtma allaqachon tayyorlanmoqda",
+    DONE: "✅ Bu buyurtma allaqachon qabul qilingan",
+    USER_CAP: "⏳ Oldingi taqdimotingiz hali tayyorlanmoqda. U tayyor bo'lgach qayta urinib ko'ring.",
+}
+
+
+def _callback_request_key(callback: types.CallbackQuery, action: str) -> str:
+    """Callback xabari bo'yicha idempotentlik kaliti"""
+    message_id = callback.message.message_id if callback.message else None
+    return request_key(callback.from_user.id, message_id, action)
+
+
+def _confirmed_text(tariff: str) -> str:
+    """Buyurtma tasdiqlangani haqida xabar (navbat bo'lsa, oldindagilar soni bilan)"""
+    ahead = generation_queue.position(tariff)
+    queue_line = f"⏳ Navbatda sizdan oldin: {ahead} ta buyurtma\n" if ahead else ""
+    return ("🎉 Buyurtma tasdiqlandi!\n\n"
+            "🚀 Taqdimot yaratish jarayoni boshlandi...\n"
+            f"{queue_line}"
+            "⏱️ Tahmini vaqt: 2-3 daqiqa\n\n"
+            "📱 Tayyor bo'lganda sizga xabar beramiz!")
+
+
+def _submit_generation(user_tg_id: int, order_id: int, topic: str, pages: int, tariff: str) -> asyncio.Task:
+    """Generatsiyani tarif ustuvorligi bilan navbatga qo'yish (oldindan tayyorlangan matn bilan)"""
+    speculation = speculative_slots.take(user_tg_id, topic, pages)
+    return generation_queue.submit(tariff, lambda waited: generate_presentation_task(
+        user_tg_id, order_id, topic, pages, tariff, queue_wait=waited, speculation=speculation
+    ))
+
+
+async def generate_presentation_content(topic: str, pages: int, speculation=None, tariff: str = None) -> dict:
+    """ChatGPT API dan taqdimot kontentini yaratish - yangi struktura.
+    
+    speculation - tasdiqlash dialogi vaqtida oldindan tayyorlangan matn sloti (bo'lsa faqat rasmlar qoladi),
+    tariff - rasmlarni qayta ishlatish (image_index) shu tarifda yoqilganmi
+    """
+    # openai va pptx kutubxonalari birinchi buyurtmada yuklanadi (bot tez ishga tushadi)
+    from pptx_generator import attach_slide_images, generate_presentation_content_with_gpt
+    if speculation is not None:
+        try:
+            slides = await speculative_slots.result(speculation)
+            return await attach_slide_images(slides, tariff)
+        except Exception as e:
+            logging.error(f"Oldindan tayyorlangan matn ishlamadi, qaytadan yaratiladi: {e}")
+    return await generate_presentation_content_with_gpt(topic, pages, tariff)
+
+
+async def _can_pay(user_tg_id: int, tariff: str, pages: int) -> bool:
+    """Buyurtma to'lanishi mumkinmi (bepul START qolgan yoki balans yetadi)"""
+    if tariff not in TARIFFS:
+        return False
+    if tariff == "START" and await get_user_free_orders_count(user_tg_id) < 1:
+        return True
+    balance = await get_user_balance(user_tg_id)
+    return balance['total_balance'] >= pages * TARIFFS[tariff]['price_per_page']
+
+
+# Taqdimot fayllarini yuborish
+async def send_presentation_files(chat_id: int, files: list, caption: str) -> list:
+    """Fayllarni bitta xabar (2 ta bo'lsa - media group) qilib yuborish.
+    
+    files - [(fayl_nomi, bytes yoki file_id), ...]. bytes xotiradan yuklanadi,
+    file_id esa qayta yuklamasdan yuboriladi. Qaytadi: [(fayl_nomi, file_id), ...]
+    """
+    from aiogram.types import BufferedInputFile, InputMediaDocument
+    
+    def as_input(name, data):
+        if isinstance(data, (bytes, bytearray)):
+            return BufferedInputFile(bytes(data), filename=name)
+        return data
+    
+    if len(files) == 1:
+        name, data = files[0]
+        sent = await bot.send_document(chat_id=chat_id, document=as_input(name, data), caption=caption)
+        return [(name, sent.document.file_id)]
+    
+    # Izoh oxirgi faylga qo'yiladi - Telegram uni albom ostida ko'rsatadi
+    media = [
+        InputMediaDocument(media=as_input(name, data), caption=caption if i == len(files) - 1 else None)
+        for i, (name, data) in enumerate(files)
+    ]
+    sent = await bot.send_media_group(chat_id=chat_id, media=media)
+    return [(name, msg.document.file_id) for (name, _), msg in zip(files, sent)]
+
+# Admin guruhga taqdimot yuborish funksiyasi
+async def send_presentation_to_admin_group(user_tg_id: int, topic: str, pages: int, tariff: str, files: list):
+    """Tayyorlangan taqdimotni admin guruhga yuborish (files - [(fayl_nomi, file_id), ...])"""
+    try:
+        # Guruh ID
+        group_id = int(os.getenv("GROUP_ID", "-1001234567890"))
+        
+        # Foydalanuvchi ma'lumotlarini olish
+        user = await get_user_by_tg_id(user_tg_id)
+        if not user:
+            return
+        
+        # Balans ma'lumotlarini olish
+        balance = await get_user_balance(user_tg_id)
+        
+        # Tarif narxini hisoblash
+        tariff_info = TARIFFS[tariff]
+        total_price = pages * tariff_info['price_per_page']
+        
+        # Fayl nomini tayyorlash
+        filename = ", ".join(name for name, _ in files)
+        
+        # Xavfsiz matn tayyorlash
+        safe_full_name = str(user.get('full_name', 'Nomalum'))
+        safe_username = str(user.get('username', 'Nomalum'))
+        safe_topic = str(topic)
+        safe_tariff_name = str(tariff_info['name'])
+        safe_filename = str(filename)
+        
+        # Fayllar foydalanuvchiga yuklangan file_id orqali yuboriladi - qayta yuklanmaydi
+        await send_presentation_files(
+            group_id,
+            files,
+            caption=f"📊 Yangi taqdimot tayyorlandi!\n\n"
+                   f"👤 Foydalanuvchi: {safe_full_name}\n"
+                   f"🆔 ID: {user_tg_id}\n"
+                   f"📱 Username: @{safe_username}\n\n"
+                   f"📋 Taqdimot ma'lumotlari:\n"
+                   f"• Mavzu: {safe_topic}\n"
+                   f"• Sahifalar: {pages} ta\n"
+                   f"• Tarif: {safe_tariff_name}\n"
+                   f"• Narx: {total_price:,} so'm\n\n"
+                   f"💰 Foydalanuvchi balansi: {balance['total_balance']:,} so'm\n"
+                   f"📅 Tayyorlangan vaqt: {format_time()}\n\n"
+                   f"📁 Fayl: {safe_filename}"
+        )
+        
+        # Log qilish
+        await log_action(user_tg_id, "presentation_sent_to_admin", {
+            'topic': topic,
+            'pages': pages,
+            'tariff': tariff,
+            'total_price': total_price,
+            'group_id': group_id
+        })
+        
+    except Exception as e:
+        logging.error(f"Admin guruhga taqdimot yuborishda xatolik: {e}")
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "📊 Taqdimot tayyorlash")
+async def start_presentation_order(message: types.Message, state: FSMContext):
+    """Taqdimot buyurtmasini boshlash"""
+    await message.answer(
+        "📊 Taqdimot tayyorlash xizmati:\n\n"
+        "AI yordamida professional taqdimotlar tayyorlab beramiz!\n\n"
+        "Quyidagi tariflardan birini tanlang:",
+        reply_markup=get_tariff_keyboard()
+    )
+
+@router.message(StateFilter(OrderStates.ASK_TOPIC))
+async def process_topic(message: types.Message, state: FSMContext):
+    """Taqdimot mavzusini qayta ishlash"""
+    topic = message.text.strip()
+    
+    # Mavzu tekshirish - kamida 3 ta so'z bo'lishi kerak
+    words = topic.split()
+    if len(words) < 2 or len(topic) < 10:
+        await message.answer(
+            "❌ Mavzu nomini to'liq va aniq kiriting!\n\n"
+            "Misol:\n"
+            "Interstellar - kino haqida ✅\n"
+            "Interstellar ❌"
+        )
+        return
+    
+    await state.update_data(topic=topic)
+    
+    await message.answer(
+        f"✅ Mavzu nomini qabul qilib oldim!\n\n"
+        f"Mavzu: {topic}\n\n"
+        "Endi esa sahifalar sonini kiriting:\n\n"
+        "Misol:\n"
+        "10 ✅\n"
+        "10-12 ❌\n"
+        "14ta ❌\n"
+        "Yigirma ❌\n"
+        "Yigirma ikkita ❌\n"
+        "O'n sakkiz sahifali ❌\n\n"
+        "⚠️ Eslatma: 1-4 raqamlar qabul qilinmaydi!"
+    )
+    await state.set_state(OrderStates.ASK_PAGES)
+
+@router.message(StateFilter(OrderStates.ASK_PAGES))
+async def process_pages(message: types.Message, state: FSMContext):
+    """Sahifalar sonini qayta ishlash"""
+    try:
+        pages = int(message.text.strip())
+        
+        # 1-4 raqamlar qabul qilinmaydi
+        if pages >= 1 and pages <= 4:
+            await message.answer(
+                "❌ Bu qiymatdagi taqdimotni tayyorlash imkonsiz!\n\n"
+                "5 va undan yuqori raqam kiriting:"
+            )
+            return
+        
+        if pages < 5 or pages > 50:
+            await message.answer(
+                "❌ Noto'g'ri raqam!\n\n"
+                "5-50 orasida raqam kiriting:"
+            )
+            return
+        
+        await state.update_data(pages=pages)
+        data = await state.get_data()
+        topic = data.get('topic', '')
+        tariff_key = data.get('tariff', '')
+        
+        # Foydalanuvchi ma'lumotlarini olish
+        user = await get_user_by_tg_id(message.from_user.id) if message.from_user else None
+        user_name = user.get('full_name', 'Foydalanuvchi') if user else 'Foydalanuvchi'
+        
+        # Yakuniy buyurtma ma'lumotlari
+        confirmation_text = (
+            f"✅ Javoblarni qabul qildim!\n\n"
+            f"Sizning yakuniy buyurtmangiz quyidagicha ko'rinishda:\n\n"
+            f"📊 Mavzu nomi: {topic}\n"
+            f"📄 Sahifalar soni: {pages} ta\n"
+            f"👤 Talaba: {user_name}\n\n"
+            f"❓ Buyurtmani tasdiqlaysizmi?"
+        )
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="✅ Ha", callback_data="confirm_yes")],
+            [InlineKeyboardButton(text="❌ Yo'q", callback_data="confirm_no")]
+        ])
+        
+        await message.answer(
+            confirmation_text,
+            reply_markup=keyboard
+        )
+        await state.set_state(OrderStates.CONFIRM_1)
+        
+        # Tasdiqlash ekranlari davomida matnni oldindan tayyorlash (to'lay oladigan foydalanuvchi uchun)
+        if await _can_pay(message.from_user.id, tariff_key, pages):
+            speculative_slots.start(message.from_user.id, topic, pages, tariff_key)
+        
+    except ValueError:
+        await message.answer(
+            "❌ Faqat raqam kiriting!\n\n"
+            "Misol:\n"
+            "10 ✅\n"
+            "10-12 ❌\n"
+            "14ta ❌"
+        )
+        return
+
+# Callback query handlers
+@router.callback_query(F.data.startswith("tariff_"))
+async def process_tariff_selection(callback: types.CallbackQuery, state: FSMContext):
+    """Tarif tanlashni qayta ishlash"""
+    tariff_key = callback.data.replace("tariff_", "")
+    await state.update_data(tariff=tariff_key)
+    speculative_slots.cancel(callback.from_user.id, "restarted")
+    
+    tariff_info = TARIFFS[tariff_key]
+    
+    if tariff_key == "START":
+        # Foydalanuvchining bepul buyurtmalar sonini olish
+        free_orders_count = await get_user_free_orders_count(callback.from_user.id)
+        remaining_free = 1 - free_orders_count
+        
+        if remaining_free > 0:
+            start_text = (
+                f"🚀 Start tarifini tanladingiz!\n\n"
+                f"Ushbu tarifdan foydalanish {remaining_free} marta bepul qoldi! "
+                f"(siz allaqachon {free_orders_count} marta foydalangansiz)\n\n"
+                f"Bepul buyurtmalar tugagach, har bir sahifasi uchun {tariff_info['price_per_page']:,} so'mdan to'laysiz.\n"
+                f"Format: PPT\n\n"
+                f"Endi esa mavzu nomini to'liq va aniq kiriting:\n\n"
+                f"Misol:\n"
+                f"Interstellar - kino haqida ✅\n"
+                f"Interstellar ❌"
+            )
+        else:
+            start_text = (
+                f"🚀 Start tarifini tanladingiz!\n\n"
+                f"⚠️ Bepul buyurtmalar tugadi! "
+                f"Siz allaqachon 1 marta bepul foydalangansiz.\n\n"
+                f"Endi har bir sahifasi uchun {tariff_info['price_per_page']:,} so'mdan to'laysiz.\n"
+                f"Format: PPT\n\n"
+                f"Endi esa mavzu nomini to'liq va aniq kiriting:\n\n"
+                f"Misol:\n"
+                f"Interstellar - kino haqida ✅\n"
+                f"Interstellar ❌"
+            )
+    else:
+        if tariff_key == "STANDARD":
+            format_text = "PPT"
+        elif tariff_key == "SMART":
+            format_text = "PPT + PDF"
+        else:
+            format_text = "PPT"
+            
+        # Markdown'da maxsus belgilarni escape qilish
+        tariff_name = tariff_info['name'].replace('*', '*').replace('_', '_').replace('[', '[').replace('`', '`')
+        format_name = format_text.replace('*', '*').replace('_', '_').replace('[', '[').replace('`', '`')
+        
+        start_text = (
+            f"💰 {tariff_name}ni tanladingiz!\n\n"
+            f"Format: {format_name}\n\n"
+            f"Endi esa Mavzu nomini to'liq va aniq kiriting:\n\n"
+            f"Misol:\n"
+            f"Interstellar - kino haqida ✅\n"
+            f"Interstellar ❌"
+        )
+    
+    await callback.message.edit_text(
+        start_text,
+    )
+    
+    await callback.answer()
+    await state.set_state(OrderStates.ASK_TOPIC)
+
+@router.callback_query(F.data == "back_to_menu")
+async def back_to_menu(callback: types.CallbackQuery, state: FSMContext):
+    """Asosiy menyuga qaytish"""
+    speculative_slots.cancel(callback.from_user.id)
+    await callback.message.edit_text(
+        "🏠 Asosiy menyu\n\n"
+        "Quyidagi tugmalardan birini tanlang:",
+        reply_markup=None
+    )
+    
+    # Asosiy klaviatura yuborish
+    await callback.message.answer(
+        "Bosh menyu:",
+        reply_markup=get_main_keyboard()
+    )
+    
+    await callback.answer("Asosiy menyuga qaytildi")
+    await state.set_state(OnboardingStates.MENU)
+
+@router.callback_query(StateFilter(OrderStates.PREVIEW), F.data == "confirm_yes")
+async def confirm_preview(callback: types.CallbackQuery, state: FSMContext):
+    """Taqdimotni ko'rib chiqishdan keyin tasdiqlash"""
+    key = _callback_request_key(callback, "confirm_preview")
+    reason = generation_registry.claim(key, callback.from_user.id)
+    if reason:
+        await callback.answer(DUPLICATE_ANSWERS[reason], show_alert=reason == USER_CAP)
+        return
+    
+    try:
+        await callback.answer("✅ Tasdiqlanmoqda...")
+        
+        data = await state.get_data()
+        
+        # Buyurtma yaratish
+        order_data = {
+            'user_tg_id': callback.from_user.id,
+            'topic': data['topic'],
+            'pages': data['pages'],
+            'tariff': data['tariff'],
+            'status': 'confirmed',
+            'request_key': key
+        }
+        
+        order_id = await create_order(order_data)
+        if not order_id:
+            generation_registry.release(key)
+            await callback.message.edit_text(
+                "❌ Buyurtma yaratishda xatolik!\n\nIltimos, qaytadan urinib ko'ring.",
+                reply_markup=get_back_keyboard(),
+            )
+            return
+        
+        # Taqdimot yaratish vazifasini navbatga qo'yish (kalit vazifa tugaganda yakunlanadi).
+        # Buyurtma yozilgan - Telegram chaqiruvlaridan oldin, ular xato bersa ham generatsiya boshlanadi
+        task = _submit_generation(
+            callback.from_user.id, order_id, data['topic'], data['pages'], data['tariff']
+        )
+    except Exception:
+        generation_registry.release(key)
+        raise
+    generation_registry.track(key, task)
+    
+    await _show_confirmed(callback, state, data['tariff'])
+
+@router.callback_query(StateFilter(OrderStates.CONFIRM_1), F.data == "confirm_yes")
+async def confirm_order(callback: types.CallbackQuery, state: FSMContext):
+    """Buyurtmani tasdiqlash - birinchi bosqich"""
+    await callback.answer("✅ Birinchi tasdiqlash...")
+    
+    data = await state.get_data()
+    tariff_key = data.get('tariff', '')
+    pages = data.get('pages', 0)
+    
+    # Start tarifi uchun maxsus xabar
+    if tariff_key == "START":
+        # Real bepul buyurtmalar sonini olish
+        free_orders = await get_user_free_orders_count(callback.from_user.id)
+        remaining_free = 1 - free_orders
+        tariff_info = TARIFFS[tariff_key]  # tariff_info ni aniqlash
+        
+        if remaining_free > 0:
+            second_confirmation_text = (
+                f"🔒 Ikkinchi tasdiqlash bosqichi\n\n"
+                f"Siz bepul obunada {free_orders + 1}-chi buyurtmani amalga oshirmoqdasiz, "
+                f"sizda yana {remaining_free - 1} ta bepul taqdimot tayyorlash imkoni qolmoqda!\n\n"
+                f"Buyurtmangizni 100% tasdiqlashga imkoningiz komilmi?"
+            )
+        else:
+            second_confirmation_text = (
+                f"🔒 Ikkinchi tasdiqlash bosqichi\n\n"
+                f"⚠️ Bepul buyurtmalar tugadi! "
+                f"Siz allaqachon 1 marta bepul foydalangansiz.\n\n"
+                f"Bu buyurtma uchun {pages * tariff_info['price_per_page']:,} so'm to'lashingiz kerak.\n\n"
+                f"Buyurtmangizni 100% tasdiqlashga imkoningiz komilmi?"
+            )
+    else:
+        # Premium tariflar uchun
+        tariff_info = TARIFFS[tariff_key]
+        total_price = pages * tariff_info['price_per_page']
+        
+        second_confirmation_text = (
+            f"💰 To'lov ma'lumotlari:\n\n"
+            f"Siz {data['topic']} mavzusida {pages} ta sahifali taqdimot "
+            f"buyurtma qilyapsiz va uning narxi "
+            f"({pages} × {tariff_info['price_per_page']:,} = {total_price:,} so'm) "
+            f"{total_price:,} so'm bo'ldi.\n\n"
+            f"❓ Buyurtmani tasdiqlaysizmi?"
+        )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Ha", callback_data="confirm_final")],
+        [InlineKeyboardButton(text="❌ Yo'q", callback_data="confirm_no")]
+    ])
+    
+    await callback.message.edit_text(
+        second_confirmation_text,
+        reply_markup=keyboard,
+    )
+    await state.set_state(OrderStates.CONFIRM_2)
+
+@router.callback_query(F.data == "confirm_final")
+async def confirm_final_order(callback: types.CallbackQuery, state: FSMContext):
+    """Yakuniy tasdiqlash"""
+    await callback.answer("🔒 Yakuniy tasdiqlash...")
+    
+    data = await state.get_data()
+    tariff_key = data.get('tariff', '')
+    pages = data.get('pages', 0)
+    
+    if tariff_key == "START":
+        # Real bepul buyurtmalar sonini olish
+        free_orders = await get_user_free_orders_count(callback.from_user.id)
+        remaining_free = 1 - free_orders
+        
+        if remaining_free > 0:
+            final_text = (
+                f"🔒 Yakuniy tasdiqlash:\n\n"
+                f"Siz buyurtmani tasdiqladingiz, ishonch va xavfsizlik uchun uni yana tasdiqlashingizni "
+                f"va bu ishni o'zingiz onli ravishda bajarishingizni so'rayman.\n\n"
+                f"Bu sizning {free_orders + 1}-chi bepul buyurtmangiz bo'ladi.\n"
+                f"Agar hozir yana bir bor, Ha✅ni bossangiz taqdimot tayyorlash jarayoni boshlanadi.\n\n"
+                f"Tanlang:"
+            )
+        else:
+            tariff_info = TARIFFS[tariff_key]
+            total_price = pages * tariff_info['price_per_page']
+            final_text = (
+                f"🔒 Yakuniy tasdiqlash:\n\n"
+                f"Siz buyurtmani tasdiqladingiz, ishonch va xavfsizlik uchun uni yana tasdiqlashingizni "
+                f"va bu ishni o'zingiz onli ravishda bajarishingizni so'rayman.\n\n"
+                f"⚠️ Bepul buyurtmalar tugadi! "
+                f"Agar hozir yana bir bor, Ha✅ni bossangiz hisobingizdan "
+                f"{total_price:,} so'm mablag' yechib olaman.\n\n"
+                f"Tanlang:"
+            )
+    else:
+        # Premium tariflar uchun
+        tariff_info = TARIFFS[tariff_key]
+        total_price = pages * tariff_info['price_per_page']
+        
+        final_text = (
+            f"🔒 Yakuniy tasdiqlash:\n\n"
+            f"Siz buyurtmani tasdiqladingiz, ishonch va xavfsizlik uchun uni yana tasdiqlashingizni "
+            f"va bu ishni o'zingiz onli ravishda bajarishingizni so'rayman.\n\n"
+            f"Agar hozir yana bir bor, Ha✅ni bossangiz hisobingizdan "
+            f"{total_price:,} so'm mablag' yechib olaman.\n\n"
+            f"Tanlang:"
+        )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="✅ Ha", callback_data="start_generation")],
+        [InlineKeyboardButton(text="❌ Yo'q", callback_data="back_to_menu")]
+    ])
+    
+    await callback.message.edit_text(
+        final_text,
+        reply_markup=keyboard,
+    )
+
+@router.callback_query(F.data == "confirm_no")
+async def cancel_confirmation(callback: types.CallbackQuery, state: FSMContext):
+    """Tasdiqni rad etish"""
+    speculative_slots.cancel(callback.from_user.id)
+    await callback.answer("❌ Buyurtma bekor qilindi")
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(
+            "❌ Buyurtma bekor qilindi.\n\n"
+            "Agar fikringizni o'zgartirsangiz, qaytadan 'Taqdimot tayyorlash' tugmasini bosing.",
+            reply_markup=get_back_keyboard(),
+        )
+
+@router.callback_query(F.data == "start_generation")
+async def start_presentation_generation(callback: types.CallbackQuery, state: FSMContext):
+    """Taqdimot yaratishni boshlash.
+    
+    Bitta tasdiqlash xabari faqat bitta buyurtma (bitta to'lov, bitta generatsiya) beradi:
+    takroriy bosish yoki qayta yuborilgan callback yangi ish boshlamaydi.
+    """
+    key = _callback_request_key(callback, "start_generation")
+    reason = generation_registry.claim(key, callback.from_user.id)
+    if reason:
+        await callback.answer(DUPLICATE_ANSWERS[reason], show_alert=reason == USER_CAP)
+        return
+    
+    task = None
+    try:
+        # Qayta ishga tushishdan keyin qayta yuborilgan callback - bazadagi kalit bo'yicha
+        if await get_order_by_request_key(key):
+            generation_registry.finish(key)
+            await callback.answer(DUPLICATE_ANSWERS[DONE])
+            return
+        task = await _start_generation(callback, state, key)
+    finally:
+        if task is None:
+            # Ish boshlanmadi (balans yetmadi, xatolik) - qayta urinish mumkin
+            generation_registry.release(key)
+        else:
+            generation_registry.track(key, task)
+
+async def _start_generation(callback: types.CallbackQuery, state: FSMContext, key: str):
+    """Balansni tekshirish/yechish, buyurtma yaratish va generatsiyani boshlash. Ish boshlanmasa None"""
+    await callback.answer("🚀 Taqdimot yaratish boshlanmoqda...")
+    
+    data = await state.get_data()
+    tariff_key = data.get('tariff', '')
+    pages = data.get('pages', 0)
+    
+    # Tariff tekshirish
+    if not tariff_key or tariff_key not in TARIFFS:
+        await callback.message.edit_text(
+            "❌ Xatolik: Tariff topilmadi. Iltimos, qaytadan urinib ko'ring.",
+            reply_markup=get_back_keyboard()
+        )
+        return
+    
+    # Barcha tariflar uchun balans tekshirish
+    tariff_info = TARIFFS[tariff_key]
+    total_price = pages * tariff_info['price_per_page']
+    
+    # START tarifi uchun bepul buyurtmalar tekshirish
+    if tariff_key == "START":
+        free_orders = await get_user_free_orders_count(callback.from_user.id)
+        remaining_free = 1 - free_orders
+        
+        # Agar bepul buyurtmalar tugagan bo'lsa, balansdan mablag' yechish
+        if remaining_free <= 0:
+            # Balansni tekshirish
+            balance = await get_user_balance(callback.from_user.id)
+            if balance['total_balance'] < total_price:
+                # Balans to'ldirish tugmalari
+                balance_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                    [InlineKeyboardButton(text="💳 Balansni to'ldirish", callback_data="top_up_balance")],
+                    [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_menu")]
+                ])
+                
+                await callback.message.edit_text(
+                    f"❌ Balans yetarli emas!\n\n"
+                    f"Bu buyurtma uchun {total_price:,} so'm kerak.\n"
+                    f"Sizning balansingiz: {balance['total_balance']:,} so'm\n"
+                    f"Yetishmayotgan summa: {total_price - balance['total_balance']:,} so'm\n\n"
+                    f"💡 Balansingizni to'ldiring va qaytadan urinib ko'ring!",
+                    reply_markup=balance_keyboard,
+                )
+                return
+            
+            charge = total_price
+            description = f'START tarifi taqdimot uchun ({pages} sahifa)'
+        else:
+            # Bepul buyurtma - balansdan yechilmaydi
+            charge = 0
+            description = None
+    else:
+        # Boshqa tariflar uchun balans tekshirish
+        balance = await get_user_balance(callback.from_user.id)
+        if balance['total_balance'] < total_price:
+            # Balans to'ldirish tugmalari
+            balance_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="💳 Balansni to'ldirish", callback_data="top_up_balance")],
+                [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_menu")]
+            ])
+            
+            await callback.message.edit_text(
+                f"❌ Balans yetarli emas!\n\n"
+                f"Bu buyurtma uchun {total_price:,} so'm kerak.\n"
+                f"Sizning balansingiz: {balance['total_balance']:,} so'm\n"
+                f"Yetishmayotgan summa: {total_price - balance['total_balance']:,} so'm\n\n"
+                f"💡 Balansingizni to'ldiring va qaytadan urinib ko'ring!",
+                reply_markup=balance_keyboard,
+            )
+            return
+        
+        charge = total_price
+        description = f'{tariff_info["name"]} taqdimot uchun ({pages} sahifa)'
+    
+    # Buyurtma yaratish va balansdan yechish (bitta tranzaksiya: biri bo'lmasa ikkinchisi ham bo'lmaydi)
+    order_data = {
+        'user_tg_id': callback.from_user.id,
+        'topic': data['topic'],
+        'pages': data['pages'],
+        'tariff': data['tariff'],
+        'status': 'confirmed',
+        'request_key': key
+    }
+    
+    order_id = await create_paid_order(order_data, charge, description)
+    if not order_id:
+        await callback.message.edit_text(
+            "❌ Buyurtma yaratishda xatolik!\n\n"
+            "Balansingizdan mablag' yechilmadi. Iltimos, qaytadan urinib ko'ring.",
+            reply_markup=get_back_keyboard(),
+        )
+        return
+    
+    # Pul yechildi - generatsiya Telegram chaqiruvlaridan oldin navbatga qo'yiladi,
+    # xabarni tahrirlash xato bersa ham buyurtma bajariladi
+    task = _submit_generation(
+        callback.from_user.id, order_id, data['topic'], data['pages'], data['tariff']
+    )
+    await _show_confirmed(callback, state, data['tariff'])
+    return task
+
+async def _show_confirmed(callback: types.CallbackQuery, state: FSMContext, tariff: str):
+    """Buyurtma qabul qilingani haqida xabar (xatolik generatsiyaga ta'sir qilmaydi)"""
+    try:
+        await state.set_state(OnboardingStates.MENU)
+        await callback.message.edit_text(
+            _confirmed_text(tariff),
+            reply_markup=get_back_keyboard(),
+        )
+    except Exception as e:
+        logging.error(f"Buyurtma tasdig'ini ko'rsatishda xatolik: {e}")
+
+@router.callback_query(F.data == "create_presentation")
+async def create_presentation_callback(callback: types.CallbackQuery, state: FSMContext):
+    """Taqdimot yaratish callback handler"""
+    await callback.answer("📊 Taqdimot tayyorlash...")
+    
+    # Taqdimot tayyorlashni boshlash
+    await callback.message.edit_text(
+        "📊 Taqdimot tayyorlash xizmati:\n\n"
+        "AI yordamida professional taqdimotlar tayyorlab beramiz!\n\n"
+        "Quyidagi tariflardan birini tanlang:",
+        reply_markup=get_tariff_keyboard()
+    )
+
+async def generate_presentation_task(user_tg_id: int, order_id: int, topic: str, pages: int, tariff: str,
+                                     queue_wait: float = 0.0, speculation=None):
+    """Taqdimot yaratish vazifasi - yangi struktura.
+    
+    queue_wait - navbatda kutilgan soniyalar, speculation - oldindan tayyorlangan matn sloti
+    """
+    # Tokenlar, rasmlar va bosqich vaqtlari shu buyurtma hisobiga yoziladi
+    cost = order_costs.begin(order_id, tariff, pages, queue_wait)
+    status = 'failed'
+    try:
+        # OpenAI dan kontent olish
+        content = await generate_presentation_content(topic, pages, speculation, tariff)
+        print(f"ChatGPT dan kontent olindi: {content}")
+        
+        # Fayllarni xotirada yaratish (kontent qayta so'ralmaydi)
+        from pptx_generator import render_presentation_files
+        with order_costs.stage("render"):
+            files = await render_presentation_files(topic, pages, tariff, slides_content=content)
+        
+        # Foydalanuvchiga yuborish - fayllar bir marta yuklanadi
+        with order_costs.stage("send"):
+            sent_files = await send_presentation_files(
+                user_tg_id,
+                files,
+                caption=f"🎉 Taqdimot tayyor!\n\n"
+                       f"📊 Mavzu: {topic}\n"
+                       f"📄 Sahifalar: {pages}\n"
+                       f"💰 Tarif: {TARIFFS[tariff]['name']}\n\n"
+                       f"✅ Fayl muvaffaqiyatli yaratildi!",
+            )
+        file_ids = {name.rsplit('.', 1)[-1]: file_id for name, file_id in sent_files}
+        
+        # Ma'lumotlar bazasiga saqlash
+        presentation_data = {
+            'user_tg_id': user_tg_id,
+            'order_id': order_id,
+            'topic': topic,
+            'pages': pages,
+            'tariff': tariff,
+            'pptx_file_id': file_ids.get('pptx'),
+            'pdf_file_id': file_ids.get('pdf'),
+            'status': 'completed'
+        }
+        
+        await save_presentation(presentation_data)
+        await update_order_status(order_id, 'completed')
+        status = 'completed'
+        
+        # Admin guruhga taqdimot haqida xabar yuborish (file_id orqali)
+        await send_presentation_to_admin_group(user_tg_id, topic, pages, tariff, sent_files)
+        
+        # Log yaratish
+        await log_action(user_tg_id, "presentation_generated", {
+            'topic': topic,
+            'pages': pages,
+            'tariff': tariff,
+            'file_ids': file_ids,
+            'queue_wait_s': round(queue_wait, 2)
+        })
+        
+    except Exception as e:
+        # Xatolik holatida foydalanuvchiga xabar berish
+        print(f"Taqdimot yaratishda xatolik: {e}")
+        logging.error(f"Taqdimot yaratishda xatolik: {e}")
+        
+        await bot.send_message(
+            chat_id=user_tg_id,
+            text=f"❌ Xatolik yuz berdi!\n\n"
+                 f"Taqdimot yaratishda muammo bo'ldi. Iltimos, qaytadan urinib ko'ring.\n\n"
+                 f"📞 Agar muammo davom etsa, qo'llab-quvvatlashga murojaat qiling.\n\n"
+                 f"🔍 Xatolik tafsiloti: {str(e)[:100]}...",
+        )
+        
+        # Xatolikni log qilish
+        await log_action(user_tg_id, "presentation_error", {
+            'error': str(e),
+            'topic': topic,
+            'pages': pages,
+            'tariff': tariff,
+            'queue_wait_s': round(queue_wait, 2)
+        })
+        
+        # Buyurtma holatini yangilash
+        status = 'failed'
+        await update_order_status(order_id, 'failed')
+    finally:
+        await save_order_cost(cost.to_row(status))
@@ -0,0 +1,688 @@
+"""Balans, Click to'lovlari, chek yuborish va referral havolasi"""
+import os
+from datetime import datetime
+
+from aiogram import Router, types, F
+from aiogram.filters import StateFilter
+from aiogram.fsm.context import FSMContext
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from states import OnboardingStates
+from database_adapter import (
+    get_user_by_tg_id, get_user_balance, get_user_statistics, get_referral_stats,
+    get_referral_rewards, log_action, get_pending_payment
+)
+from click_client import create_click_payment
+from loader import bot, format_time, payment_reconciler
+from handlers.common import get_main_keyboard
+
+router = Router(name="payments")
+
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "💰 Balansim")
+async def my_balance(message: types.Message):
+    """Foydalanuvchi balansi"""
+    if not message.from_user:
+        return
+    
+    user = await get_user_by_tg_id(message.from_user.id)
+    if not user:
+        await message.answer("Siz hali ro'yxatdan o'tmadingiz. /start buyrug'ini yuboring.")
+        return
+    
+    # Real balans ma'lumotlarini olish
+    balance = await get_user_balance(message.from_user.id)
+    
+    # Foydalanuvchi statistikasini olish
+    stats = await get_user_statistics(message.from_user.id)
+    
+    # Referral statistikasini olish
+    referral_stats = await get_referral_stats(message.from_user.id)
+    
+    current_time = format_time()
+    balance_text = (
+        f"💰 Sizning balansingiz:\n\n"
+        f"💳 Umumiy balans: {balance['total_balance']:,} so'm\n\n"
+        f"📊 Balans tafsilotlari:\n"
+        f"• Naqt orqali to'langan: {balance['cash_balance']:,} so'm\n"
+        f"• {referral_stats['confirmed_referrals']} ta taklif uchun: {balance['referral_balance']:,} so'm\n\n"
+        f"📈 Statistika:\n"
+        f"• Yaratilgan taqdimotlar: {stats.get('total_presentations', 0)}\n"
+        f"• So'nggi faollik: {stats.get('last_activity', 'Hali yoq')}\n"
+        f"• Qo'shilgan sana: {user.get('created_at', 'Nomalum')}\n\n"
+        f"🕐 Oxirgi yangilanish: {current_time}"
+    )
+    
+    # Balans tugmalari
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="💳 Balansni to'ldirish", callback_data="top_up_balance")],
+        [InlineKeyboardButton(text="👥 Do'stlarni taklif qilish", callback_data="referral_link")],
+        [InlineKeyboardButton(text="📊 Referral statistikasi", callback_data="referral_stats")]
+    ])
+    
+    await message.answer(balance_text, reply_markup=keyboard)
+
+@router.callback_query(F.data == "top_up_balance")
+async def top_up_balance(callback: types.CallbackQuery):
+    """Balansni to'ldirish"""
+    await callback.answer("💳 Balansni to'ldirish...")
+    
+    payment_text = (
+        "💳 **Balansni to'ldirish**\n\n"
+        "Quyidagi usullar orqali balansingizni to'ldirishingiz mumkin:\n\n"
+        "🔹 Naqt to'lov:\n"
+        "• Uzcard: 5614682110523232\n"
+        "• Humo: 9860170104108668\n"
+        "• VISA: 4023060518185649\n\n"
+        "🔹 Elektron to'lov:\n"
+        "• Payme\n"
+        "• Click\n"
+        "• Uzcard Mobile\n\n"
+        "💡 Eslatma: To'lov amalga oshirgandan so'ng, "
+        "chek rasmini yuboring va balansingiz 5-10 daqiqada to'ldiriladi."
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="💳 CLICK orqali to'lov", callback_data="click_payment")],
+        [InlineKeyboardButton(text="📷 Chek yuborish", callback_data="send_receipt")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_balance")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(payment_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "click_payment")
+async def click_payment_menu(callback: types.CallbackQuery, state: FSMContext):
+    """CLICK orqali to'lov menyusi"""
+    await callback.answer("💳 CLICK to'lov...")
+    
+    text = (
+        "💳 **CLICK orqali to'lov**\n\n"
+        "Balansingizni to'ldirish uchun miqdorni kiriting:\n\n"
+        "💰 **Minimal miqdor:** 1,000 so'm\n"
+        "💰 **Maksimal miqdor:** 1,000,000 so'm\n\n"
+        "📝 **Miqdorni yuboring:**"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="top_up_balance")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
+    
+    # FSM state'ni o'rnatish
+    await state.set_state(OnboardingStates.waiting_click_amount)
+
+@router.message(OnboardingStates.waiting_click_amount)
+async def process_click_amount_input(message: types.Message, state: FSMContext):
+    """CLICK to'lov miqdorini qayta ishlash"""
+    try:
+        # Miqdorni tekshirish
+        amount_text = message.text.strip()
+        
+        # Faqat raqamlar va vergul/nuqta qabul qilish
+        if not amount_text.replace(',', '').replace('.', '').isdigit():
+            await message.answer(
+                "❌ **Noto'g'ri format!**\n\n"
+                "Iltimos, faqat raqam kiriting.\n"
+                "Masalan: 5000, 10000, 25000"
+            )
+            return
+        
+        # Miqdorni sonli formatga o'tkazish
+        amount = int(float(amount_text.replace(',', '.')))
+        
+        # Minimal va maksimal miqdorlarni tekshirish
+        if amount < 1000:
+            await message.answer(
+                "❌ **Miqdor juda kichik!**\n\n"
+                "Minimal to'lov miqdori: **1,000 so'm**"
+            )
+            return
+            
+        if amount > 1000000:
+            await message.answer(
+                "❌ **Miqdor juda katta!**\n\n"
+                "Maksimal to'lov miqdori: **1,000,000 so'm**"
+            )
+            return
+        
+        # Click to'lov yaratish
+        user_id = message.from_user.id
+        order_id = f"click_{user_id}_{int(datetime.now().timestamp())}"
+        
+        await message.answer("⏳ To'lov yaratilmoqda...")
+        
+        # Click API orqali to'lov yaratish
+        payment_result = await create_click_payment(amount, user_id, order_id)
+        
+        if payment_result["success"]:
+            # To'lov muvaffaqiyatli yaratildi
+            payment_url = payment_result["payment_url"]
+            payment_id = payment_result["payment_id"]
+            
+            # Fon tekshiruvchi to'lovni kuzatadi va tasdiqlanganda balansni o'zi to'ldiradi
+            await payment_reconciler.register(payment_id, user_id, amount, order_id)
+            
+            text = (
+                f"💳 **CLICK to'lov - {amount:,} so'm**\n\n"
+                f"👤 **Foydalanuvchi:** @{message.from_user.username or 'Nomalum'}\n"
+                f"💰 **Miqdor:** {amount:,} so'm\n"
+                f"🆔 **To'lov ID:** {payment_id}\n\n"
+                f"🔗 **To'lov havolasi:**\n"
+                f"`{payment_url}`\n\n"
+                f"📱 **To'lov qilish uchun:**\n"
+                f"1. Havolani bosib o'ting\n"
+                f"2. Click ilovasida to'lov qiling\n"
+                f"3. To'lov muvaffaqiyatli bo'lgandan so'ng, bot avtomatik ravishda balansingizni to'ldiradi\n\n"
+                f"⏰ **Eslatma:** To'lov 5-10 daqiqada qayta ishlanadi"
+            )
+            
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="🔗 To'lov qilish", url=payment_url)],
+                [InlineKeyboardButton(text="🔄 To'lov holatini tekshirish", callback_data=f"check_payment_{payment_id}")],
+                [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="click_payment")]
+            ])
+            
+            await message.answer(text, reply_markup=keyboard, parse_mode="Markdown")
+            
+            # FSM state'ni tozalash
+            await state.clear()
+            
+        else:
+            # To'lov yaratishda xatolik
+            error_text = (
+                f"❌ **To'lov yaratishda xatolik!**\n\n"
+                f"Xatolik: {payment_result['error']}\n\n"
+                f"Iltimos, qaytadan urinib ko'ring yoki boshqa usulni tanlang."
+            )
+            
+            keyboard = InlineKeyboardMarkup(inline_keyboard=[
+                [InlineKeyboardButton(text="🔄 Qayta urinish", callback_data="click_payment")],
+                [InlineKeyboardButton(text="📷 Chek yuborish", callback_data="send_receipt")],
+                [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="top_up_balance")]
+            ])
+            
+            await message.answer(error_text, reply_markup=keyboard, parse_mode="Markdown")
+            await state.clear()
+            
+    except ValueError:
+        await message.answer(
+            "❌ **Noto'g'ri format!**\n\n"
+            "Iltimos, to'g'ri raqam kiriting.\n"
+            "Masalan: 5000, 10000, 25000"
+        )
+    except Exception as e:
+        await message.answer(
+            f"❌ **Xatolik yuz berdi!**\n\n"
+            f"Xatolik: {str(e)}\n\n"
+            f"Iltimos, qaytadan urinib ko'ring."
+        )
+        await state.clear()
+
+@router.callback_query(F.data.startswith("check_payment_"))
+async def check_click_payment_handler(callback: types.CallbackQuery):
+    """CLICK to'lov holatini tekshirish"""
+    payment_id = callback.data.replace("check_payment_", "")
+    
+    await callback.answer("🔄 To'lov holatini tekshirish...")
+    
+    # Holat lokal jadvaldan o'qiladi - Click bilan fon tekshiruvchi ishlaydi
+    payment = await get_pending_payment(payment_id)
+    
+    if not payment or payment['user_tg_id'] != callback.from_user.id:
+        text = (
+            "❌ **To'lov topilmadi**\n\n"
+            "💡 Iltimos, yangi to'lov yarating."
+        )
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔄 Yangi to'lov", callback_data="click_payment")],
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="top_up_balance")]
+        ])
+    
+    elif payment['status'] == "confirmed":
+        balance = await get_user_balance(callback.from_user.id)
+        
+        text = (
+            f"✅ **To'lov muvaffaqiyatli!**\n\n"
+            f"💰 **To'ldirilgan miqdor:** {payment['amount']:,} so'm\n"
+            f"💳 **Joriy balans:** {balance['total_balance']:,} so'm\n\n"
+            f"🎉 Balansingiz muvaffaqiyatli to'ldirildi!"
+        )
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="💰 Balansim", callback_data="my_balance")],
+            [InlineKeyboardButton(text="🏠 Bosh menyu", callback_data="main_menu")]
+        ])
+        
+    elif payment['status'] in ("cancelled", "expired"):
+        text = (
+            f"❌ **To'lov bekor qilindi**\n\n"
+            f"💰 **Miqdor:** {payment['amount']:,} so'm\n\n"
+            f"💡 Yangi to'lov yaratish uchun qaytadan urinib ko'ring."
+        )
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔄 Yangi to'lov", callback_data="click_payment")],
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="top_up_balance")]
+        ])
+        
+    else:
+        # Pending - navbatsiz tekshirishga qo'yamiz, natija alohida xabar bilan keladi
+        await payment_reconciler.request_check(payment_id)
+        
+        text = (
+            f"⏳ **To'lov hali qayta ishlanmagan**\n\n"
+            f"💰 **Miqdor:** {payment['amount']:,} so'm\n"
+            f"📊 **Holat:** {payment['status']}\n\n"
+            f"📱 To'lov tasdiqlanishi bilan balansingiz avtomatik to'ldiriladi va sizga xabar keladi.\n"
+            f"⏰ To'lov 5-10 daqiqada qayta ishlanadi."
+        )
+        
+        keyboard = InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="🔄 Qayta tekshirish", callback_data=f"check_payment_{payment_id}")],
+            [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="click_payment")]
+        ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "send_receipt")
+async def send_receipt_menu(callback: types.CallbackQuery, state: FSMContext):
+    """Chek yuborish menyusi"""
+    await callback.answer("📷 Chek yuborish...")
+    
+    receipt_text = (
+        "📷 Chek yuborish\n\n"
+        "To'lov chekini yuboring:\n\n"
+        "📋 Talablar:\n"
+        "• Rasm aniq va o'qiladigan bo'lishi kerak\n"
+        "• To'lov summasi va vaqti ko'rinishi kerak\n"
+        "• Chek to'liq ko'rinishi kerak\n\n"
+        "Tez orada balansingiz to'ldiriladi"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_receipt")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        try:
+            await callback.message.edit_text(receipt_text, reply_markup=keyboard, parse_mode="Markdown")
+        except Exception:
+            await callback.message.answer(receipt_text, reply_markup=keyboard, parse_mode="Markdown")
+    else:
+        await callback.message.answer(receipt_text, reply_markup=keyboard, parse_mode="Markdown")
+    
+    await state.set_state(OnboardingStates.RECEIPT_FIRST)
+
+@router.message(StateFilter(OnboardingStates.RECEIPT_FIRST), F.photo)
+async def process_first_receipt(message: types.Message, state: FSMContext):
+    """Birinchi chekni qayta ishlash"""
+    if not message.from_user:
+        return
+    
+    # Birinchi chekni saqlash
+    first_photo = message.photo[-1]
+    await state.update_data(first_receipt=first_photo.file_id)
+    
+    # Bekor qilish tugmasi
+    cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_receipt")]
+    ])
+    
+    # Ikkinchi chek so'rash
+    await message.answer(
+        "Iltimos, haqiqiy chekni yuboring qaytadan!\n\n"
+        "📷 Chekni qayta yuboring:",
+        reply_markup=cancel_keyboard
+    )
+    await state.set_state(OnboardingStates.RECEIPT_SECOND)
+
+@router.message(StateFilter(OnboardingStates.RECEIPT_SECOND), F.photo)
+async def process_second_receipt(message: types.Message, state: FSMContext):
+    """Ikkinchi chekni qayta ishlash"""
+    if not message.from_user:
+        return
+    
+    # Ikkinchi chekni saqlash
+    second_photo = message.photo[-1]
+    data = await state.get_data()
+    first_receipt = data.get('first_receipt')
+    
+    # Admin guruhga yuborish
+    admin_group_id = int(os.getenv("ADMIN_GROUP_ID", "-1001234567890"))  # Admin guruh ID
+    
+    try:
+        # Bitta xabarda 2 ta chek yuborish
+        media_group = [
+            types.InputMediaPhoto(
+                media=first_receipt,
+                caption=f"📷 To'lov cheklari\n\n"
+                       f"👤 Foydalanuvchi: {message.from_user.full_name}\n"
+                       f"🆔 ID: {message.from_user.id}\n"
+                       f"📅 Vaqt: {format_time()}\n\n"
+                       f"📷 Birinchi chek",
+            ),
+            types.InputMediaPhoto(
+                media=second_photo.file_id,
+                caption="📷 Ikkinchi chek",
+            )
+        ]
+        
+        await bot.send_media_group(
+            chat_id=admin_group_id,
+            media=media_group
+        )
+        
+        # Qo'shimcha izoh yuborish
+        await bot.send_message(
+            chat_id=admin_group_id,
+            text=f"📋 To'lov ma'lumotlari:\n\n"
+                 f"👤 Foydalanuvchi: {message.from_user.full_name}\n"
+                 f"🆔 ID: {message.from_user.id}\n"
+                 f"📅 Vaqt: {format_time()}\n"
+                 f"📷 Cheklar: 2 ta rasm yuborildi\n\n"
+                 f"💡 Eslatma: To'lovni tekshirib, balansni to'ldiring",
+        )
+        
+        # Foydalanuvchiga javob
+        await message.answer(
+            "✅ To'lovingiz tekshirib chiqilmoqda tez orada tasdiqlanadi",
+            reply_markup=get_main_keyboard(),
+        )
+        
+        # Log qilish
+        await log_action(message.from_user.id, "receipt_sent", {
+            'first_receipt': first_receipt,
+            'second_receipt': second_photo.file_id,
+            'sent_to_group': admin_group_id
+        })
+        
+    except Exception as e:
+        await message.answer(
+            f"❌ Chek yuborishda xatolik!\n\n"
+            f"Xatolik: {str(e)}\n\n"
+            f"Qaytadan urinib ko'ring yoki @support_admin ga murojaat qiling.",
+            reply_markup=get_main_keyboard(),
+        )
+    
+    await state.set_state(OnboardingStates.MENU)
+
+@router.message(StateFilter(OnboardingStates.RECEIPT_SECOND))
+async def handle_non_photo_receipt(message: types.Message, state: FSMContext):
+    """RECEIPT_SECOND holatida rasm bo'lmagan narsalar uchun"""
+    if not message.from_user:
+        return
+    
+    # Bekor qilish tugmasi
+    cancel_keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_receipt")]
+    ])
+    
+    await message.answer(
+        "❌ Faqat rasm yuboring!\n\n"
+        "📷 Chekni rasm ko'rinishida yuboring yoki bekor qiling:",
+        reply_markup=cancel_keyboard
+    )
+
+@router.callback_query(F.data == "cancel_receipt")
+async def cancel_receipt_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Chek yuborishni bekor qilish"""
+    await callback.message.edit_text(
+        "❌ Chek yuborish bekor qilindi",
+    )
+    await state.set_state(OnboardingStates.MENU)
+    await callback.answer()
+
+@router.callback_query(F.data == "referral_link")
+async def get_referral_link(callback: types.CallbackQuery):
+    """Referral link olish"""
+    await callback.answer("👥 Referral link...")
+    
+    if not callback.from_user:
+        return
+    
+    # Referral statistikasini olish
+    referral_stats = await get_referral_stats(callback.from_user.id)
+    
+    # Referral bonuslarini olish
+    rewards = await get_referral_rewards()
+    
+    # Referral link yaratish
+    referral_link = f"https://t.me/preuz_bot?start=ref_{callback.from_user.id}"
+    
+    referral_text = (
+        "👥 Do'stlarni taklif qilish:\n\n"
+        f"Do'stlaringizni taklif qiling va har bir taklif uchun {rewards['referrer_reward']:,} so'm bonus oling!\n\n"
+        f"🔗 Sizning taklif havolangiz:\n"
+        f"`{referral_link}`\n\n"
+        f"📊 Joriy natijalar:\n"
+        f"• Umumiy takliflar: {referral_stats['total_referrals']} ta\n"
+        f"• Tasdiqlangan: {referral_stats['confirmed_referrals']} ta\n"
+        f"• Jami bonus: {referral_stats['total_bonus']:,} so'm\n\n"
+        "📋 Qanday ishlaydi:\n"
+        "1. Havolani do'stlaringizga yuboring\n"
+        "2. Do'stingiz bot orqali ro'yxatdan o'tadi\n"
+        f"3. Sizga {rewards['referrer_reward']:,} so'm bonus qo'shiladi\n"
+        f"4. Do'stingiz ham {rewards['referred_reward']:,} so'm bonus oladi\n\n"
+        "💡 Maslahat: Ko'proq do'st taklif qiling va ko'proq bonus oling!"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📤 Havolani yuborish", url=f"https://t.me/share/url?url={referral_link}&text=PresentatsiyaUz boti orqali taqdimotlar tayyorlang!")],
+        [InlineKeyboardButton(text="📊 Statistikani ko'rish", callback_data="referral_stats")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_balance")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(referral_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "referral_stats")
+async def show_referral_stats(callback: types.CallbackQuery):
+    """Referral statistikasini ko'rsatish"""
+    await callback.answer("📊 Statistikani ko'rish...")
+    
+    if not callback.from_user:
+        return
+    
+    # Real referral statistikasini olish
+    referral_stats = await get_referral_stats(callback.from_user.id)
+    
+    stats_text = (
+        "📊 Referral statistikasi:\n\n"
+        f"👥 Umumiy takliflar: {referral_stats['total_referrals']} ta\n"
+        f"✅ Tasdiqlangan: {referral_stats['confirmed_referrals']} ta\n"
+        f"⏳ Kutilayotgan: {referral_stats['pending_referrals']} ta\n"
+        f"💰 Jami bonus: {referral_stats['total_bonus']:,} so'm\n"
+        f"📅 Bu oy: {referral_stats['this_month']} ta taklif\n\n"
+        f"💡 Maslahat: Har hafta kamida 3 ta do'st taklif qiling!"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🔄 Yangilash", callback_data="referral_stats")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_balance")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(stats_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "top_up_balance")
+async def top_up_balance_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Balans to'ldirish"""
+    await callback.answer("💳 Balans to'ldirish...")
+    
+    if not callback.from_user:
+        return
+    
+    balance_text = (
+        "Balansni to'ldirish:\n\n"
+        "Quyidagi usullar orqali balansingizni to'ldirishingiz mumkin:\n\n"
+        "Naqt to'lov:\n"
+        "• Uzcard: 5614682110523232\n"
+        "• Humo: 9860170104108668\n"
+        "• VISA: 4023060518185649\n\n"
+        "Elektron to'lov:\n"
+        "• Payme\n"
+        "• Click\n"
+        "• Uzcard Mobile\n\n"
+        "Eslatma: To'lov amalga oshirgandan so'ng, chek rasmini yuboring va balansingiz 5-10 daqiqada to'ldiriladi."
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📷 Chek yuborish", callback_data="send_receipt")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_balance")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(balance_text, reply_markup=keyboard)
+
+@router.callback_query(F.data == "send_receipt")
+async def send_receipt_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Chek yuborish"""
+    await callback.answer("📷 Chek yuborish...")
+    
+    if not callback.from_user:
+        return
+    
+    receipt_text = (
+        "Chek yuborish:\n\n"
+        "Iltimos, faqat skrinshot rasmni yuboring. Boshqasi qabul qilinmaydi.\n\n"
+        "Chek yuborish uchun rasmni yuboring:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_receipt")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(receipt_text, reply_markup=keyboard)
+    
+    await state.set_state(OnboardingStates.RECEIPT_FIRST)
+
+@router.callback_query(F.data == "cancel_receipt")
+async def cancel_receipt_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Chek yuborishni bekor qilish"""
+    await callback.answer("❌ Chek yuborish bekor qilindi!")
+    await state.set_state(OnboardingStates.MENU)
+    
+    # Asosiy menyuga qaytish
+    menu_text = (
+        "Xush kelibsiz!\n\n"
+        "Quyidagi tugmalardan birini tanlang:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📊 Taqdimot tayyorlash", callback_data="create_presentation")],
+        [InlineKeyboardButton(text="💰 Balansim", callback_data="my_balance")],
+        [InlineKeyboardButton(text="👥 Do'stlarni taklif qilish", callback_data="referral_link")],
+        [InlineKeyboardButton(text="📞 Aloqa", callback_data="contact_us")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(menu_text, reply_markup=keyboard)
+
+@router.message(StateFilter(OnboardingStates.RECEIPT_FIRST), F.photo)
+async def process_receipt_photo(message: types.Message, state: FSMContext):
+    """Chek rasmini qabul qilish"""
+    await message.answer(
+        "✅ Chek qabul qilindi!\n\n"
+        "Admin tez orada sizning balansingizni to'ldiradi.\n"
+        "Balans yangilanishi haqida xabar beramiz.",
+        reply_markup=get_main_keyboard()
+    )
+    await state.set_state(OnboardingStates.MENU)
+
+@router.message(StateFilter(OnboardingStates.RECEIPT_FIRST))
+async def process_receipt_other(message: types.Message, state: FSMContext):
+    """Chek bo'lmagan narsa yuborilganda"""
+    await message.answer(
+        "❌ Iltimos, faqat skrinshot rasmni yuboring!\n\n"
+        "Boshqa narsalar qabul qilinmaydi.",
+        reply_markup=InlineKeyboardMarkup(inline_keyboard=[
+            [InlineKeyboardButton(text="❌ Bekor qilish", callback_data="cancel_receipt")]
+        ])
+    )
+
+@router.callback_query(F.data == "back_to_menu")
+async def back_to_menu_handler(callback: types.CallbackQuery, state: FSMContext):
+    """Asosiy menyuga qaytish"""
+    await callback.answer("🏠 Asosiy menyuga qaytish...")
+    await state.set_state(OnboardingStates.MENU)
+    
+    # Asosiy menyu matnini yuborish
+    menu_text = (
+        "🎉 Xush kelibsiz!\n\n"
+        "🤖 @preuz_bot - professional taqdimotlar yaratish uchun!\n\n"
+        "📋 Xizmatlar:\n"
+        "• 🎯 Taqdimot yaratish\n"
+        "• 📊 Hisobot tayyorlash\n"
+        "• 💰 Balans boshqarish\n"
+        "• 👥 Do'stlarni taklif qilish\n\n"
+        "🚀 Boshlash uchun tugmalardan birini tanlang!"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🎯 Taqdimot yaratish", callback_data="create_presentation")],
+        [InlineKeyboardButton(text="💰 Balansim", callback_data="my_balance")],
+        [InlineKeyboardButton(text="👥 Do'stlarni taklif qilish", callback_data="referral_link")],
+        [InlineKeyboardButton(text="📞 Aloqa", callback_data="contact_us")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(menu_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "back_to_balance")
+async def back_to_balance(callback: types.CallbackQuery):
+    """Balans sahifasiga qaytish"""
+    await callback.answer("⬅️ Balansga qaytish...")
+    
+    if not callback.from_user:
+        return
+    
+    # Real balans ma'lumotlarini olish
+    balance = await get_user_balance(callback.from_user.id)
+    referral_stats = await get_referral_stats(callback.from_user.id)
+    
+    balance_text = (
+        f"💰 Sizning balansingiz:\n\n"
+        f"💳 Umumiy balans: {balance['total_balance']:,} so'm\n\n"
+        f"📊 Balans tafsilotlari:\n"
+        f"• Naqt orqali to'langan: {balance['cash_balance']:,} so'm\n"
+        f"• {referral_stats['confirmed_referrals']} ta taklif uchun: {balance['referral_balance']:,} so'm"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="💳 Balansni to'ldirish", callback_data="top_up_balance")],
+        [InlineKeyboardButton(text="👥 Do'stlarni taklif qilish", callback_data="referral_link")],
+        [InlineKeyboardButton(text="📊 Referral statistikasi", callback_data="referral_stats")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(balance_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "send_receipt")
+async def send_receipt(callback: types.CallbackQuery):
+    """Chek yuborish"""
+    await callback.answer("📸 Chek yuborish...")
+    
+    receipt_text = (
+        "📸 Chek yuborish:\n\n"
+        "To'lov cheki rasmini yuboring va quyidagi ma'lumotlarni ko'rsating:\n\n"
+        "🔹 Kerakli ma'lumotlar:\n"
+        "• To'lov summasi\n"
+        "• To'lov sanasi va vaqti\n"
+        "• Karta raqami (oxirgi 4 ta raqam)\n\n"
+        "⏱️ Tekshirish vaqti: 5-10 daqiqa\n"
+        "✅ Tasdiqlangandan so'ng: Balansingiz avtomatik to'ldiriladi\n\n"
+        "💡 Eslatma: Faqat aniq va o'qiladigan rasmlarni yuboring."
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="top_up_balance")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(receipt_text, reply_markup=keyboard, parse_mode="Markdown")
@@ -0,0 +1,442 @@
+"""Ma'lumot bo'limlari va qo'shimcha xizmatlar menyusi"""
+from aiogram import Router, types, F
+from aiogram.filters import Command, StateFilter
+from aiogram.types import InlineKeyboardMarkup, InlineKeyboardButton
+
+from states import OnboardingStates
+from database_adapter import get_user_statistics
+
+router = Router(name="services")
+
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "ℹ️ Bot haqida")
+async def about_bot(message: types.Message):
+    """Bot haqida ma'lumot"""
+    about_text = (
+        "🤖 PresentatsiyaUz Bot haqida:\n\n"
+        "Biz \"PresentatsiyaUz\" jamoasi 5 yildan buyon nafaqat O'zbekiston balki, "
+        "MDH mamlakatlari talabalariga ham xizmat ko'rsatib kelmoqdamiz.\n\n"
+        "Bu bot bizning barcha xizmatlarimizni faqat elektron shaklda taqdim etadi, "
+        "biz qo'l yozuvi, chizmachilik yoki chop etish bilan shug'ullanmaymiz. "
+        "(*hozircha)\n\n"
+        "Agar siz botni tushunishda muammolarga duch kelsangiz yoki narxlar bilan "
+        "bog'liq muammolarga duch kelsangiz, \"Aloqa uchun\" tugmasi orqali "
+        "administratorlardan buyurtma bering!\n\n"
+        "💳 To'lov kartalari:\n"
+        "• Uzcard: 5614682110523232\n"
+        "• Humo: 9860170104108668\n"
+        "• VISA: 4023060518185649\n"
+        "(Sodiqjon Nigmatov)"
+    )
+    
+    # Havolalar uchun tugmalar
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Bot asoschisi", url="https://t.me/MUKHAMMADSODlQ")],
+        [InlineKeyboardButton(text="👨‍💼 Ikkinchi akkaunt", url="https://t.me/MUHAMMADS0DlQ")],
+        [InlineKeyboardButton(text="📢 Kanal", url="https://t.me/preuzb")],
+        [InlineKeyboardButton(text="✅ Ishonch kanali", url="https://t.me/pre_ishonch")],
+        [InlineKeyboardButton(text="👨‍💼 Admin1", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="👨‍💼 Admin2", url="https://t.me/prezintatsiyauz_admin")],
+        [InlineKeyboardButton(text="🛒 Soff'dagi biz", url="https://soff.uz/seller/879")],
+        [InlineKeyboardButton(text="📸 Instagram", url="https://www.instagram.com/prezintatsiya.uz/profilecard/?igsh=ZDVqcnZ5Z2JpaTlt")],
+        [InlineKeyboardButton(text="💝 Donat", url="https://tirikchilik.uz/mukhammadsodiq")]
+    ])
+    
+    await message.answer(about_text, reply_markup=keyboard)
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "📝 Mustaqil ishlar")
+async def independent_works(message: types.Message):
+    """Mustaqil ishlar tayyorlash"""
+    works_text = (
+        "📝 Mustaqil ishlar tayyorlash:\n\n"
+        "Professional mustaqil ishlarni tayyorlab beramiz!\n\n"
+        "Quyidagi xizmatlardan birini tanlang:"
+    )
+    
+    # Mustaqil ishlar tugmalari
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🎓 Kurs ishi tayyorlash", callback_data="course_work")],
+        [InlineKeyboardButton(text="📄 Ilmiy maqola tayyorlash", callback_data="scientific_article")],
+        [InlineKeyboardButton(text="📚 Referat tayyorlash", callback_data="essay")],
+        [InlineKeyboardButton(text="📋 Mustaqil ish tayyorlash", callback_data="independent_work")],
+        [InlineKeyboardButton(text="📊 Hisobot tayyorlash", callback_data="report")]
+    ])
+    
+    await message.answer(works_text, reply_markup=keyboard)
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "🔧 Boshqa xizmatlar")
+async def other_services(message: types.Message):
+    """Boshqa xizmatlar"""
+    services_text = (
+        "🔧 Boshqa xizmatlar:\n\n"
+        "Professional dizayn va yozuv xizmatlarini taklif etamiz!\n\n"
+        "Quyidagi xizmatlardan birini tanlang:"
+    )
+    
+    # Boshqa xizmatlar tugmalari
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📋 Online taklifnoma (QR-kodli)", callback_data="online_invitation")],
+        [InlineKeyboardButton(text="📄 Rezyume", callback_data="resume")],
+        [InlineKeyboardButton(text="🎨 YouTube kanal uchun banner", callback_data="youtube_banner")],
+        [InlineKeyboardButton(text="🎯 Logo tayyorlash", callback_data="logo_design")]
+    ])
+    
+    await message.answer(services_text, reply_markup=keyboard)
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "🎮 Sehrli o'yin")
+async def magic_game(message: types.Message):
+    """Sehrli o'yin - Akinator"""
+    game_text = (
+        "🎮 Sehrli o'yin - Akinator\n\n"
+        "Men sizning fikringizni o'qib, siz haqingizda aytaman!\n\n"
+        "🤔 Akinator nima?\n"
+        "Bu mashhur o'yin sizning fikringizdagi shaxs, hayvon yoki narsani "
+        "faqat savollar berish orqali aniqlaydi!\n\n"
+        "🎯 Qanday o'ynaydi:\n"
+        "1. Siz biror kishi, hayvon yoki narsa haqida o'ylang\n"
+        "2. Akinator sizga savollar beradi\n"
+        "3. Siz \"Ha\", \"Yo'q\" yoki \"Ehtimol\" javob bering\n"
+        "4. Akinator sizning fikringizni aniqlaydi!\n\n"
+        "🚀 O'yinni boshlash uchun tugmani bosing!"
+    )
+    
+    # Akinator mini app tugmasi
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(
+            text="🎯 Akinator o'ynash", 
+            web_app=types.WebAppInfo(url="https://en.akinator.com/")
+        )]
+    ])
+    
+    await message.answer(game_text, reply_markup=keyboard)
+
+@router.message(StateFilter(OnboardingStates.MENU), F.text == "📞 Aloqa uchun")
+async def contact_us(message: types.Message):
+    """Aloqa uchun"""
+    # Admin havolalari
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Birinchi admin", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="👩‍💼 Ikkinchi admin", url="https://t.me/prezintatsiyauz_admin")],
+        [InlineKeyboardButton(text="👨‍💻 Direktor1", url="https://t.me/MUHAMMADS0DlQ")],
+        [InlineKeyboardButton(text="👨‍💻 Direktor2", url="https://t.me/MUKHAMMADSODlQ")]
+    ])
+    
+    contact_text = (
+        "📞 Biz bilan bog'laning:\n\n"
+        "Quyidagi adminlar bilan bog'laning:\n\n"
+        "🕐 Ish vaqti:\n"
+        "Dushanba - Juma: 09:00 - 18:00\n"
+        "Shanba - Yakshanba: 10:00 - 16:00\n\n"
+        "❓ Savollar bormi?\n"
+        "Har qanday savol va takliflar uchun adminlardan biriga yozing!"
+    )
+    
+    await message.answer(contact_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.message(Command("stats"))
+async def user_stats(message: types.Message):
+    """Foydalanuvchi statistikasi"""
+    if not message.from_user:
+        return
+    
+    stats = await get_user_statistics(message.from_user.id)
+    
+    stats_text = (
+        f"📊 Sizning statistikangiz:\n\n"
+        f"📈 Umumiy ko'rsatkichlar:\n"
+        f"• Yaratilgan taqdimotlar: {stats.get('total_presentations', 0)}\n"
+        f"• Faol kunlar: {stats.get('active_days', 0)}\n"
+        f"• So'nggi faollik: {stats.get('last_activity', 'Hali yoq')}\n\n"
+        f"🎯 Faoliyat:\n"
+        f"• Bu oy: {stats.get('this_month', 0)} ta taqdimot\n"
+        f"• O'tgan oy: {stats.get('last_month', 0)} ta taqdimot\n\n"
+        f"💡 Maslahat: Ko'proq taqdimot yaratib, tajribangizni oshiring!"
+    )
+    
+    await message.answer(stats_text, parse_mode="Markdown")
+
+@router.callback_query(F.data == "online_invitation")
+async def online_invitation_handler(callback: types.CallbackQuery):
+    """Online taklifnoma (QR-kodli)"""
+    await callback.answer("📋 Online taklifnoma...")
+    
+    service_text = (
+        "📋 Online taklifnoma (QR-kodli):\n\n"
+        "Professional online taklifnomalar tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• To'ylar uchun taklifnoma\n"
+        "• Tug'ilgan kun taklifnomasi\n"
+        "• Tadbirlar uchun taklifnoma\n"
+        "• Korxona tadbirlari\n"
+        "• QR-kod bilan\n\n"
+        "⏱️ Muddati: 1-3 kun\n"
+        "💰 Narx: Taklifnoma turiga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_services")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(service_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "resume")
+async def resume_handler(callback: types.CallbackQuery):
+    """Rezyume"""
+    await callback.answer("📄 Rezyume...")
+    
+    service_text = (
+        "📄 Rezyume tayyorlash:\n\n"
+        "Professional va zamonaviy rezyumelar tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Standart rezyume\n"
+        "• Kreativ rezyume\n"
+        "• IT mutaxassislar uchun\n"
+        "• Marketing uchun\n"
+        "• PDF va Word formatlarida\n\n"
+        "⏱️ Muddati: 1-2 kun\n"
+        "💰 Narx: Rezyume turiga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_services")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(service_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "youtube_banner")
+async def youtube_banner_handler(callback: types.CallbackQuery):
+    """YouTube kanal uchun banner"""
+    await callback.answer("🎨 YouTube banner...")
+    
+    service_text = (
+        "🎨 YouTube kanal uchun banner:\n\n"
+        "Professional YouTube kanal bannerlarini tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Standart YouTube banner\n"
+        "• Kreativ dizayn\n"
+        "• Kanal mavzusiga mos\n"
+        "• Mobil va desktop uchun\n"
+        "• PNG va JPG formatlarida\n\n"
+        "⏱️ Muddati: 1-2 kun\n"
+        "💰 Narx: Dizayn murakkabligiga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_services")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(service_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "logo_design")
+async def logo_design_handler(callback: types.CallbackQuery):
+    """Logo tayyorlash"""
+    await callback.answer("🎯 Logo dizayn...")
+    
+    service_text = (
+        "🎯 Logo tayyorlash:\n\n"
+        "Professional va zamonaviy logolarni tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Korporativ logo\n"
+        "• Kichik biznes logo\n"
+        "• Start-up logo\n"
+        "• Shaxsiy brend logo\n"
+        "• Turli formatlarda (PNG, SVG, PDF)\n\n"
+        "⏱️ Muddati: 2-5 kun\n"
+        "💰 Narx: Logo murakkabligiga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_services")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(service_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "back_to_services")
+async def back_to_services(callback: types.CallbackQuery):
+    """Boshqa xizmatlar sahifasiga qaytish"""
+    await callback.answer("⬅️ Orqaga...")
+    
+    services_text = (
+        "🔧 Boshqa xizmatlar:\n\n"
+        "Professional dizayn va yozuv xizmatlarini taklif etamiz!\n\n"
+        "Quyidagi xizmatlardan birini tanlang:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="📋 Online taklifnoma (QR-kodli)", callback_data="online_invitation")],
+        [InlineKeyboardButton(text="📄 Rezyume", callback_data="resume")],
+        [InlineKeyboardButton(text="🎨 YouTube kanal uchun banner", callback_data="youtube_banner")],
+        [InlineKeyboardButton(text="🎯 Logo tayyorlash", callback_data="logo_design")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(services_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "course_work")
+async def course_work_handler(callback: types.CallbackQuery):
+    """Kurs ishi tayyorlash"""
+    await callback.answer("🎓 Kurs ishi...")
+    
+    work_text = (
+        "🎓 Kurs ishi tayyorlash:\n\n"
+        "Professional kurs ishlarini tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Kurs ishi yozish (15-50 sahifa)\n"
+        "• Ilmiy tadqiqot ishlari\n"
+        "• Texnik kurs ishlari\n"
+        "• Iqtisodiy kurs ishlari\n"
+        "• Pedagogik kurs ishlari\n\n"
+        "⏱️ Muddati: 3-7 kun\n"
+        "💰 Narx: Mavzu va sahifalar soniga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_works")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(work_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "scientific_article")
+async def scientific_article_handler(callback: types.CallbackQuery):
+    """Ilmiy maqola tayyorlash"""
+    await callback.answer("📄 Ilmiy maqola...")
+    
+    work_text = (
+        "📄 Ilmiy maqola tayyorlash:\n\n"
+        "Ilmiy va akademik maqolalarni tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Ilmiy maqola yozish\n"
+        "• Akademik tadqiqot ishlari\n"
+        "• Konferensiya maqolalari\n"
+        "• Jurnal uchun maqolalar\n"
+        "• Ilmiy tezis yozish\n\n"
+        "⏱️ Muddati: 5-10 kun\n"
+        "💰 Narx: Mavzu va hajmga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_works")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(work_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "essay")
+async def essay_handler(callback: types.CallbackQuery):
+    """Referat tayyorlash"""
+    await callback.answer("📚 Referat...")
+    
+    work_text = (
+        "📚 Referat tayyorlash:\n\n"
+        "Har qanday mavzu bo'yicha referatlarni tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Akademik referatlar\n"
+        "• Ilmiy referatlar\n"
+        "• Mavzu referatlar\n"
+        "• Tadqiqot referatlar\n"
+        "• Xulosa referatlar\n\n"
+        "⏱️ Muddati: 2-5 kun\n"
+        "💰 Narx: Sahifalar soniga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_works")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(work_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "independent_work")
+async def independent_work_handler(callback: types.CallbackQuery):
+    """Mustaqil ish tayyorlash"""
+    await callback.answer("📋 Mustaqil ish...")
+    
+    work_text = (
+        "📋 Mustaqil ish tayyorlash:\n\n"
+        "Turli yo'nalishlardagi mustaqil ishlarni tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Akademik mustaqil ishlar\n"
+        "• Ilmiy mustaqil ishlar\n"
+        "• Amaliy mustaqil ishlar\n"
+        "• Tadqiqot mustaqil ishlar\n"
+        "• Yaratuvchilik ishlar\n\n"
+        "⏱️ Muddati: 3-7 kun\n"
+        "💰 Narx: Ish turi va hajmga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_works")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(work_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "report")
+async def report_handler(callback: types.CallbackQuery):
+    """Hisobot tayyorlash"""
+    await callback.answer("📊 Hisobot...")
+    
+    work_text = (
+        "📊 Hisobot tayyorlash:\n\n"
+        "Professional hisobotlarni tayyorlab beramiz!\n\n"
+        "📋 Xizmatlar:\n"
+        "• Tadqiqot hisobotlari\n"
+        "• Amaliy hisobotlar\n"
+        "• Ish hisobotlari\n"
+        "• Statistika hisobotlari\n"
+        "• Analiz hisobotlari\n\n"
+        "⏱️ Muddati: 2-5 kun\n"
+        "💰 Narx: Hisobot turi va hajmga qarab\n\n"
+        "📞 Buyurtma uchun admin bilan bog'laning:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="👨‍💼 Admin bilan bog'lanish", url="https://t.me/preuzadmin")],
+        [InlineKeyboardButton(text="⬅️ Orqaga", callback_data="back_to_works")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(work_text, reply_markup=keyboard, parse_mode="Markdown")
+
+@router.callback_query(F.data == "back_to_works")
+async def back_to_works(callback: types.CallbackQuery):
+    """Mustaqil ishlar sahifasiga qaytish"""
+    await callback.answer("⬅️ Orqaga...")
+    
+    works_text = (
+        "📝 Mustaqil ishlar tayyorlash:\n\n"
+        "Professional mustaqil ishlarni tayyorlab beramiz!\n\n"
+        "Quyidagi xizmatlardan birini tanlang:"
+    )
+    
+    keyboard = InlineKeyboardMarkup(inline_keyboard=[
+        [InlineKeyboardButton(text="🎓 Kurs ishi tayyorlash", callback_data="course_work")],
+        [InlineKeyboardButton(text="📄 Ilmiy maqola tayyorlash", callback_data="scientific_article")],
+        [InlineKeyboardButton(text="📚 Referat tayyorlash", callback_data="essay")],
+        [InlineKeyboardButton(text="📋 Mustaqil ish tayyorlash", callback_data="independent_work")],
+        [InlineKeyboardButton(text="📊 Hisobot tayyorlash", callback_data="report")]
+    ])
+    
+    if callback.message and hasattr(callback.message, 'edit_text') and not isinstance(callback.message, types.InaccessibleMessage):
+        await callback.message.edit_text(works_text, reply_markup=keyboard, parse_mode="Markdown")
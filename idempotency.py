@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict, defaultdict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+GENERATION_MAX_PER_USER = int(os.getenv("GENERATION_MAX_PER_USER", "1"))
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", "3600"))
+IDEMPOTENCY_MAX_KEYS = 10000
+
+# claim() rad etish sabablari
+IN_FLIGHT = "in_flight"
+DONE = "done"
+USER_CAP = "user_cap"
+
+
+def request_key(user_id: int, message_id: Optional[int], action: str) -> str:
+    """Idempotentlik kaliti: (foydalanuvchi, callback xabari, amal).
+
+    Ikki marta bosish yoki Telegram callback'ni qayta yuborishi bir xil kalit beradi,
+    yangi buyurtma oqimi esa yangi xabar - yangi kalit.
+    """
+    return f"{user_id}:{message_id or 0}:{action}"
+
+
+class GenerationRegistry:
+    """Bajarilayotgan (in-flight) va yaqinda bajarilgan generatsiya so'rovlari.
+
+    claim() hech qanday await'siz kalitni band qiladi - bitta jarayonda ikkinchi nusxa
+    birinchisi balansni yechib ulgurmasidan rad etiladi. Har bir foydalanuvchi uchun bir
+    vaqtda ishlaydigan generatsiyalar soni ham cheklanadi.
+    """
+
+    def __init__(self, max_per_user: int = GENERATION_MAX_PER_USER, ttl: int = IDEMPOTENCY_TTL):
+        self.max_per_user = max(1, max_per_user)
+        self.ttl = ttl
+        # kalit -> foydalanuvchi id (hali tugamagan)
+        self._in_flight: Dict[str, int] = {}
+        # kalit -> tugagan vaqt (monotonic), eskilari TTL bo'yicha tozalanadi
+        self._done: "OrderedDict[str, float]" = OrderedDict()
+        self._per_user: Dict[int, int] = defaultdict(int)
+        self.duplicates = 0
+        self.capped = 0
+
+    def _prune(self):
+        cutoff = time.monotonic() - self.ttl
+        while self._done and (next(iter(self._done.values())) < cutoff or len(self._done) > IDEMPOTENCY_MAX_KEYS):
+            self._done.popitem(last=False)
+
+    def claim(self, key: str, user_id: int) -> Optional[str]:
+        """Kalitni band qilish. Muvaffaqiyatli bo'lsa None, aks holda rad etish sababi"""
+        self._prune()
+        if key in self._in_flight:
+            self.duplicates += 1
+            return IN_FLIGHT
+        if key in self._done:
+            self.duplicates += 1
+            return DONE
+        if self._per_user[user_id] >= self.max_per_user:
+            self.capped += 1
+            return USER_CAP
+        self._in_flight[key] = user_id
+        self._per_user[user_id] += 1
+        return None
+
+    def release(self, key: str):
+        """Ish boshlanmadi (masalan, balans yetmadi) - kalit qayta urinish uchun bo'shatiladi"""
+        user_id = self._in_flight.pop(key, None)
+        if user_id is not None:
+            self._finish_user(user_id)
+
+    def finish(self, key: str):
+        """Ish tugadi (muvaffaqiyatli yoki xatolik bilan) - takroriy so'rovlar endi DONE oladi"""
+        user_id = self._in_flight.pop(key, None)
+        if user_id is not None:
+            self._finish_user(user_id)
+        self._done[key] = time.monotonic()
+        self._done.move_to_end(key)
+
+    def track(self, key: str, task: asyncio.Task):
+        """Generatsiya vazifasi tugaganda kalitni avtomatik yakunlash"""
+        task.add_done_callback(lambda _: self.finish(key))
+
+    def _finish_user(self, user_id: int):
+        self._per_user[user_id] -= 1
+        if self._per_user[user_id] <= 0:
+            del self._per_user[user_id]
+
+    def snapshot(self) -> Dict[str, int]:
+        return {
+            "in_flight": len(self._in_flight),
+            "users_in_flight": len(self._per_user),
+            "recent_done": len(self._done),
+            "duplicates": self.duplicates,
+            "capped": self.capped,
+        }
+
+
+# Jarayon bo'ylab yagona registr
+generation_registry = GenerationRegistry()
@@ -0,0 +1,248 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+import uuid
+from collections import defaultdict
+from typing import Any, Dict, NamedTuple, Optional, Set
+
+import numpy as np
+
+from deck_optimizer import fit_image
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+IMAGE_INDEX_ENABLED = os.getenv("IMAGE_INDEX_ENABLED", "1") == "1"
+IMAGE_INDEX_DIR = os.getenv("IMAGE_INDEX_DIR", "image_index")
+# Indeksdagi rasmlar soni; to'lganda eng eskilari ustidan yoziladi
+IMAGE_INDEX_CAPACITY = int(os.getenv("IMAGE_INDEX_CAPACITY", "10000"))
+# Qaysi tariflarda o'xshash prompt uchun avvalgi rasm qayta ishlatiladi
+IMAGE_REUSE_TARIFFS = os.getenv("IMAGE_REUSE_TARIFFS", "START")
+# Kosinus o'xshashlik chegarasi (1 - aynan bir xil so'zlar)
+IMAGE_REUSE_THRESHOLD = float(os.getenv("IMAGE_REUSE_THRESHOLD", "0.7"))
+VECTOR_DIM = 512
+# Rasm PPTX dagi o'lchamida (3.5 dyuym) saqlanadi - deck_optimizer baribir shunchagacha kichraytiradi
+STORED_IMAGE_INCHES = 3.5
+
+_WORD = re.compile(r"[^\W_]+")
+# Ma'no bermaydigan so'zlar va rasm promptlaridagi umumiy to'ldiruvchilar
+STOPWORDS = {
+    "a", "an", "the", "of", "in", "on", "at", "for", "with", "and", "or", "to", "by", "from", "into", "over",
+    "under", "is", "are", "as", "its", "their", "this", "that", "some", "showing", "depicting", "featuring",
+    "image", "illustration", "picture", "photo", "professional", "style",
+    "va", "bilan", "uchun", "bu", "ham", "yoki", "rasm", "rasmi", "tasvir", "tasviri",
+}
+
+
+def embed(prompt: str, dim: int = VECTOR_DIM) -> np.ndarray:
+    """Promptning L2-normallangan vektori (hashing trick: so'zlar va ularning 3-harfli bo'laklari).
+
+    So'z tartibi hisobga olinmaydi, 3-harfli bo'laklar esa qo'shimchalarni (students/student,
+    o'quvchilar/o'quvchi) yaqinlashtiradi. Hash barqaror - indeks qayta ishga tushishdan keyin ham ishlaydi.
+    """
+    text = prompt.lower()
+    for apostrophe in ("'", "`", "ʻ", "ʼ", "’", "‘"):
+        text = text.replace(apostrophe, "")
+    vector = np.zeros(dim, dtype=np.float32)
+    for word in _WORD.findall(text):
+        if (len(word) < 2 and not word.isdigit()) or word in STOPWORDS:
+            continue
+        features = [(f"w:{word}", 1.0)]
+        padded = f"<{word}>"
+        features += [(f"c:{padded[i:i + 3]}", 0.4) for i in range(len(padded) - 2)]
+        for feature, weight in features:
+            digest = int.from_bytes(hashlib.blake2b(feature.encode("utf-8"), digest_size=8).digest(), "little")
+            vector[digest % dim] += weight if digest >> 63 else -weight
+    norm = float(np.linalg.norm(vector))
+    return vector / norm if norm else vector
+
+
+class ImageMatch(NamedTuple):
+    row: int
+    score: float
+    prompt: str
+    data: bytes
+
+
+class ImageIndex:
+    """Avval yaratilgan rasmlar promptlari bo'yicha eng yaqin qo'shni qidiruvi.
+
+    Vektorlar diskdagi float32 matritsada (np.memmap, capacity x VECTOR_DIM), har bir qator
+    uchun rasm fayli va prompt meta.jsonl da. Qidiruv - bitta matritsa-vektor ko'paytmasi
+    (normallangan vektorlar uchun kosinus). Barcha disk va CPU ishi alohida oqimda bajariladi.
+    """
+
+    def __init__(self, directory: str = IMAGE_INDEX_DIR, capacity: int = IMAGE_INDEX_CAPACITY,
+                 threshold: float = IMAGE_REUSE_THRESHOLD, reuse_tariffs: str = IMAGE_REUSE_TARIFFS,
+                 enabled: bool = IMAGE_INDEX_ENABLED):
+        self.directory = directory
+        self.capacity = max(1, capacity)
+        self.threshold = threshold
+        self.reuse_tariffs = {tariff.strip() for tariff in reuse_tariffs.split(",") if tariff.strip()}
+        self.enabled = enabled
+        self._vectors: Optional[np.memmap] = None
+        self._rows: Dict[int, Dict[str, Any]] = {}
+        self._count = 0
+        self._meta_lines = 0
+        self._lock = asyncio.Lock()
+        self._open_lock = threading.Lock()
+        # _add va _search turli oqimlarda ishlaydi: qator vektori va uning metasi birga o'zgaradi
+        self._rows_lock = threading.Lock()
+        self._tasks = set()
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.search_ms = 0.0
+
+    def reuse_enabled(self, tariff: Optional[str]) -> bool:
+        return self.enabled and tariff in self.reuse_tariffs
+
+    # --- disk (oqim ichida) ---
+
+    @property
+    def _meta_path(self) -> str:
+        return os.path.join(self.directory, "meta.jsonl")
+
+    def _open(self):
+        with self._open_lock:
+            if self._vectors is None:
+                self._load()
+
+    def _load(self):
+        os.makedirs(os.path.join(self.directory, "images"), exist_ok=True)
+        vectors_path = os.path.join(self.directory, "vectors.f32")
+        expected = self.capacity * VECTOR_DIM * 4
+        if os.path.exists(vectors_path) and os.path.getsize(vectors_path) == expected:
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="r+", shape=(self.capacity, VECTOR_DIM))
+            if os.path.exists(self._meta_path):
+                with open(self._meta_path, encoding="utf-8") as f:
+                    for line in f:
+                        if line.strip():
+                            entry = json.loads(line)
+                            # seq bo'lmagan eski yozuvlarda tartib raqami - qator raqami
+                            entry.setdefault("seq", self._meta_lines)
+                            self._rows[entry["row"]] = entry
+                            self._count = max(self._count, entry["seq"] + 1)
+                            self._meta_lines += 1
+        else:
+            if os.path.exists(vectors_path):
+                logger.warning(f"Rasm indeksi o'lchami o'zgargan ({vectors_path}) - indeks yangidan boshlanadi")
+                for name in os.listdir(os.path.join(self.directory, "images")):
+                    os.remove(os.path.join(self.directory, "images", name))
+            self._vectors = np.memmap(vectors_path, dtype=np.float32, mode="w+", shape=(self.capacity, VECTOR_DIM))
+            open(self._meta_path, "w").close()
+        logger.info(f"Rasm indeksi yuklandi: {len(self._rows)} ta rasm, {self.directory}")
+
+    def _search(self, vector: np.ndarray, exclude: Set[int]) -> Optional[ImageMatch]:
+        self._open()
+        size = min(self._count, self.capacity)
+        if size == 0:
+            return None
+        with self._rows_lock:
+            scores = self._vectors[:size] @ vector
+            if exclude:
+                scores[[row for row in exclude if row < size]] = -1.0
+            row = int(np.argmax(scores))
+            score = float(scores[row])
+            entry = self._rows.get(row)
+        if score < self.threshold or entry is None:
+            return None
+        try:
+            with open(os.path.join(self.directory, "images", entry["file"]), "rb") as f:
+                return ImageMatch(row, score, entry["prompt"], f.read())
+        except OSError:
+            return None
+
+    def _add(self, prompt: str, vector: np.ndarray, data: bytes):
+        self._open()
+        image, kind = fit_image(data, STORED_IMAGE_INCHES, STORED_IMAGE_INCHES)
+        row = self._count % self.capacity
+        old = self._rows.get(row)
+        name = f"{uuid.uuid4().hex}.{kind}"
+        with open(os.path.join(self.directory, "images", name), "wb") as f:
+            f.write(image)
+        entry = {"row": row, "seq": self._count, "file": name, "prompt": prompt, "created": int(time.time())}
+        with self._rows_lock:
+            self._vectors[row] = vector
+            self._rows[row] = entry
+            self._count += 1
+        self._vectors.flush()
+        with open(self._meta_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._meta_lines += 1
+        if self._meta_lines > 2 * self.capacity:
+            self._compact()
+        if old is not None:
+            try:
+                os.remove(os.path.join(self.directory, "images", old["file"]))
+            except OSError:
+                pass
+
+    def _compact(self):
+        """meta.jsonl ni faqat hozirgi qatorlar bilan qayta yozish (ustidan yozilgan eski yozuvlar o'chadi)"""
+        with self._rows_lock:
+            entries = sorted(self._rows.values(), key=lambda entry: entry["seq"])
+        temp_path = self._meta_path + ".tmp"
+        with open(temp_path, "w", encoding="utf-8") as f:
+            for entry in entries:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        os.replace(temp_path, self._meta_path)
+        self._meta_lines = len(entries)
+
+    # --- async API ---
+
+    async def find(self, prompt: str, exclude: Optional[Set[int]] = None) -> Optional[ImageMatch]:
+        """Chegaradan o'xshashroq prompt bilan yaratilgan rasm (exclude - shu taqdimotda ishlatilgan qatorlar)"""
+        if not self.enabled:
+            return None
+        started = time.perf_counter()
+        try:
+            match = await asyncio.to_thread(self._search, embed(prompt), exclude or set())
+        except Exception as e:
+            logger.error(f"Rasm indeksida qidirishda xatolik: {e}")
+            self.counters["errors"] += 1
+            return None
+        self.search_ms += (time.perf_counter() - started) * 1000
+        self.counters["hits" if match else "misses"] += 1
+        if match:
+            logger.info(f"Rasm qayta ishlatildi ({match.score:.2f}): '{prompt}' ~ '{match.prompt}'")
+        return match
+
+    async def add(self, prompt: str, data: bytes):
+        if not self.enabled:
+            return
+        try:
+            async with self._lock:
+                await asyncio.to_thread(self._add, prompt, embed(prompt), bytes(data))
+            self.counters["added"] += 1
+        except Exception as e:
+            logger.error(f"Rasmni indeksga qo'shishda xatolik: {e}")
+            self.counters["errors"] += 1
+
+    def remember(self, prompt: str, data: bytes):
+        """Yangi rasmni fonda indeksga qo'shish (taqdimot buni kutmaydi)"""
+        if not self.enabled:
+            return
+        task = asyncio.create_task(self.add(prompt, data))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def snapshot(self) -> Dict[str, Any]:
+        searches = self.counters["hits"] + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "size": min(self._count, self.capacity) if self._vectors is not None else None,
+            "capacity": self.capacity,
+            "threshold": self.threshold,
+            "reuse_tariffs": sorted(self.reuse_tariffs),
+            "hit_rate": round(self.counters["hits"] / searches, 3) if searches else 0.0,
+            "avg_search_ms": round(self.search_ms / searches, 2) if searches else 0.0,
+            **self.counters,
+        }
+
+
+# Jarayon bo'ylab yagona indeks
+image_index = ImageIndex()
@@ -0,0 +1,106 @@
+import logging
+import os
+from datetime import datetime
+
+import pytz
+from dotenv import load_dotenv
+
+from aiogram import Bot, Dispatcher
+
+from reachability import ReachabilityMiddleware, ReachabilityRefresher
+from broadcast import BroadcastEngine
+from fsm_storage import create_storage
+from click_client import click_client
+from openai_gateway import openai_gateway
+from payment_reconciler import PaymentReconciler
+from handler_metrics import setup_handler_metrics
+from loop_monitor import loop_monitor
+from render_pool import render_pool
+
+# .env faylini yuklash
+load_dotenv()
+
+# Bot tokenini environment variabledan olish
+BOT_TOKEN = os.getenv("BOT_TOKEN")
+if not BOT_TOKEN:
+    raise ValueError("BOT_TOKEN environment variablesi topilmadi!")
+
+# OpenAI klienti birinchi taqdimot yaratilganda (pptx_generator ichida) yuklanadi
+if os.getenv("OPENAI_API_KEY", "test_key") == "test_key":
+    print("OPENAI_API_KEY topilmadi! Test rejimida ishlaydi.")
+
+# Admin ID larini environment variabledan olish
+ADMIN_IDS = os.getenv("ADMIN_IDS", "").split(",")
+ADMIN_IDS = [int(admin_id.strip()) for admin_id in ADMIN_IDS if admin_id.strip()]
+
+# Vaqt sozlamalari
+TASHKENT_TZ = pytz.timezone('Asia/Tashkent')
+
+def get_current_time():
+    """Hozirgi Toshkent vaqtini qaytaradi"""
+    return datetime.now(TASHKENT_TZ)
+
+def format_time(dt=None):
+    """Vaqtni formatlash"""
+    if dt is None:
+        dt = get_current_time()
+    return dt.strftime("%Y-%m-%d %H:%M:%S")
+
+# Logging sozlash
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+
+# Yagona Bot (bitta HTTP sessiya) va Dispatcher - barcha routerlar shu yerga ulanadi
+bot = Bot(token=BOT_TOKEN)
+# Holat topilmasa (eskirgan yozuv) None qaytadi: MENU faqat /start ro'yxatdan o'tganini tekshirgandan
+# keyin qo'yiladi, aks holda ro'yxatdan o'tmaganlar menyu handlerlariga kirib qoladi
+storage = create_storage()
+dp = Dispatcher(storage=storage)
+# Har bir handler davomiyligi va sekin chaqiruvlar namunalari (/slow)
+setup_handler_metrics(dp)
+
+# Foydalanuvchi holatini (bloklagan / faol) Bot API javoblaridan yig'ish
+bot.session.middleware(ReachabilityMiddleware())
+reachability_refresher = ReachabilityRefresher(bot)
+broadcast_engine = BroadcastEngine(bot)
+payment_reconciler = PaymentReconciler(bot)
+
+@dp.startup()
+async def on_startup():
+    """Fon vazifalarini ishga tushirish"""
+    loop_monitor.start()
+    reachability_refresher.start()
+    await broadcast_engine.resume_unfinished()
+    payment_reconciler.start()
+
+@dp.shutdown()
+async def on_shutdown():
+    """Fon vazifalarini to'xtatish"""
+    await broadcast_engine.stop()
+    await payment_reconciler.stop()
+    await reachability_refresher.stop()
+    await click_client.close()
+    await openai_gateway.close()
+    render_pool.shutdown()
+    await storage.close()
+
+# Global error handler
+@dp.error()
+async def error_handler(event, exception):
+    """Global error handler"""
+    logging.error(f"Bot xatoligi: event={event}, exception={exception}")
+    print(f"Bot xatoligi: {exception}")
+
+    # Foydalanuvchiga umumiy xatolik xabari
+    if hasattr(event, 'message') and event.message:
+        try:
+            await event.message.answer(
+                "❌ Xatolik yuz berdi!\n\n"
+                "Iltimos, qaytadan urinib ko'ring yoki /start buyrug'ini yuboring.",
+            )
+        except:
+            pass
+
+    return True
@@ -0,0 +1,155 @@
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from datetime import datetime
+from typing import Any, Deque, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+LOOP_LAG_INTERVAL = float(os.getenv("LOOP_LAG_INTERVAL", "0.1"))
+LOOP_LAG_THRESHOLD_MS = float(os.getenv("LOOP_LAG_THRESHOLD_MS", "250"))
+LOOP_LAG_DEGRADED_MS = float(os.getenv("LOOP_LAG_DEGRADED_MS", "500"))
+LOOP_LAG_WINDOW = float(os.getenv("LOOP_LAG_WINDOW", "60"))
+LOOP_LAG_EVENTS = 20
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * q))], 1)
+
+
+class LoopLagMonitor:
+    """Event loop kechikishini o'lchash va bloklovchi kodni topish.
+
+    Monitor task har `interval` soniyada uxlab, kechikib uyg'onganini (lag) yozadi. Alohida
+    watchdog oqimi monitor yurak urishini kuzatadi: loop `threshold_ms` dan ko'proq javob
+    bermasa, asosiy oqim stekini o'sha paytda oladi - ya'ni loop'ni aynan nima bloklaganini.
+    """
+
+    def __init__(self, interval: float = LOOP_LAG_INTERVAL, threshold_ms: float = LOOP_LAG_THRESHOLD_MS,
+                 degraded_ms: float = LOOP_LAG_DEGRADED_MS, window: float = LOOP_LAG_WINDOW):
+        self.interval = interval
+        self.threshold_ms = threshold_ms
+        self.degraded_ms = degraded_ms
+        self.window = window
+        # (monotonic vaqt, lag ms) - oxirgi `window` soniya
+        self._samples: Deque[Tuple[float, float]] = deque()
+        self.events: Deque[Dict[str, Any]] = deque(maxlen=LOOP_LAG_EVENTS)
+        self.stalls = 0
+        self.max_lag_ms = 0.0
+        self._heartbeat = time.monotonic()
+        self._stall_stack: Optional[str] = None
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._watchdog: Optional[threading.Thread] = None
+        self._stop = threading.Event()
+
+    # --- monitor task (event loop ichida) ---
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            now = time.monotonic()
+            self._heartbeat = now
+            self._record(now, max(0.0, (now - started - self.interval) * 1000))
+
+    def _record(self, now: float, lag_ms: float):
+        self._samples.append((now, lag_ms))
+        while self._samples and self._samples[0][0] < now - self.window:
+            self._samples.popleft()
+        self.max_lag_ms = max(self.max_lag_ms, lag_ms)
+
+        if lag_ms >= self.threshold_ms:
+            self.stalls += 1
+            stack, self._stall_stack = self._stall_stack, None
+            self.events.append({
+                "at": datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                "lag_ms": round(lag_ms, 1),
+                "stack": stack,
+            })
+            if stack:
+                logger.warning(f"Event loop {lag_ms:.0f} ms bloklandi. Bloklagan joy:\n{stack}")
+            else:
+                logger.warning(f"Event loop {lag_ms:.0f} ms kechikdi (stek olinmadi)")
+
+    # --- watchdog oqimi ---
+
+    def _watch(self):
+        threshold = self.interval + self.threshold_ms / 1000
+        captured_for = None
+        while not self._stop.wait(min(self.threshold_ms / 2000, 0.25)):
+            heartbeat = self._heartbeat
+            if time.monotonic() - heartbeat < threshold or captured_for == heartbeat:
+                continue
+            # Loop javob bermayapti - asosiy oqim hozir nima qilayotganini olish (har to'xtashda bir marta)
+            captured_for = heartbeat
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is not None:
+                self._stall_stack = "".join(traceback.format_stack(frame))
+
+    # --- boshqaruv ---
+
+    def start(self):
+        """Joriy event loop uchun monitorni ishga tushirish (takroriy chaqiruv hech narsa qilmaydi)"""
+        if self._task is not None and not self._task.done():
+            return
+        if self._watchdog is not None and self._watchdog.is_alive():
+            self._watchdog.join(1)
+        self._loop_thread_id = threading.get_ident()
+        self._heartbeat = time.monotonic()
+        self._stop.clear()
+        self._task = asyncio.create_task(self._run())
+        self._watchdog = threading.Thread(target=self._watch, name="loop-lag-watchdog", daemon=True)
+        self._watchdog.start()
+
+    async def stop(self):
+        self._stop.set()
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    # --- ko'rsatkichlar ---
+
+    def current_stall_ms(self) -> float:
+        """Loop hozir javob bermayotgan bo'lsa - qancha vaqtdan beri (ms)"""
+        if self._task is None:
+            return 0.0
+        return max(0.0, (time.monotonic() - self._heartbeat - self.interval) * 1000)
+
+    def is_degraded(self) -> bool:
+        """Oxirgi oynadagi p95 kechikish yoki hozirgi to'xtash chegaradan oshganmi"""
+        lags = [lag for _, lag in self._samples]
+        return _percentile(lags, 0.95) >= self.degraded_ms or self.current_stall_ms() >= self.degraded_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        lags = [lag for _, lag in self._samples]
+        return {
+            "running": self._task is not None,
+            "window_s": self.window,
+            "samples": len(lags),
+            "p50_ms": _percentile(lags, 0.5),
+            "p95_ms": _percentile(lags, 0.95),
+            "p99_ms": _percentile(lags, 0.99),
+            "window_max_ms": round(max(lags), 1) if lags else 0.0,
+            "max_ms": round(self.max_lag_ms, 1),
+            "stalls": self.stalls,
+            "degraded": self.is_degraded(),
+            "recent_stalls": [{k: v for k, v in e.items() if k != "stack"} for e in self.events],
+        }
+
+
+# Jarayon bo'ylab yagona monitor
+loop_monitor = LoopLagMonitor()
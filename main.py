@@ -1,25 +1,22 @@
 import os
 import logging
 import asyncio
+import importlib
 import sys
 from datetime import datetime
 from dotenv import load_dotenv
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 import uvicorn
-# Bot import'larni try-catch bilan o'rab olamiz
-try:
-    from bot import dp, bot
-    from admin_panel import dp as admin_dp
-    from database_adapter import init_db
-    BOT_AVAILABLE = True
-except Exception as e:
-    print(f"Bot import xatoligi: {e}")
-    BOT_AVAILABLE = False
-    dp = None
-    bot = None
-    admin_dp = None
-    init_db = None
+from startup import startup_report
+from loop_monitor import loop_monitor
+from webhook import BOT_MODE, SECRET_HEADER, WEBHOOK_PATH, UpdateQueue, setup_webhook, webhook_secret
+
+# Bot (aiogram, handlerlar) bu yerda import qilinmaydi: /health darhol javob berishi uchun
+# start_bot() uni fonda yuklaydi. Yuklangunga qadar quyidagilar None bo'ladi.
+dp = None
+bot = None
+update_queue = None
 
 # Windows'da Unicode belgilar uchun encoding sozlash
 if sys.platform == "win32":
@@ -43,63 +40,172 @@ BOT_TOKEN = os.getenv("BOT_TOKEN")
 # FastAPI app yaratish
 app = FastAPI(title="Telegram Bot API", version="1.0.0")
 
+WEBHOOK_SECRET_TOKEN = webhook_secret(BOT_TOKEN or "")
+
 @app.on_event("startup")
 async def startup_event():
     """FastAPI startup event"""
     print("FastAPI application started")
+    startup_report.details["http_ready_ms"] = startup_report.elapsed_ms()
+    # Event loop kechikishini boshidanoq kuzatish (bot importi ham shu loop yonida ishlaydi)
+    loop_monitor.start()
     # Bot'ni background'da ishga tushirish (non-blocking)
-    if BOT_AVAILABLE:
-        asyncio.create_task(start_bot())
-        print("Bot startup task created")
-    else:
-        print("Bot not available - running in API-only mode")
+    asyncio.create_task(start_bot())
+    print("Bot startup task created")
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Webhook rejimida navbatni tugatib, fon vazifalarini to'xtatish"""
+    if update_queue and update_queue.running:
+        await update_queue.stop()
+        await dp.emit_shutdown(**dp.workflow_data, bot=bot)
+        await bot.session.close()
+    await loop_monitor.stop()
 
 @app.get("/health")
 async def health_check():
-    """Healthcheck endpoint Railway uchun"""
+    """Healthcheck endpoint Railway uchun (bot yuklanishini kutmaydi).
+
+    Event loop uzoq vaqt kechiksa "degraded" qaytadi (200 bilan - konteyner qayta ishga tushirilmaydi)
+    """
+    if loop_monitor.is_degraded():
+        lag = loop_monitor.snapshot()
+        return {"status": "degraded", "loop_lag_p95_ms": lag["p95_ms"], "loop_stall_ms": round(loop_monitor.current_stall_ms(), 1)}
     return {"status": "healthy"}
 
+@app.get("/health/startup")
+async def startup_health():
+    """Ishga tushish bosqichlari va ularning vaqti"""
+    return startup_report.snapshot()
+
 @app.get("/")
 async def root():
     """Root endpoint"""
     return {"message": "Telegram Bot is running", "status": "active"}
 
+@app.post(WEBHOOK_PATH)
+async def telegram_webhook(request: Request):
+    """Telegram update'larini qabul qilish: tekshirib, navbatga qo'yib, darhol javob qaytaradi"""
+    if BOT_MODE != "webhook":
+        return JSONResponse({"ok": False, "error": "webhook mode disabled"}, status_code=404)
+    if request.headers.get(SECRET_HEADER) != WEBHOOK_SECRET_TOKEN:
+        return JSONResponse({"ok": False, "error": "forbidden"}, status_code=403)
+
+    try:
+        data = await request.json()
+    except Exception:
+        return JSONResponse({"ok": False, "error": "bad request"}, status_code=400)
+
+    # Navbat to'la (yoki bot hali ishga tushmagan) - Telegram update'ni keyinroq qayta yuboradi
+    if not update_queue or not update_queue.submit(data):
+        return JSONResponse({"ok": False, "error": "busy"}, status_code=503)
+    return {"ok": True}
+
+@app.get("/metrics")
+async def metrics():
+    """Webhook navbati va FSM storage ko'rsatkichlari"""
+    result = {"mode": BOT_MODE, "startup": startup_report.status, "loop_lag": loop_monitor.snapshot()}
+    if update_queue:
+        result["webhook"] = update_queue.metrics()
+    if dp:
+        from handler_metrics import handler_metrics
+        from generation_queue import generation_queue
+        from idempotency import generation_registry
+        from image_index import image_index
+        from openai_scheduler import openai_scheduler
+        from render_pool import render_pool
+        from speculation import speculative_slots
+        result["handlers"] = handler_metrics.slowest(limit=20)
+        result["generation"] = generation_registry.snapshot()
+        result["generation_queue"] = generation_queue.snapshot()
+        result["openai"] = openai_scheduler.snapshot()
+        result["speculation"] = speculative_slots.snapshot()
+        result["render_pool"] = render_pool.snapshot()
+        result["image_index"] = image_index.snapshot()
+    gauges = getattr(dp.storage, "gauges", None) if dp else None
+    if gauges:
+        result["fsm_storage"] = gauges()
+    return result
+
+async def load_bot():
+    """bot modulini (aiogram, routerlar) alohida oqimda import qilish - event loop /health ga javob beradi"""
+    global dp, bot, update_queue
+    with startup_report.phase("import_bot"):
+        module = await asyncio.to_thread(importlib.import_module, "bot")
+    dp, bot = module.dp, module.bot
+
+    from handlers import ROUTER_IMPORT_MS
+    startup_report.details["router_import_ms"] = ROUTER_IMPORT_MS
+
+    # Webhook rejimida update'lar navbati (polling rejimida ishlatilmaydi)
+    if BOT_MODE == "webhook":
+        update_queue = UpdateQueue(dp, bot)
+
+async def warm_up():
+    """Og'ir generatsiya kutubxonalari va fon rasmlarini bot ishlay boshlagandan keyin yuklash"""
+    try:
+        with startup_report.phase("warmup"):
+            module = await asyncio.to_thread(importlib.import_module, "pptx_generator")
+            loaded = await asyncio.to_thread(module.warm_up)
+            startup_report.details["warmup_asset_bytes"] = loaded
+            from render_pool import render_pool
+            await render_pool.warm_up()
+    except Exception as e:
+        logger.error(f"Warm-up xatoligi: {e}")
+
 async def start_bot():
     """Bot'ni ishga tushirish funksiyasi"""
-    if not BOT_AVAILABLE:
-        print("Bot not available - skipping bot startup")
-        return
-        
     try:
         if not BOT_TOKEN:
             print("BOT_TOKEN topilmadi - bot ishlamaydi")
+            startup_report.mark("failed", "BOT_TOKEN topilmadi")
             return
         
         if not os.getenv("OPENAI_API_KEY"):
             print("OPENAI_API_KEY topilmadi - bot ishlamaydi")
+            startup_report.mark("failed", "OPENAI_API_KEY topilmadi")
             return
         
-        # Ma'lumotlar bazasini ishga tushirish
-        if init_db:
+        await load_bot()
+        
+        # Ma'lumotlar bazasini ishga tushirish (faqat pragma va migratsiyalar)
+        from database_adapter import init_db
+        with startup_report.phase("init_db"):
             await init_db()
-            print("Database initialized successfully")
+        print("Database initialized successfully")
         
-        # Webhookni to'liq o'chirish
-        if bot:
-            try:
-                await bot.delete_webhook(drop_pending_updates=True)
-                print("Webhook deleted successfully")
-            except Exception as e:
-                print(f"Webhook o'chirishda xatolik: {e}")
+        if update_queue:
+            # Webhook rejimi: update'lar /webhook orqali keladi, polling ishlatilmaydi
+            with startup_report.phase("dispatcher_startup"):
+                await dp.emit_startup(**dp.workflow_data, bot=bot)
+                update_queue.start()
+            with startup_report.phase("set_webhook"):
+                url = await setup_webhook(bot, dp, WEBHOOK_SECRET_TOKEN)
+            if url:
+                print(f"Webhook o'rnatildi: {url}")
+            startup_report.mark("ready")
+            asyncio.create_task(warm_up())
+            return
+
+        # Polling uchun webhookni o'chirish (kutilayotgan update'lar saqlanadi)
+        try:
+            with startup_report.phase("delete_webhook"):
+                await bot.delete_webhook(drop_pending_updates=False)
+            print("Webhook deleted successfully")
+        except Exception as e:
+            print(f"Webhook o'chirishda xatolik: {e}")
         
         print("Starting bot polling...")
-        # Bot polling'ni ishga tushirish
-        if dp and bot:
-            await dp.start_polling(bot)
+        # Polling boshlanishi bilan tayyor deb hisoblanadi, warm-up fonda davom etadi
+        startup_report.mark("ready")
+        asyncio.create_task(warm_up())
+        await dp.start_polling(bot)
         
     except Exception as e:
         print(f"Bot ishga tushishda xatolik: {e}")
         logger.error(f"Bot error: {e}")
+        if startup_report.status != "ready":
+            startup_report.mark("failed", str(e)[:200])
 
 def start_services():
     """Asosiy funksiya - FastAPI server'ni ishga tushirish"""
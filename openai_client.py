@@ -2,14 +2,14 @@ import os
 import json
 import asyncio
 from typing import Dict, List, Any
-from openai import AsyncOpenAI
 from dotenv import load_dotenv
 
+from openai_gateway import openai_gateway
+
 # .env faylini yuklash
 load_dotenv()
 
-# OpenAI client yaratish
-client = AsyncOpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+# OpenAI so'rovlari openai_gateway orqali (OPENAI_MODE=record/replay kassetalari ham shu yerda)
 
 async def generate_presentation_content(topic: str, pages: int) -> Dict[str, Any]:
     """
@@ -58,7 +58,7 @@ Muhim: Faqat JSON formatida javob bering, boshqa matn qo'shmang.
         
         # OpenAI API ga so'rov yuborish (timeout bilan)
         response = await asyncio.wait_for(
-            client.chat.completions.create(
+            openai_gateway.chat(
                 model="gpt-3.5-turbo",
                 messages=[
                     {
@@ -176,7 +176,7 @@ Uzunlik: 200-300 so'z
 Format: Oddiy matn
 """
         
-        response = await client.chat.completions.create(
+        response = await openai_gateway.chat(
             model="gpt-3.5-turbo",
             messages=[
                 {
@@ -208,7 +208,7 @@ async def test_openai_connection() -> bool:
     """
     
     try:
-        response = await client.chat.completions.create(
+        response = await openai_gateway.chat(
             model="gpt-3.5-turbo",
             messages=[
                 {
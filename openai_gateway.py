@@ -0,0 +1,234 @@
+import asyncio
+import base64
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Any, Dict, List, Optional
+
+import aiohttp
+from dotenv import load_dotenv
+
+from openai_scheduler import estimate_tokens, openai_scheduler
+
+# openai kutubxonasi birinchi so'rovda yuklanadi (bot tez ishga tushadi)
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+# live - haqiqiy API, record - haqiqiy API + kassetaga yozish, replay - faqat kassetadan
+OPENAI_MODE = os.getenv("OPENAI_MODE", "live").lower()
+OPENAI_CASSETTE = os.getenv("OPENAI_CASSETTE", "cassettes/openai.jsonl.gz")
+# Replay'da yozib olingan kechikishning qancha qismi kutiladi (0 - darhol, 1 - aynan yozilgandek)
+OPENAI_REPLAY_LATENCY = float(os.getenv("OPENAI_REPLAY_LATENCY", "0"))
+OPENAI_TIMEOUT = float(os.getenv("OPENAI_TIMEOUT", "120"))
+
+
+class CassetteMiss(Exception):
+    """Replay rejimida so'rovga mos yozuv topilmadi"""
+
+
+def request_key(kind: str, request: Dict[str, Any]) -> str:
+    """So'rovning barqaror kaliti (bir xil so'rov - bir xil kalit)"""
+    canonical = json.dumps({"kind": kind, **request}, sort_keys=True, ensure_ascii=False)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+class Cassette:
+    """gzip JSONL fayl: har bir qator - bitta so'rov/javob juftligi va uning kechikishi.
+
+    Yozish faylga qo'shib boriladi (har safar yangi gzip a'zosi), shuning uchun bir necha
+    record sessiyasi bitta kassetaga yig'ilishi mumkin.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._by_key: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._by_kind: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        self._positions: Dict[str, int] = defaultdict(int)
+        self._loaded = False
+        self._image_dir: Optional[str] = None
+
+    # --- yozish ---
+
+    def append(self, entry: Dict[str, Any]):
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            with gzip.open(self.path, "at", encoding="utf-8") as f:
+                f.write(line)
+
+    # --- o'qish ---
+
+    def load(self):
+        if self._loaded:
+            return
+        with gzip.open(self.path, "rt", encoding="utf-8") as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    self._by_key[entry["key"]].append(entry)
+                    self._by_kind[entry["kind"]].append(entry)
+        self._loaded = True
+        logger.info(f"OpenAI kassetasi yuklandi: {self.path}, {sum(map(len, self._by_kind.values()))} ta yozuv")
+
+    def _next(self, bucket: str, entries: List[Dict[str, Any]]) -> Dict[str, Any]:
+        position = self._positions[bucket]
+        self._positions[bucket] = position + 1
+        return entries[position % len(entries)]
+
+    def find(self, kind: str, key: str) -> Dict[str, Any]:
+        """Aynan shu so'rov yozuvi, bo'lmasa shu turdagi yozuvlar navbat bilan (boshqa mavzular uchun)"""
+        self.load()
+        if self._by_key.get(key):
+            return self._next(key, self._by_key[key])
+        if self._by_kind.get(kind):
+            return self._next(kind, self._by_kind[kind])
+        raise CassetteMiss(f"Kassetada '{kind}' so'rovi topilmadi: {self.path}")
+
+    def image_path(self, entry: Dict[str, Any]) -> str:
+        """Yozib olingan rasmni lokal faylga chiqarish (URL o'rniga ishlatiladi)"""
+        if self._image_dir is None:
+            self._image_dir = tempfile.mkdtemp(prefix="openai_cassette_")
+        path = os.path.join(self._image_dir, f"{entry['key'][:16]}_{entry.get('seq', 0)}.png")
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(base64.b64decode(entry["image_b64"]))
+        return path
+
+
+class OpenAIGateway:
+    """Barcha OpenAI chaqiruvlari uchun yagona kirish nuqtasi.
+
+    live rejimida bitta umumiy AsyncOpenAI klienti ishlatiladi (event loop bloklanmaydi,
+    ulanishlar qayta ishlatiladi), so'rovlar esa openai_scheduler orqali model limitlariga
+    moslab yuboriladi. record rejimida har bir chat/rasm so'rovi va javobi
+    kassetaga yoziladi, replay rejimida esa tarmoqsiz kassetadan qaytariladi.
+    """
+
+    def __init__(self, mode: str = OPENAI_MODE, cassette_path: str = OPENAI_CASSETTE,
+                 replay_latency: float = OPENAI_REPLAY_LATENCY, timeout: float = OPENAI_TIMEOUT):
+        if mode not in ("live", "record", "replay"):
+            raise ValueError(f"Noma'lum OPENAI_MODE: {mode}")
+        self.mode = mode
+        self.replay_latency = replay_latency
+        self.timeout = timeout
+        self.cassette = Cassette(cassette_path) if mode != "live" else None
+        self._client = None
+        self._http: Optional[aiohttp.ClientSession] = None
+        self._seq = 0
+
+    def _get_client(self):
+        # Klient birinchi so'rovda yaratiladi va qayta ishlatiladi
+        if self._client is None:
+            from openai import AsyncOpenAI
+
+            api_key = os.getenv('OPENAI_API_KEY')
+            if not api_key:
+                raise ValueError("OPENAI_API_KEY not found in environment variables!")
+            if not api_key.startswith('sk-'):
+                raise ValueError("OPENAI_API_KEY appears to be invalid!")
+            # 429 va tarmoq xatolarida qayta urinishni openai_scheduler boshqaradi
+            self._client = AsyncOpenAI(api_key=api_key, timeout=self.timeout, max_retries=0)
+        return self._client
+
+    async def close(self):
+        if self._client is not None:
+            await self._client.close()
+        self._client = None
+        if self._http is not None:
+            await self._http.close()
+        self._http = None
+
+    async def download(self, url: str) -> bytes:
+        """Rasm URL idan yuklab olish - barcha yuklashlar uchun bitta umumiy sessiya (ulanishlar qayta ishlatiladi)"""
+        if self._http is None or self._http.closed:
+            self._http = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=self.timeout))
+        async with self._http.get(url) as response:
+            response.raise_for_status()
+            return await response.read()
+
+    async def chat(self, priority: int = 0, **request):
+        """chat.completions.create bilan bir xil argumentlar, ChatCompletion qaytaradi.
+
+        priority - model navbatidagi o'rni (kichikroq - oldinroq)
+        """
+        from openai.types.chat import ChatCompletion
+
+        if self.mode == "replay":
+            return ChatCompletion.model_validate(await self._replay("chat", request))
+
+        started = time.perf_counter()
+        response = await openai_scheduler.run(
+            request["model"], estimate_tokens(request),
+            lambda: self._get_client().chat.completions.with_raw_response.create(**request),
+            priority
+        )
+        if self.mode == "record":
+            await self._record("chat", request, response.model_dump(mode="json"), started)
+        return response
+
+    async def image(self, priority: int = 0, **request):
+        """images.generate bilan bir xil argumentlar, ImagesResponse qaytaradi"""
+        from openai.types import ImagesResponse
+
+        if self.mode == "replay":
+            return ImagesResponse.model_validate(await self._replay("image", request))
+
+        started = time.perf_counter()
+        response = await openai_scheduler.run(
+            request["model"], 0,
+            lambda: self._get_client().images.with_raw_response.generate(**request),
+            priority
+        )
+        if self.mode == "record":
+            # Rasm URL lari tez eskiradi - rasmning o'zi ham kassetaga yoziladi (b64_json javobida u allaqachon bor)
+            image_b64 = None
+            if response.data and response.data[0].url:
+                image_b64 = base64.b64encode(await self.download(response.data[0].url)).decode("ascii")
+            await self._record("image", request, response.model_dump(mode="json"), started, image_b64=image_b64)
+        return response
+
+    async def _record(self, kind: str, request: Dict[str, Any], response: Dict[str, Any],
+                      started: float, **extra):
+        self._seq += 1
+        entry = {
+            "kind": kind,
+            "key": request_key(kind, request),
+            "seq": self._seq,
+            "latency_ms": round((time.perf_counter() - started) * 1000, 1),
+            "request": request,
+            "response": response,
+            **extra
+        }
+        try:
+            await asyncio.to_thread(self.cassette.append, entry)
+        except Exception as e:
+            logger.error(f"OpenAI kassetasiga yozishda xatolik: {e}")
+
+    async def _replay(self, kind: str, request: Dict[str, Any]) -> Dict[str, Any]:
+        entry = self.cassette.find(kind, request_key(kind, request))
+        if self.replay_latency > 0:
+            await asyncio.sleep(entry.get("latency_ms", 0) / 1000 * self.replay_latency)
+
+        response = json.loads(json.dumps(entry["response"]))
+        if kind == "image" and entry.get("image_b64"):
+            # URL bilan yozilgan kassetalar b64_json so'rovlarida ham ishlaydi
+            for item in response.get("data") or []:
+                if request.get("response_format") == "b64_json":
+                    item["b64_json"], item["url"] = entry["image_b64"], None
+                else:
+                    item["url"] = self.cassette.image_path(entry)
+        return response
+
+
+# Jarayon bo'ylab yagona gateway
+openai_gateway = OpenAIGateway()
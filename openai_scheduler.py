@@ -0,0 +1,229 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import math
+import os
+import re
+import time
+from typing import Any, Awaitable, Callable, Dict, List, Mapping, Optional, Tuple
+
+from rate_limit import TokenBucket
+
+# openai kutubxonasi bu yerda import qilinmaydi (main.py /metrics uchun ham yuklaydi)
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar: "model=RPM/TPM" (rasm modellari uchun faqat IPM)
+OPENAI_LIMITS = os.getenv("OPENAI_LIMITS", "gpt-4.1=500/30000,gpt-3.5-turbo=3500/200000,dall-e-3=5")
+OPENAI_BURST_SECONDS = float(os.getenv("OPENAI_BURST_SECONDS", "10"))
+OPENAI_RETRIES = int(os.getenv("OPENAI_RETRIES", "3"))
+# Ro'yxatda yo'q model uchun sarlavhalar kelguncha
+DEFAULT_RPM = 60
+# Token bahosi: o'zbek matni ingliz matniga qaraganda ko'proq tokenga bo'linadi
+CHARS_PER_TOKEN = 3
+
+
+def parse_limits(spec: str) -> Dict[str, Tuple[float, float]]:
+    """'gpt-4.1=500/30000,dall-e-3=5' -> {model: (rpm, tpm)}"""
+    limits = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        model, values = item.split("=", 1)
+        rpm, _, tpm = values.partition("/")
+        limits[model.strip()] = (float(rpm), float(tpm or 0))
+    return limits
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """OpenAI reset sarlavhasi ('1s', '6m0s', '20ms') yoki retry-after soniyalari"""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    units = {"h": 3600, "m": 60, "s": 1, "ms": 0.001}
+    parts = re.findall(r"([\d.]+)(ms|h|m|s)", value)
+    return sum(float(number) * units[unit] for number, unit in parts) if parts else None
+
+
+def estimate_tokens(request: Dict[str, Any]) -> int:
+    """So'rov TPM ga qancha tushishi: prompt uzunligidan baho + max_tokens (OpenAI ham shunday hisoblaydi)"""
+    chars = sum(len(str(message.get("content") or "")) for message in request.get("messages") or [])
+    return math.ceil(chars / CHARS_PER_TOKEN) + int(request.get("max_tokens") or 0)
+
+
+def retry_after(headers: Mapping[str, str]) -> float:
+    """429 javobidan qancha kutish kerakligi"""
+    if headers.get("retry-after-ms"):
+        return float(headers["retry-after-ms"]) / 1000
+    for name in ("retry-after", "x-ratelimit-reset-requests", "x-ratelimit-reset-tokens"):
+        seconds = parse_duration(headers.get(name))
+        if seconds:
+            return seconds
+    return 1.0
+
+
+class ModelLimiter:
+    """Bitta model uchun so'rov (RPM/IPM) va token (TPM) bucketlari va ustuvorlik navbati.
+
+    Navbat boshidagi so'rov ikkala bucketda joy bo'lgandagina o'tkaziladi. Ustuvorligi
+    yuqoriroq (soni kichikroq) so'rov kelsa, kutayotganlardan oldinga o'tadi.
+    """
+
+    def __init__(self, model: str, rpm: float, tpm: float = 0, burst_seconds: float = OPENAI_BURST_SECONDS):
+        self.model = model
+        self.burst_seconds = burst_seconds
+        self.requests = TokenBucket(rpm / 60, self._capacity(rpm))
+        self.tokens = TokenBucket(tpm / 60, self._capacity(tpm)) if tpm else None
+        self._waiters: List[Tuple[int, int, float, asyncio.Future]] = []
+        self._seq = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+        self.admitted = 0
+        self.rate_limited = 0
+        self.max_queue = 0
+        self._wait_total = 0.0
+
+    def _capacity(self, per_minute: float) -> float:
+        return max(1.0, per_minute / 60 * self.burst_seconds)
+
+    def _ensure_worker(self):
+        if self._task is None or self._task.done() or self._task.get_loop() is not asyncio.get_running_loop():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.create_task(self._run())
+
+    async def acquire(self, cost: float, priority: int = 0):
+        """Bucketlarda joy bo'lguncha navbatda kutish"""
+        self._ensure_worker()
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._seq), cost, future))
+        self.max_queue = max(self.max_queue, len(self._waiters))
+        self._wakeup.set()
+        started = time.monotonic()
+        await future
+        self._wait_total += time.monotonic() - started
+        self.admitted += 1
+
+    def _wait_for(self, cost: float) -> float:
+        wait = self.requests.wait_time(1)
+        if self.tokens is not None:
+            wait = max(wait, self.tokens.wait_time(cost))
+        return wait
+
+    async def _run(self):
+        while True:
+            while self._waiters and self._waiters[0][3].done():
+                heapq.heappop(self._waiters)
+            if not self._waiters:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            _, _, cost, future = self._waiters[0]
+            wait = self._wait_for(cost)
+            if wait <= 0:
+                heapq.heappop(self._waiters)
+                self.requests.try_acquire(1)
+                if self.tokens is not None:
+                    self.tokens.try_acquire(cost)
+                future.set_result(None)
+                continue
+
+            # Joy bo'shashini kutish; yangi so'rov kelsa navbat boshi qayta baholanadi
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def update_from_headers(self, headers: Mapping[str, str]):
+        """x-ratelimit-* sarlavhalaridan haqiqiy limit va qoldiqni olish"""
+        limit = headers.get("x-ratelimit-limit-requests")
+        if limit:
+            self.requests.set_rate(float(limit) / 60, self._capacity(float(limit)))
+        remaining = headers.get("x-ratelimit-remaining-requests")
+        if remaining is not None:
+            self.requests.tokens = min(self.requests.tokens, float(remaining))
+
+        limit = headers.get("x-ratelimit-limit-tokens")
+        if limit:
+            if self.tokens is None:
+                self.tokens = TokenBucket(float(limit) / 60, self._capacity(float(limit)))
+            else:
+                self.tokens.set_rate(float(limit) / 60, self._capacity(float(limit)))
+        remaining = headers.get("x-ratelimit-remaining-tokens")
+        if remaining is not None and self.tokens is not None:
+            self.tokens.tokens = min(self.tokens.tokens, float(remaining))
+
+    def on_rate_limited(self, seconds: float):
+        """429 olindi: model bucketlarini server aytgan vaqtga to'xtatish"""
+        self.rate_limited += 1
+        self.requests.pause(seconds)
+        if self.tokens is not None:
+            self.tokens.pause(seconds)
+        logger.warning(f"OpenAI {self.model}: 429, {seconds:.1f} s kutiladi")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "rpm": round(self.requests.rate * 60),
+            "tpm": round(self.tokens.rate * 60) if self.tokens else None,
+            "queue": sum(1 for *_, future in self._waiters if not future.done()),
+            "max_queue": self.max_queue,
+            "admitted": self.admitted,
+            "rate_limited": self.rate_limited,
+            "avg_wait_ms": round(self._wait_total / self.admitted * 1000, 1) if self.admitted else 0.0,
+        }
+
+
+class OpenAIScheduler:
+    """Barcha OpenAI so'rovlari uchun model bo'yicha limitlar: so'rovlar kvotaga mos tezlikda
+    yuboriladi, 429 bo'lsa model to'xtatiladi va so'rov navbatga qaytadi (retry storm o'rniga).
+    """
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[float, float]]] = None,
+                 burst_seconds: float = OPENAI_BURST_SECONDS, retries: int = OPENAI_RETRIES):
+        self.limits = parse_limits(OPENAI_LIMITS) if limits is None else limits
+        self.burst_seconds = burst_seconds
+        self.retries = retries
+        self._limiters: Dict[str, ModelLimiter] = {}
+
+    def limiter(self, model: str) -> ModelLimiter:
+        limiter = self._limiters.get(model)
+        if limiter is None:
+            rpm, tpm = self.limits.get(model, (DEFAULT_RPM, 0))
+            limiter = self._limiters[model] = ModelLimiter(model, rpm, tpm, self.burst_seconds)
+        return limiter
+
+    async def run(self, model: str, cost: float, call: Callable[[], Awaitable[Any]], priority: int = 0):
+        """call() - with_raw_response so'rovi. Limit sarlavhalari o'qiladi, tayyor javob qaytadi"""
+        from openai import APIConnectionError, InternalServerError, RateLimitError
+
+        limiter = self.limiter(model)
+        for attempt in range(self.retries + 1):
+            await limiter.acquire(cost, priority)
+            try:
+                raw = await call()
+            except RateLimitError as e:
+                # Kvota tugagan bo'lsa qayta urinish foyda bermaydi
+                if attempt == self.retries or getattr(e, "code", None) == "insufficient_quota":
+                    raise
+                limiter.on_rate_limited(retry_after(e.response.headers))
+                continue
+            except (APIConnectionError, InternalServerError) as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"OpenAI {model} xatoligi, qayta urinish: {e}")
+                await asyncio.sleep(0.5 * 2 ** attempt)
+                continue
+            limiter.update_from_headers(raw.headers)
+            return raw.parse()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {model: limiter.snapshot() for model, limiter in self._limiters.items()}
+
+
+# Jarayon bo'ylab yagona scheduler
+openai_scheduler = OpenAIScheduler()
@@ -0,0 +1,166 @@
+import contextvars
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Narxlar (USD): matn modellari - 1M token uchun (kirish, keshlangan kirish, chiqish),
+# rasm modellari - bitta rasm uchun (sifat, o'lcham) bo'yicha
+TEXT_PRICES = {
+    "gpt-4.1": (2.00, 0.50, 8.00),
+    "gpt-3.5-turbo": (0.50, 0.50, 1.50),
+}
+IMAGE_PRICES = {
+    "dall-e-3": {
+        ("standard", "1024x1024"): 0.040,
+        ("standard", "1024x1792"): 0.080,
+        ("standard", "1792x1024"): 0.080,
+        ("hd", "1024x1024"): 0.080,
+        ("hd", "1024x1792"): 0.120,
+        ("hd", "1792x1024"): 0.120,
+    },
+}
+STAGES = ("text", "images", "render", "send")
+
+_current: contextvars.ContextVar[Optional["OrderCost"]] = contextvars.ContextVar("order_cost", default=None)
+
+
+class OrderCost:
+    """Bitta buyurtma generatsiyasining tokenlari, rasmlari va bosqich vaqtlari"""
+
+    def __init__(self, order_id: int, tariff: str, pages: int, queue_wait: float = 0.0):
+        self.order_id = order_id
+        self.tariff = tariff
+        self.pages = pages
+        self.queue_ms = queue_wait * 1000
+        self.started = time.perf_counter()
+        self.text_model: Optional[str] = None
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_tokens = 0
+        self.chat_calls = 0
+        self.image_model: Optional[str] = None
+        self.image_size: Optional[str] = None
+        self.image_quality: Optional[str] = None
+        self.images = 0
+        self.images_failed = 0
+        self.images_reused = 0
+        self.cost_usd = 0.0
+        self.speculative = False
+        self.stages: Dict[str, float] = {}
+
+    def add_chat(self, model: str, usage: Any):
+        self.text_model = model
+        self.chat_calls += 1
+        if usage is None:
+            return
+        prompt = getattr(usage, "prompt_tokens", 0) or 0
+        completion = getattr(usage, "completion_tokens", 0) or 0
+        details = getattr(usage, "prompt_tokens_details", None)
+        cached = (getattr(details, "cached_tokens", 0) or 0) if details else 0
+        self.prompt_tokens += prompt
+        self.completion_tokens += completion
+        self.cached_tokens += cached
+        input_price, cached_price, output_price = TEXT_PRICES.get(model, (0, 0, 0))
+        self.cost_usd += ((prompt - cached) * input_price + cached * cached_price
+                          + completion * output_price) / 1_000_000
+
+    def add_image(self, model: str, size: str, quality: str, count: int = 1, failed: bool = False):
+        self.image_model, self.image_size, self.image_quality = model, size, quality
+        if failed:
+            self.images_failed += 1
+            return
+        self.images += count
+        self.cost_usd += IMAGE_PRICES.get(model, {}).get((quality, size), 0) * count
+
+    def add_image_reuse(self):
+        """image_index dan olingan rasm - DALL-E chaqirilmadi, narxi yo'q"""
+        self.images_reused += 1
+
+    def add_stage(self, name: str, seconds: float):
+        self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def merge(self, other: "OrderCost"):
+        """Oldindan (spekulyativ) bajarilgan ish sarfini shu buyurtmaga qo'shish"""
+        self.text_model = other.text_model or self.text_model
+        self.prompt_tokens += other.prompt_tokens
+        self.completion_tokens += other.completion_tokens
+        self.cached_tokens += other.cached_tokens
+        self.chat_calls += other.chat_calls
+        self.cost_usd += other.cost_usd
+        self.speculative = True
+        for name, seconds in other.stages.items():
+            self.add_stage(name, seconds)
+
+    def to_row(self, status: str) -> Dict[str, Any]:
+        row = {
+            "order_id": self.order_id,
+            "tariff": self.tariff,
+            "pages": self.pages,
+            "status": status,
+            "text_model": self.text_model,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cached_tokens": self.cached_tokens,
+            "chat_calls": self.chat_calls,
+            "image_model": self.image_model,
+            "image_size": self.image_size,
+            "image_quality": self.image_quality,
+            "images": self.images,
+            "images_failed": self.images_failed,
+            "images_reused": self.images_reused,
+            "cost_usd": round(self.cost_usd, 6),
+            "speculative": int(self.speculative),
+            "queue_ms": round(self.queue_ms, 1),
+            "total_ms": round((time.perf_counter() - self.started) * 1000, 1),
+        }
+        for name in STAGES:
+            row[f"{name}_ms"] = round(self.stages.get(name, 0.0) * 1000, 1)
+        return row
+
+
+def begin(order_id: Optional[int], tariff: str, pages: int, queue_wait: float = 0.0) -> OrderCost:
+    """Joriy vazifa (va undan yaratilgan ichki vazifalar) uchun hisobni boshlash"""
+    return use(OrderCost(order_id, tariff, pages, queue_wait))
+
+
+def use(cost: OrderCost) -> OrderCost:
+    """Joriy vazifa sarfini mavjud hisobga yozish"""
+    _current.set(cost)
+    return cost
+
+
+def current() -> Optional[OrderCost]:
+    return _current.get()
+
+
+@contextmanager
+def stage(name: str):
+    """Bosqich vaqtini joriy buyurtmaga qo'shish (buyurtma bo'lmasa hech narsa qilmaydi)"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        cost = _current.get()
+        if cost is not None:
+            cost.add_stage(name, time.perf_counter() - started)
+
+
+def record_chat(model: str, usage: Any):
+    cost = _current.get()
+    if cost is not None:
+        cost.add_chat(model, usage)
+
+
+def record_image(model: str, size: str, quality: str, count: int = 1, failed: bool = False):
+    cost = _current.get()
+    if cost is not None:
+        cost.add_image(model, size, quality, count, failed)
+
+
+def record_image_reuse():
+    cost = _current.get()
+    if cost is not None:
+        cost.add_image_reuse()
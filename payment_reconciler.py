@@ -0,0 +1,211 @@
+import asyncio
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from aiogram import Bot
+
+from click_client import ClickClient, click_client
+from database_adapter import (
+    create_pending_payment, expire_pending_payment, get_due_pending_payments,
+    get_expiring_pending_payments, get_next_payment_check_at, get_user_balance, log_action, mark_payment_due,
+    reschedule_pending_payments, settle_pending_payment
+)
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+PAYMENT_CHECK_BATCH = int(os.getenv("PAYMENT_CHECK_BATCH", "50"))
+PAYMENT_CHECK_CONCURRENCY = int(os.getenv("PAYMENT_CHECK_CONCURRENCY", "5"))
+PAYMENT_EXPIRE_HOURS = int(os.getenv("PAYMENT_EXPIRE_HOURS", "24"))
+
+# To'lov yoshi (soniya) -> keyingi tekshirishgacha interval.
+# Yangi to'lovlar tez-tez, eskilari kamroq tekshiriladi.
+CHECK_SCHEDULE = (
+    (10 * 60, 15),
+    (60 * 60, 60),
+    (6 * 60 * 60, 5 * 60),
+)
+MAX_CHECK_INTERVAL = 30 * 60
+IDLE_SLEEP = 60
+
+
+def next_check_delay(created_at: str, now: Optional[datetime] = None) -> int:
+    """To'lov yoshiga qarab keyingi tekshirishgacha soniyalar"""
+    now = now or datetime.now()
+    try:
+        age = (now - datetime.strptime(created_at, '%Y-%m-%d %H:%M:%S')).total_seconds()
+    except (TypeError, ValueError):
+        age = 0
+    for max_age, interval in CHECK_SCHEDULE:
+        if age < max_age:
+            return interval
+    return MAX_CHECK_INTERVAL
+
+
+class PaymentReconciler:
+    """Kutilayotgan Click to'lovlarini fonda tekshirib, tasdiqlanganlarini bir marta hisoblaydi"""
+
+    def __init__(self, bot: Bot, client: ClickClient = click_client,
+                 batch_size: int = PAYMENT_CHECK_BATCH,
+                 concurrency: int = PAYMENT_CHECK_CONCURRENCY):
+        self.bot = bot
+        self.client = client
+        self.batch_size = batch_size
+        self.semaphore = asyncio.Semaphore(concurrency)
+        self._wakeup = asyncio.Event()
+        self._task: Optional[asyncio.Task] = None
+
+    async def register(self, payment_id: str, user_tg_id: int, amount: int, order_ref: str = None):
+        """Yangi to'lovni yozib, tekshiruvchini uyg'otish"""
+        await create_pending_payment(payment_id, user_tg_id, amount, order_ref)
+        self._wakeup.set()
+
+    async def request_check(self, payment_id: str):
+        """To'lovni navbatsiz tekshirishga qo'yish"""
+        await mark_payment_due(payment_id)
+        self._wakeup.set()
+
+    async def _notify(self, payment: Dict):
+        try:
+            if payment['status'] == 'confirmed':
+                balance = await get_user_balance(payment['user_tg_id'])
+                text = (
+                    f"✅ **To'lov muvaffaqiyatli!**\n\n"
+                    f"💰 **To'ldirilgan miqdor:** {payment['amount']:,} so'm\n"
+                    f"💳 **Joriy balans:** {balance['total_balance']:,} so'm\n\n"
+                    f"🎉 Balansingiz muvaffaqiyatli to'ldirildi!"
+                )
+            else:
+                text = (
+                    f"❌ **To'lov bekor qilindi**\n\n"
+                    f"💰 **Miqdor:** {payment['amount']:,} so'm\n\n"
+                    f"💡 Yangi to'lov yaratish uchun qaytadan urinib ko'ring."
+                )
+            await self.bot.send_message(payment['user_tg_id'], text, parse_mode="Markdown")
+        except Exception as e:
+            logger.error(f"To'lov haqida xabar yuborishda xatolik {payment['payment_id']}: {e}")
+
+    async def _check(self, payment: Dict) -> Optional[tuple]:
+        """Bitta to'lovni tekshirish. Qayta tekshirish kerak bo'lsa (payment_id, vaqt, xato) qaytaradi"""
+        async with self.semaphore:
+            result = await self.client.get_payment_status(payment['payment_id'])
+
+        now = datetime.now()
+        retry_at = now + timedelta(seconds=next_check_delay(payment['created_at'], now))
+        if not result["success"]:
+            return payment['payment_id'], retry_at, result["error"][:200]
+
+        status = result["status"]
+        if status not in ("confirmed", "cancelled"):
+            return payment['payment_id'], retry_at, None
+
+        await self._settle(payment, status, result.get("amount"))
+        return None
+
+    async def _settle(self, payment: Dict, status: str, amount) -> None:
+        settled = await settle_pending_payment(
+            payment['payment_id'], status,
+            int(amount) if isinstance(amount, (int, float)) and amount > 0 else None
+        )
+        if settled:
+            logger.info(f"To'lov #{settled['payment_id']} yakunlandi: {status}, {settled['amount']} so'm")
+            await log_action(settled['user_tg_id'], f"click_payment_{status}", {
+                'payment_id': settled['payment_id'],
+                'amount': settled['amount']
+            })
+            await self._notify(settled)
+
+    async def _expire(self, payment: Dict) -> Optional[tuple]:
+        """Muddati o'tgan to'lovni oxirgi marta tekshirish: Click tasdiqlagan bo'lsa hisoblanadi,
+        aks holda 'expired' qilinadi. Click javob bermasa keyinroq qayta uriniladi."""
+        async with self.semaphore:
+            result = await self.client.get_payment_status(payment['payment_id'])
+
+        if not result["success"]:
+            retry_at = datetime.now() + timedelta(seconds=MAX_CHECK_INTERVAL)
+            return payment['payment_id'], retry_at, result["error"][:200]
+
+        status = result["status"]
+        if status in ("confirmed", "cancelled"):
+            await self._settle(payment, status, result.get("amount"))
+        elif await expire_pending_payment(payment['payment_id']):
+            logger.info(f"To'lov #{payment['payment_id']} muddati o'tdi ({status})")
+        return None
+
+    async def _expire_stale(self):
+        payments = await get_expiring_pending_payments(PAYMENT_EXPIRE_HOURS, self.batch_size)
+        if not payments:
+            return
+
+        results = await asyncio.gather(*(self._expire(p) for p in payments), return_exceptions=True)
+        schedule = []
+        for payment, result in zip(payments, results):
+            if isinstance(result, Exception):
+                logger.error(f"Eski to'lovni tekshirishda xatolik {payment['payment_id']}: {result}")
+                schedule.append((payment['payment_id'], datetime.now() + timedelta(seconds=MAX_CHECK_INTERVAL),
+                                 str(result)[:200]))
+            elif result:
+                schedule.append(result)
+        await reschedule_pending_payments(schedule)
+
+    async def run_once(self) -> int:
+        """Vaqti kelgan to'lovlarni bir partiya qilib tekshirish"""
+        await self._expire_stale()
+
+        payments = await get_due_pending_payments(self.batch_size)
+        if not payments:
+            return 0
+
+        results = await asyncio.gather(*(self._check(p) for p in payments), return_exceptions=True)
+        schedule = []
+        for payment, result in zip(payments, results):
+            if isinstance(result, Exception):
+                logger.error(f"To'lovni tekshirishda xatolik {payment['payment_id']}: {result}")
+                delay = next_check_delay(payment['created_at'])
+                schedule.append((payment['payment_id'], datetime.now() + timedelta(seconds=delay), str(result)[:200]))
+            elif result:
+                schedule.append(result)
+        await reschedule_pending_payments(schedule)
+        return len(payments)
+
+    async def _sleep_until_due(self):
+        # Avval tozalanadi: so'rov paytida kelgan register() uyg'otishi yo'qolmasin
+        self._wakeup.clear()
+        next_at = await get_next_payment_check_at()
+        if next_at is None:
+            timeout = IDLE_SLEEP
+        else:
+            timeout = min(max((next_at - datetime.now()).total_seconds(), 1), IDLE_SLEEP)
+
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+
+    async def _loop(self):
+        while True:
+            try:
+                checked = await self.run_once()
+                # To'liq partiya bo'lsa, navbatdagilarini kutmasdan tekshirish
+                if checked >= self.batch_size:
+                    continue
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"To'lovlarni tekshirishda xatolik: {e}")
+            await self._sleep_until_due()
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -1,35 +1,60 @@
 import os
 import logging
-import tempfile
+import uuid
 import asyncio
-from openai import OpenAI
+import base64
 from pptx import Presentation
 from pptx.util import Inches, Pt
 from pptx.enum.text import PP_ALIGN, MSO_ANCHOR
 from fpdf import FPDF
-import aiohttp
 from io import BytesIO
-from PIL import Image
+
+import order_costs
+from deck_optimizer import DECK_OPTIMIZE, fit_image, format_report, optimize_pptx
+from image_index import image_index
+from openai_gateway import openai_gateway
+from render_pool import render_pool
 
 logger = logging.getLogger(__name__)
 
+# b64_json - rasm DALL-E javobining o'zida keladi (ikkinchi yuklash va eskirgan URL xatolari yo'q), url - eski usul
+IMAGE_RESPONSE_FORMAT = os.getenv("IMAGE_RESPONSE_FORMAT", "b64_json")
+
+BACKGROUND_IMAGES = {
+    'asosiy': 'slayd_fon/asosiy_sahifa.png',
+    'reja': 'slayd_fon/orta_sahifa.png',
+    'content_1': 'slayd_fon/2.png',
+    'content_2': 'slayd_fon/3.png',
+    'content_3': 'slayd_fon/4.png',
+    'oxirgi': 'slayd_fon/oxirgi_sahifa.png'
+}
+
+# Fon rasmlari bir marta o'qilib xotirada saqlanadi (yo'l -> bytes, fayl bo'lmasa None)
+_background_cache = {}
+
+def load_background(path: str):
+    """Fon rasmini keshdan yoki diskdan olish"""
+    if path not in _background_cache:
+        try:
+            with open(path, 'rb') as f:
+                _background_cache[path] = f.read()
+        except OSError:
+            _background_cache[path] = None
+    return _background_cache[path]
+
+def _background(key: str):
+    """Fon rasmi xotiradagi nusxadan (BytesIO), fayl topilmasa None"""
+    data = load_background(BACKGROUND_IMAGES.get(key, ''))
+    return BytesIO(data) if data else None
+
+def warm_up() -> int:
+    """Fon rasmlarini oldindan yuklash (modul importi bilan openai, pptx, fpdf va PIL ham yuklanadi)"""
+    return sum(len(load_background(path) or b'') for path in BACKGROUND_IMAGES.values())
+
 class PresentationGenerator:
     def __init__(self):
-        api_key = os.getenv('OPENAI_API_KEY')
-        if not api_key:
-            raise ValueError("OPENAI_API_KEY not found in environment variables!")
-        if not api_key.startswith('sk-'):
-            raise ValueError("OPENAI_API_KEY appears to be invalid!")
-        self.client = OpenAI(api_key=api_key)
-        
-        self.background_images = {
-            'asosiy': 'slayd_fon/asosiy_sahifa.png',
-            'reja': 'slayd_fon/orta_sahifa.png',
-            'content_1': 'slayd_fon/2.png',
-            'content_2': 'slayd_fon/3.png',
-            'content_3': 'slayd_fon/4.png',
-            'oxirgi': 'slayd_fon/oxirgi_sahifa.png'
-        }
+        # OpenAI so'rovlari openai_gateway orqali (umumiy async klient, record/replay kassetalar)
+        self.background_images = BACKGROUND_IMAGES
     
     async def generate_presentation(self, topic: str, num_slides: int, plan: str):
         logger.info(f"Generating presentation: {topic}, {num_slides} slides, {plan} plan")
@@ -40,13 +65,72 @@ class PresentationGenerator:
         
         files = [ppt_path]
         
-        if plan == 'smart':
+        if plan.lower() == 'smart':
             pdf_path = await self.create_pdf(topic, slides_content)
             files.append(pdf_path)
         
         return files
     
-    async def generate_slides_content(self, topic: str, num_slides: int):
+    async def render_presentation(self, topic: str, num_slides: int, plan: str, slides_content: list = None):
+        """Diskka yozmasdan render qilish: [(fayl_nomi, bytes), ...] qaytaradi"""
+        logger.info(f"Rendering presentation: {topic}, {num_slides} slides, {plan} plan")
+        
+        if slides_content is None:
+            slides_content = await self.generate_slides_content(topic, num_slides)
+        
+        base_name = f"taqdimot_{self.safe_filename(topic)}"
+        # Rasmlar bir marta olinadi - PPTX ham, PDF ham shularni ishlatadi
+        images = await self._fetch_images(slides_content)
+        files = [(f"{base_name}.pptx", await self.render_ppt(topic, slides_content, images))]
+        
+        if plan.lower() == 'smart':
+            files.append((f"{base_name}.pdf", await self.render_pdf(topic, slides_content, images)))
+        
+        return files
+    
+    @staticmethod
+    def safe_filename(topic: str) -> str:
+        safe_topic = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in topic[:30])
+        return safe_topic.replace(' ', '_')
+    
+    async def _fetch_image(self, url: str) -> bytes:
+        """Slayd rasmi: URL dan yuklab olish yoki lokal fayldan o'qish (saqlangan slaydlar uchun)"""
+        if url.startswith(('http://', 'https://')):
+            return await openai_gateway.download(url)
+        with open(url[len('file://'):] if url.startswith('file://') else url, 'rb') as f:
+            return f.read()
+    
+    async def _fetch_images(self, slides: list) -> dict:
+        """Slayd rasmlari: {slayd_indeksi: bytes} (olinmaganlari tushib qoladi).
+
+        b64_json rasmlari (slide['image_data']) tayyor, faqat image_url bo'lganlari parallel yuklanadi.
+        """
+        images = {idx: slide['image_data'] for idx, slide in enumerate(slides) if slide.get('image_data') is not None}
+        pending = [idx for idx, slide in enumerate(slides) if idx not in images and slide.get('image_url')]
+        results = await asyncio.gather(*(self._fetch_image(slides[idx]['image_url']) for idx in pending),
+                                       return_exceptions=True)
+        for idx, result in zip(pending, results):
+            if isinstance(result, Exception):
+                logger.error(f"Error fetching image: {result}")
+            else:
+                images[idx] = result
+        if render_pool.mode == "process":
+            # memoryview pickle qilinmaydi - worker jarayoniga nusxa ketadi
+            images = {idx: bytes(data) for idx, data in images.items()}
+        return images
+    
+    @staticmethod
+    def _render_slides(slides: list) -> list:
+        """Render uchun slaydlar: rasm baytlari alohida (images) uzatiladi"""
+        return [{key: value for key, value in slide.items() if key != 'image_data'} for slide in slides]
+    
+    async def generate_slides_content(self, topic: str, num_slides: int, tariff: str = None):
+        slides = await self.generate_slides_text(topic, num_slides)
+        await self.attach_images(slides, tariff)
+        return slides
+    
+    async def generate_slides_text(self, topic: str, num_slides: int, priority: int = 0):
+        """Faqat matn (reja va slaydlar), rasmlarsiz. priority - openai_scheduler navbatidagi o'rni"""
         logger.info(f"Generating content for {num_slides} slides")
         
         content_slides = num_slides - 3
@@ -120,52 +204,81 @@ JAMI {num_slides} TA SLAYD BO'LISHI KERAK!
 """
         
         try:
-            response = self.client.chat.completions.create(
-                model="gpt-4.1",
-                messages=[
-                    {"role": "system", "content": "Siz professional taqdimot yaratuvchi AI assistentsiz. O'zbek tilida yozing, lekin rasm tavsiflari ingliz tilida bo'lsin. MUHIM: [Kvadrat qavs ichidagi] ko'rsatmalarni YOZMASDAN, ularning o'rniga HAQIQIY KONTENT yozing!"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.7,
-                max_tokens=4000
-            )
+            with order_costs.stage("text"):
+                response = await openai_gateway.chat(
+                    priority=priority,
+                    model="gpt-4.1",
+                    messages=[
+                        {"role": "system", "content": "Siz professional taqdimot yaratuvchi AI assistentsiz. O'zbek tilida yozing, lekin rasm tavsiflari ingliz tilida bo'lsin. MUHIM: [Kvadrat qavs ichidagi] ko'rsatmalarni YOZMASDAN, ularning o'rniga HAQIQIY KONTENT yozing!"},
+                        {"role": "user", "content": prompt}
+                    ],
+                    temperature=0.7,
+                    max_tokens=4000
+                )
+            # Token sarfi buyurtma hisobiga (order_costs jadvali)
+            order_costs.record_chat("gpt-4.1", response.usage)
             
             content = response.choices[0].message.content
-            slides = self.parse_slides_content(content)
+            return self.parse_slides_content(content)
             
-            ai_image_count = 0
+        except Exception as e:
+            logger.error(f"Error generating slides content: {e}")
+            raise
+    
+    async def attach_images(self, slides: list, tariff: str = None):
+        """Birinchi 3 ta mos slayd uchun DALL-E rasmlari (slide['image_data'] yoki slide['image_url']).
+        
+        IMAGE_REUSE_TARIFFS dagi tariflarda o'xshash prompt bilan avval yaratilgan rasm qayta ishlatiladi.
+        """
+        ai_image_count = 0
+        reuse = image_index.reuse_enabled(tariff)
+        # Bitta taqdimotda bir rasm ikki marta chiqmasin
+        used_rows = set()
+        with order_costs.stage("images"):
             for slide in slides:
                 if slide.get('type') != 'reja' and 'image_prompt' in slide and slide['image_prompt'] and ai_image_count < 3:
-                    slide['image_url'] = await self.generate_image(slide['image_prompt'])
+                    match = await image_index.find(slide['image_prompt'], used_rows) if reuse else None
+                    if match:
+                        used_rows.add(match.row)
+                        order_costs.record_image_reuse()
+                        slide['image_url'], slide['image_data'] = None, memoryview(match.data)
+                    else:
+                        slide['image_url'], slide['image_data'] = await self.generate_image(slide['image_prompt'])
                     ai_image_count += 1
                 else:
-                    slide['image_url'] = None
-            
-            return slides
-            
-        except Exception as e:
-            logger.error(f"Error generating slides content: {e}")
-            raise
+                    slide['image_url'], slide['image_data'] = None, None
+        return slides
     
     async def generate_image(self, prompt: str):
+        """DALL-E rasmi: (url, data). b64_json javobida data - dekodlangan baytlar (memoryview), url None"""
         logger.info(f"Generating image for: {prompt}")
         
         try:
-            response = self.client.images.generate(
+            response = await openai_gateway.image(
                 model="dall-e-3",
                 prompt=f"Professional presentation slide image: {prompt}. Clean, modern, business style.",
                 size="1024x1024",
                 quality="standard",
-                n=1
+                n=1,
+                response_format=IMAGE_RESPONSE_FORMAT
             )
+            order_costs.record_image("dall-e-3", "1024x1024", "standard", len(response.data))
+            
+            item = response.data[0]
+            if item.b64_json:
+                image_data = memoryview(base64.b64decode(item.b64_json))
+                logger.info(f"Image generated: {image_data.nbytes} bytes")
+                # Keyingi o'xshash promptlar uchun (URL javoblari indeksga qo'shilmaydi)
+                image_index.remember(prompt, image_data)
+                return None, image_data
             
-            image_url = response.data[0].url
-            logger.info(f"Image generated: {image_url}")
-            return image_url
+            logger.info(f"Image generated: {item.url}")
+            return item.url, None
             
         except Exception as e:
             logger.error(f"Error generating image: {e}")
-            return None
+            order_costs.record_image("dall-e-3", "1024x1024", "standard", failed=True)
+            return None, None
     
     def parse_slides_content(self, content: str):
         slides = []
@@ -227,279 +340,287 @@ JAMI {num_slides} TA SLAYD BO'LISHI KERAK!
         return slides
     
     async def create_ppt(self, topic: str, slides_content: list):
+        data = await self.render_ppt(topic, slides_content)
+        return self._save_file(topic, data, 'pptx')
+    
+    async def render_ppt(self, topic: str, slides_content: list, images: dict = None) -> bytes:
         logger.info("Creating PowerPoint presentation")
+        if images is None:
+            images = await self._fetch_images(slides_content)
+        data, report = await render_pool.run(render_pptx_job, topic, self._render_slides(slides_content), images,
+                                             DECK_OPTIMIZE)
+        if report:
+            logger.info(format_report("PPTX", report))
+        return data
+    
+    async def create_pdf(self, topic: str, slides_content: list):
+        data = await self.render_pdf(topic, slides_content)
+        return self._save_file(topic, data, 'pdf')
+    
+    async def render_pdf(self, topic: str, slides_content: list, images: dict = None) -> bytes:
+        logger.info("Creating PDF presentation")
+        if images is None:
+            images = await self._fetch_images(slides_content)
+        return await render_pool.run(build_pdf, topic, self._render_slides(slides_content), images)
+    
+    def _save_file(self, topic: str, data: bytes, extension: str) -> str:
+        """Faylni presentations/ papkasiga yozish (CLI va eski chaqiruvlar uchun)"""
+        presentations_dir = "presentations"
+        if not os.path.exists(presentations_dir):
+            os.makedirs(presentations_dir)
         
-        prs = Presentation()
-        prs.slide_width = Inches(10)
-        prs.slide_height = Inches(7.5)
-        
-        blank_layout = prs.slide_layouts[6]
+        # Nom to'qnashmasligi uchun noyob qo'shimcha
+        filename = os.path.join(presentations_dir, f"{self.safe_filename(topic)}_{uuid.uuid4().hex[:12]}.{extension}")
+        with open(filename, 'wb') as f:
+            f.write(data)
+        logger.info(f"Presentation saved: {filename}")
         
+        return filename
+
+# Render funksiyalari render pool'da (alohida jarayonda) ishlaydi: faqat modul darajasidagi
+# funksiyalar va oddiy argumentlar (slaydlar, {slayd_indeksi: bytes})
+
+def build_pptx(topic: str, slides_content: list, images: dict) -> bytes:
+    prs = Presentation()
+    prs.slide_width = Inches(10)
+    prs.slide_height = Inches(7.5)
+    
+    blank_layout = prs.slide_layouts[6]
+    
+    slide = prs.slides.add_slide(blank_layout)
+    background = _background('asosiy')
+    if background:
+        slide.shapes.add_picture(
+            background,
+            0, 0,
+            width=prs.slide_width,
+            height=prs.slide_height
+        )
+    
+    title_box = slide.shapes.add_textbox(Inches(1), Inches(3), Inches(8), Inches(1.5))
+    title_frame = title_box.text_frame
+    title_frame.text = topic
+    title_frame.paragraphs[0].font.size = Pt(48)
+    title_frame.paragraphs[0].font.bold = True
+    title_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+    
+    subtitle_box = slide.shapes.add_textbox(Inches(1), Inches(5), Inches(8), Inches(0.5))
+    subtitle_frame = subtitle_box.text_frame
+    subtitle_frame.text = "@preuz_bot"
+    subtitle_frame.paragraphs[0].font.size = Pt(20)
+    subtitle_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+    
+    for idx, slide_data in enumerate(slides_content):
         slide = prs.slides.add_slide(blank_layout)
-        if os.path.exists(self.background_images['asosiy']):
-            slide.shapes.add_picture(
-                self.background_images['asosiy'],
-                0, 0,
-                width=prs.slide_width,
-                height=prs.slide_height
-            )
-        
-        title_box = slide.shapes.add_textbox(Inches(1), Inches(3), Inches(8), Inches(1.5))
-        title_frame = title_box.text_frame
-        title_frame.text = topic
-        title_frame.paragraphs[0].font.size = Pt(48)
-        title_frame.paragraphs[0].font.bold = True
-        title_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-        
-        subtitle_box = slide.shapes.add_textbox(Inches(1), Inches(5), Inches(8), Inches(0.5))
-        subtitle_frame = subtitle_box.text_frame
-        subtitle_frame.text = "@preuz_bot"
-        subtitle_frame.paragraphs[0].font.size = Pt(20)
-        subtitle_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
         
-        for idx, slide_data in enumerate(slides_content):
-            slide = prs.slides.add_slide(blank_layout)
+        if slide_data.get('type') == 'reja':
+            background = _background('reja')
+            if background:
+                slide.shapes.add_picture(
+                    background,
+                    0, 0,
+                    width=prs.slide_width,
+                    height=prs.slide_height
+                )
             
-            if slide_data.get('type') == 'reja':
-                if os.path.exists(self.background_images['reja']):
-                    slide.shapes.add_picture(
-                        self.background_images['reja'],
-                        0, 0,
-                        width=prs.slide_width,
-                        height=prs.slide_height
-                    )
+            title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
+            title_frame = title_box.text_frame
+            title_frame.text = "REJA"
+            title_frame.paragraphs[0].font.size = Pt(36)
+            title_frame.paragraphs[0].font.bold = True
+            title_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
+
+            sections = slide_data.get('sections', [])
+            box_width = Inches(2.5)
+            box_height = Inches(2)
+            start_x = Inches(1)
+            start_y = Inches(3)
+            spacing = Inches(0.5)
+            
+            for i, section in enumerate(sections[:3]):
+                x = start_x + (i * (box_width + spacing))
+                box = slide.shapes.add_textbox(x, start_y, box_width, box_height)
+                text_frame = box.text_frame
+                text_frame.word_wrap = True
+                text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
                 
-                title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
-                title_frame = title_box.text_frame
-                title_frame.text = "REJA"
-                title_frame.paragraphs[0].font.size = Pt(36)
-                title_frame.paragraphs[0].font.bold = True
-                title_frame.paragraphs[0].alignment = PP_ALIGN.CENTER
-    
-                sections = slide_data.get('sections', [])
-                box_width = Inches(2.5)
-                box_height = Inches(2)
-                start_x = Inches(1)
-                start_y = Inches(3)
-                spacing = Inches(0.5)
+                p = text_frame.paragraphs[0]
+                p.text = f"{i+1}. {section}"
+                p.font.size = Pt(16)
+                p.font.bold = True
+                p.alignment = PP_ALIGN.CENTER
+        
+        elif slide_data.get('type') == 'xulosa':
+            background = _background('oxirgi')
+            if background:
+                slide.shapes.add_picture(
+                    background,
+                    0, 0,
+                    width=prs.slide_width,
+                    height=prs.slide_height
+                )
+            
+            title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
+            title_frame = title_box.text_frame
+            title_frame.text = slide_data.get('title', 'Xulosa')
+            title_frame.paragraphs[0].font.size = Pt(36)
+            title_frame.paragraphs[0].font.bold = True
+            
+            content_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(4))
+            content_frame = content_box.text_frame
+            content_frame.word_wrap = True
+            
+            for i, point in enumerate(slide_data.get('content', [])):
+                if i > 0:
+                    content_frame.add_paragraph()
+                p = content_frame.paragraphs[i]
+                p.text = point
+                p.font.size = Pt(18)
+                p.space_after = Pt(12)
+        
+        else:
+            bg_key = f'content_{(idx % 3) + 1}'
+            background = _background(bg_key)
+            if background:
+                slide.shapes.add_picture(
+                    background,
+                    0, 0,
+                    width=prs.slide_width,
+                    height=prs.slide_height
+                )
+            
+            title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
+            title_frame = title_box.text_frame
+            title_frame.text = slide_data.get('title', '')
+            title_frame.paragraphs[0].font.size = Pt(32)
+            title_frame.paragraphs[0].font.bold = True
+            
+            has_image = bool(slide_data.get('image_url')) or idx in images
+            
+            if has_image:
+                content_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(5), Inches(4.5))
                 
-                for i, section in enumerate(sections[:3]):
-                    x = start_x + (i * (box_width + spacing))
-                    box = slide.shapes.add_textbox(x, start_y, box_width, box_height)
-                    text_frame = box.text_frame
-                    text_frame.word_wrap = True
-                    text_frame.vertical_anchor = MSO_ANCHOR.MIDDLE
+                try:
+                    image_stream = BytesIO(images[idx])
                     
-                    p = text_frame.paragraphs[0]
-                    p.text = f"{i+1}. {section}"
-                    p.font.size = Pt(16)
-                    p.font.bold = True
-                    p.alignment = PP_ALIGN.CENTER
-            
-            elif slide_data.get('type') == 'xulosa':
-                if os.path.exists(self.background_images['oxirgi']):
                     slide.shapes.add_picture(
-                        self.background_images['oxirgi'],
-                        0, 0,
-                        width=prs.slide_width,
-                        height=prs.slide_height
+                        image_stream,
+                        Inches(6),
+                        Inches(2),
+                        width=Inches(3.5)
                     )
-                
-                title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
-                title_frame = title_box.text_frame
-                title_frame.text = slide_data.get('title', 'Xulosa')
-                title_frame.paragraphs[0].font.size = Pt(36)
-                title_frame.paragraphs[0].font.bold = True
-                
-                content_box = slide.shapes.add_textbox(Inches(1), Inches(2), Inches(8), Inches(4))
-                content_frame = content_box.text_frame
-                content_frame.word_wrap = True
-                
-                for i, point in enumerate(slide_data.get('content', [])):
-                    if i > 0:
-                        content_frame.add_paragraph()
-                    p = content_frame.paragraphs[i]
-                    p.text = point
-                    p.font.size = Pt(18)
-                    p.space_after = Pt(12)
-            
+                except Exception as e:
+                    logger.error(f"Error adding image: {e}")
+                    content_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(9), Inches(4.5))
+                    has_image = False
             else:
-                bg_key = f'content_{(idx % 3) + 1}'
-                if os.path.exists(self.background_images.get(bg_key, '')):
-                    slide.shapes.add_picture(
-                        self.background_images[bg_key],
-                        0, 0,
-                        width=prs.slide_width,
-                        height=prs.slide_height
-                    )
-                
-                title_box = slide.shapes.add_textbox(Inches(0.5), Inches(0.5), Inches(9), Inches(1))
-                title_frame = title_box.text_frame
-                title_frame.text = slide_data.get('title', '')
-                title_frame.paragraphs[0].font.size = Pt(32)
-                title_frame.paragraphs[0].font.bold = True
-                
-                has_image = bool(slide_data.get('image_url'))
+                content_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(9), Inches(4.5))
+            
+            content_frame = content_box.text_frame
+            content_frame.word_wrap = True
+            
+            for i, point in enumerate(slide_data.get('content', [])):
+                if i > 0:
+                    content_frame.add_paragraph()
+                p = content_frame.paragraphs[i]
                 
                 if has_image:
-                    content_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(5), Inches(4.5))
-                    
-                    try:
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(slide_data['image_url']) as response:
-                                image_data = await response.read()
-                                image_stream = BytesIO(image_data)
-                        
-                        slide.shapes.add_picture(
-                            image_stream,
-                            Inches(6),
-                            Inches(2),
-                            width=Inches(3.5)
-                        )
-                    except Exception as e:
-                        logger.error(f"Error adding image: {e}")
-                        content_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(9), Inches(4.5))
-                        has_image = False
+                    p.text = f"• {point}"
                 else:
-                    content_box = slide.shapes.add_textbox(Inches(0.5), Inches(2), Inches(9), Inches(4.5))
-                
-                content_frame = content_box.text_frame
-                content_frame.word_wrap = True
+                    p.text = point
                 
-                for i, point in enumerate(slide_data.get('content', [])):
-                    if i > 0:
-                        content_frame.add_paragraph()
-                    p = content_frame.paragraphs[i]
-                    
-                    if has_image:
-                        p.text = f"• {point}"
-                    else:
-                        p.text = point
-                    
-                    p.font.size = Pt(18)
-                    p.space_after = Pt(12)
+                p.font.size = Pt(18)
+                p.space_after = Pt(12)
+
+    buffer = BytesIO()
+    prs.save(buffer)
+    return buffer.getvalue()
+
+def build_pdf(topic: str, slides_content: list, images: dict) -> bytes:
+    pdf = FPDF(orientation='L', unit='mm', format='A4')
+    pdf.set_auto_page_break(auto=False)
     
-        # Presentations papkasini yaratish
-        presentations_dir = "presentations"
-        if not os.path.exists(presentations_dir):
-            os.makedirs(presentations_dir)
-        
-        safe_topic = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in topic[:30])
-        safe_topic = safe_topic.replace(' ', '_')
-        
-        # Doimiy fayl nomi
-        import time
-        timestamp = int(time.time())
-        filename = os.path.join(presentations_dir, f"{safe_topic}_{timestamp}.pptx")
-        
-        prs.save(filename)
-        logger.info(f"PowerPoint saved: {filename}")
-        
-        return filename
+    pdf.add_page()
+    background = _background('asosiy')
+    if background:
+        pdf.image(background, x=0, y=0, w=297, h=210)
+    pdf.set_font('Arial', 'B', 32)
+    pdf.ln(80)
+    pdf.cell(0, 20, topic, align='C', ln=True)
+    pdf.set_font('Arial', 'I', 14)
+    pdf.cell(0, 10, '@preuz_bot', align='C')
     
-    async def create_pdf(self, topic: str, slides_content: list):
-        logger.info("Creating PDF presentation")
-        
-        pdf = FPDF(orientation='L', unit='mm', format='A4')
-        pdf.set_auto_page_break(auto=False)
-        
+    for idx, slide_data in enumerate(slides_content):
         pdf.add_page()
-        if os.path.exists(self.background_images['asosiy']):
-            pdf.image(self.background_images['asosiy'], x=0, y=0, w=297, h=210)
-        pdf.set_font('Arial', 'B', 32)
-        pdf.ln(80)
-        pdf.cell(0, 20, topic, align='C', ln=True)
-        pdf.set_font('Arial', 'I', 14)
-        pdf.cell(0, 10, '@preuz_bot', align='C')
         
-        for idx, slide_data in enumerate(slides_content):
-            pdf.add_page()
+        if slide_data.get('type') == 'reja':
+            background = _background('reja')
+            if background:
+                pdf.image(background, x=0, y=0, w=297, h=210)
             
-            if slide_data.get('type') == 'reja':
-                if os.path.exists(self.background_images['reja']):
-                    pdf.image(self.background_images['reja'], x=0, y=0, w=297, h=210)
-                
-                pdf.set_font('Arial', 'B', 28)
-                pdf.cell(0, 30, 'REJA', align='C', ln=True)
-                
-                sections = slide_data.get('sections', [])
-                pdf.set_font('Arial', 'B', 16)
-                pdf.ln(20)
-                for i, section in enumerate(sections[:3]):
-                    pdf.cell(0, 15, f"{i+1}. {section}", align='C', ln=True)
-            
-            elif slide_data.get('type') == 'xulosa':
-                if os.path.exists(self.background_images['oxirgi']):
-                    pdf.image(self.background_images['oxirgi'], x=0, y=0, w=297, h=210)
-                
-                pdf.set_font('Arial', 'B', 24)
-                pdf.cell(0, 20, slide_data.get('title', 'Xulosa'), ln=True)
-                
-                pdf.set_font('Arial', '', 12)
-                pdf.ln(10)
-                
-                for point in slide_data.get('content', []):
-                    pdf.multi_cell(0, 8, point)
-                    pdf.ln(3)
+            pdf.set_font('Arial', 'B', 28)
+            pdf.cell(0, 30, 'REJA', align='C', ln=True)
             
-            else:
-                bg_key = f'content_{(idx % 3) + 1}'
-                if os.path.exists(self.background_images.get(bg_key, '')):
-                    pdf.image(self.background_images[bg_key], x=0, y=0, w=297, h=210)
-                
-                pdf.set_font('Arial', 'B', 20)
-                pdf.cell(0, 20, slide_data.get('title', ''), ln=True)
-                
-                pdf.set_font('Arial', '', 12)
-                pdf.ln(10)
-                
-                has_image = bool(slide_data.get('image_url'))
-                
-                for point in slide_data.get('content', []):
-                    if has_image:
-                        pdf.multi_cell(0, 8, f"  - {point}")
-                    else:
-                        pdf.multi_cell(0, 8, point)
-                    pdf.ln(3)
-                
+            sections = slide_data.get('sections', [])
+            pdf.set_font('Arial', 'B', 16)
+            pdf.ln(20)
+            for i, section in enumerate(sections[:3]):
+                pdf.cell(0, 15, f"{i+1}. {section}", align='C', ln=True)
+        
+        elif slide_data.get('type') == 'xulosa':
+            background = _background('oxirgi')
+            if background:
+                pdf.image(background, x=0, y=0, w=297, h=210)
+            
+            pdf.set_font('Arial', 'B', 24)
+            pdf.cell(0, 20, slide_data.get('title', 'Xulosa'), ln=True)
+            
+            pdf.set_font('Arial', '', 12)
+            pdf.ln(10)
+            
+            for point in slide_data.get('content', []):
+                pdf.multi_cell(0, 8, point)
+                pdf.ln(3)
+        
+        else:
+            bg_key = f'content_{(idx % 3) + 1}'
+            background = _background(bg_key)
+            if background:
+                pdf.image(background, x=0, y=0, w=297, h=210)
+            
+            pdf.set_font('Arial', 'B', 20)
+            pdf.cell(0, 20, slide_data.get('title', ''), ln=True)
+            
+            pdf.set_font('Arial', '', 12)
+            pdf.ln(10)
+            
+            has_image = bool(slide_data.get('image_url')) or idx in images
+            
+            for point in slide_data.get('content', []):
                 if has_image:
-                    try:
-                        async with aiohttp.ClientSession() as session:
-                            async with session.get(slide_data['image_url']) as response:
-                                image_data = await response.read()
-                                image_stream = BytesIO(image_data)
-                        
-                        img = Image.open(image_stream)
-                        
-                        with tempfile.NamedTemporaryFile(delete=False, suffix='.jpg') as tmp_file:
-                            img_path = tmp_file.name
-                            img.save(img_path, 'JPEG')
-                        
-                        pdf.image(img_path, x=200, y=50, w=80)
+                    pdf.multi_cell(0, 8, f"  - {point}")
+                else:
+                    pdf.multi_cell(0, 8, point)
+                pdf.ln(3)
+            
+            if has_image:
+                try:
+                    # 80 mm kenglikka DECK_IMAGE_DPI bilan - 1024px asl rasm PDF ni keraksiz kattalashtiradi
+                    image_data, _ = fit_image(images[idx], 80 / 25.4, 80 / 25.4)
+                    
+                    pdf.image(BytesIO(image_data), x=200, y=50, w=80)
                         
-                        if os.path.exists(img_path):
-                            os.remove(img_path)
-                            
-                    except Exception as e:
-                        logger.error(f"Error adding image to PDF: {e}")
-        
-        # Presentations papkasini yaratish
-        presentations_dir = "presentations"
-        if not os.path.exists(presentations_dir):
-            os.makedirs(presentations_dir)
-        
-        safe_topic = "".join(c if c.isalnum() or c in (' ', '_') else '_' for c in topic[:30])
-        safe_topic = safe_topic.replace(' ', '_')
-        
-        # Doimiy fayl nomi
-        import time
-        timestamp = int(time.time())
-        filename = os.path.join(presentations_dir, f"{safe_topic}_{timestamp}.pdf")
-        
-        pdf.output(filename)
-        logger.info(f"PDF saved: {filename}")
-        
-        return filename
+                except Exception as e:
+                    logger.error(f"Error adding image to PDF: {e}")
+    
+    return bytes(pdf.output())
+
+def render_pptx_job(topic: str, slides_content: list, images: dict, optimize: bool = True):
+    """PPTX ni yaratish va (optimize bo'lsa) hajmini kamaytirish: (bytes, hisobot yoki None)"""
+    data = build_pptx(topic, slides_content, images)
+    if not optimize:
+        return data, None
+    return optimize_pptx(data)
 
 # Bot uchun wrapper funksiyalar
 async def create_presentation_file(topic: str, num_slides: int, plan: str):
@@ -507,7 +628,74 @@ async def create_presentation_file(topic: str, num_slides: int, plan: str):
     generator = PresentationGenerator()
     return await generator.generate_presentation(topic, num_slides, plan)
 
-async def generate_presentation_content_with_gpt(topic: str, num_slides: int):
+async def render_presentation_files(topic: str, num_slides: int, plan: str, slides_content: list = None):
+    """Bot uchun wrapper: xotirada tayyor fayllar [(fayl_nomi, bytes), ...]"""
+    generator = PresentationGenerator()
+    return await generator.render_presentation(topic, num_slides, plan, slides_content)
+
+async def generate_presentation_content_with_gpt(topic: str, num_slides: int, tariff: str = None):
     """Bot uchun GPT kontent generator funksiya"""
     generator = PresentationGenerator()
-    return await generator.generate_slides_content(topic, num_slides)
\ No newline at end of file
+    return await generator.generate_slides_content(topic, num_slides, tariff)
+
+async def generate_slides_text_with_gpt(topic: str, num_slides: int, priority: int = 0):
+    """Bot uchun: faqat slaydlar matni (oldindan - spekulyativ generatsiya uchun)"""
+    generator = PresentationGenerator()
+    return await generator.generate_slides_text(topic, num_slides, priority)
+
+async def attach_slide_images(slides: list, tariff: str = None):
+    """Bot uchun: tayyor matnga rasmlarni qo'shish"""
+    generator = PresentationGenerator()
+    return await generator.attach_images(slides, tariff)
+def load_slides(path: str):
+    """Saqlangan slaydlarni (parse_slides_content shaklida) JSON dan o'qish: (mavzu, slaydlar).
+
+    Fayl {"topic": ..., "slides": [...]} yoki shunchaki slaydlar ro'yxati bo'lishi mumkin.
+    Nisbiy rasm yo'llari JSON fayl joylashgan papkaga nisbatan olinadi.
+    """
+    import json
+    
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, list):
+        data = {"slides": data}
+    
+    base_dir = os.path.dirname(os.path.abspath(path))
+    slides = data["slides"]
+    for slide in slides:
+        image_url = slide.get('image_url')
+        if image_url and not image_url.startswith(('http://', 'https://', 'file://')) and not os.path.isabs(image_url):
+            slide['image_url'] = os.path.join(base_dir, image_url)
+    
+    topic = data.get("topic") or os.path.splitext(os.path.basename(path))[0]
+    return topic, slides
+
+async def render_saved_slides(path: str, plan: str = 'smart', out_dir: str = 'presentations', topic: str = None):
+    """Saqlangan slaydlardan API kalitisiz fayllarni yaratish. Yozilgan fayl yo'llarini qaytaradi"""
+    saved_topic, slides = load_slides(path)
+    topic = topic or saved_topic
+    files = await render_presentation_files(topic, len(slides), plan, slides_content=slides)
+    
+    os.makedirs(out_dir, exist_ok=True)
+    paths = []
+    for name, data in files:
+        file_path = os.path.join(out_dir, name)
+        with open(file_path, 'wb') as f:
+            f.write(data)
+        paths.append(file_path)
+    return paths
+
+if __name__ == "__main__":
+    # Oflayn render: python -m pptx_generator tools/fixtures/render/slides_10.json --plan smart
+    import argparse
+    
+    parser = argparse.ArgumentParser(description="Saqlangan slaydlardan PPTX/PDF yaratish (OpenAI kerak emas)")
+    parser.add_argument("slides", help="slaydlar JSON fayli (parse_slides_content natijasi)")
+    parser.add_argument("--plan", default="smart", help="smart - PPTX + PDF, boshqasi - faqat PPTX")
+    parser.add_argument("--out", default="presentations", help="fayllar yoziladigan papka")
+    parser.add_argument("--topic", help="mavzu (berilmasa JSON dagi topic)")
+    args = parser.parse_args()
+    
+    logging.basicConfig(level=logging.INFO)
+    for file_path in asyncio.run(render_saved_slides(args.slides, args.plan, args.out, args.topic)):
+        print(file_path)
@@ -0,0 +1,56 @@
+import asyncio
+import time
+from typing import Optional
+
+
+class TokenBucket:
+    """Token bucket limiter: sekundiga `rate` ta token, `capacity` tagacha to'planadi"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Token olishga urinish. Olinsa 0, aks holda kutish kerak bo'lgan soniyalar"""
+        tokens = min(tokens, self.capacity)
+        self._refill()
+        if self.tokens >= tokens:
+            self.tokens -= tokens
+            return 0.0
+        return (tokens - self.tokens) / self.rate
+
+    async def acquire(self, tokens: float = 1):
+        """Token bo'shaguncha kutish (navbat tartibida)"""
+        async with self._lock:
+            while True:
+                wait = self.try_acquire(tokens)
+                if wait <= 0:
+                    return
+                await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Telegram/OpenAI "retry after" javobida bucketni belgilangan vaqtga to'xtatish"""
+        self._refill()
+        self.tokens = min(self.tokens, -seconds * self.rate)
+
+    def wait_time(self, tokens: float = 1) -> float:
+        """Token olmasdan: `tokens` ta token to'planishi uchun kutish kerak bo'lgan soniyalar"""
+        tokens = min(tokens, self.capacity)
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def set_rate(self, rate: float, capacity: Optional[float] = None):
+        """Tezlik va sig'imni o'zgartirish (masalan, API javobidagi limit sarlavhalaridan)"""
+        self._refill()
+        self.rate = rate
+        if capacity is not None:
+            self.capacity = capacity
+        self.tokens = min(self.tokens, self.capacity)
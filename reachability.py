@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Optional
+
+from aiogram import Bot
+from aiogram.client.session.middlewares.base import BaseRequestMiddleware
+from aiogram.exceptions import TelegramBadRequest, TelegramForbiddenError, TelegramRetryAfter
+from aiogram.methods import (
+    CopyMessage, ForwardMessage, SendChatAction, SendDocument, SendMediaGroup,
+    SendMessage, SendPhoto, SendVideo
+)
+
+from database_adapter import (
+    get_reachability_counts, get_stale_users, mark_users_reach_checked, update_users_reachability
+)
+from rate_limit import TokenBucket
+
+logger = logging.getLogger(__name__)
+
+# Holatlar
+STATUS_ACTIVE = "active"
+STATUS_BLOCKED = "blocked"
+STATUS_DEACTIVATED = "deactivated"
+STATUS_NOT_FOUND = "not_found"
+STATUS_UNKNOWN = "unknown"
+
+UNREACHABLE_STATUSES = (STATUS_BLOCKED, STATUS_DEACTIVATED, STATUS_NOT_FOUND)
+
+# Sozlamalar
+REACHABILITY_INTERVAL = int(os.getenv("REACHABILITY_INTERVAL", "300"))
+REACHABILITY_STALE_DAYS = int(os.getenv("REACHABILITY_STALE_DAYS", "7"))
+REACHABILITY_BATCH_SIZE = int(os.getenv("REACHABILITY_BATCH_SIZE", "500"))
+REACHABILITY_PROBE_RATE = float(os.getenv("REACHABILITY_PROBE_RATE", "10"))
+
+# Foydalanuvchiga xabar yuboradigan metodlar
+TRACKED_METHODS = (
+    SendMessage, SendDocument, SendPhoto, SendVideo, SendMediaGroup,
+    CopyMessage, ForwardMessage, SendChatAction
+)
+
+# Bazaga yozilmagan holatlar (flush da yoziladi)
+_pending: Dict[int, str] = {}
+_snapshot: Optional[Dict] = None
+
+
+def classify_send_error(exception: Exception) -> Optional[str]:
+    """Yuborish xatoligidan foydalanuvchi holatini aniqlash (vaqtinchalik xatolar uchun None)"""
+    message = str(exception).lower()
+
+    if isinstance(exception, TelegramForbiddenError):
+        if "deactivated" in message:
+            return STATUS_DEACTIVATED
+        return STATUS_BLOCKED
+
+    if isinstance(exception, TelegramBadRequest) and "chat not found" in message:
+        return STATUS_NOT_FOUND
+
+    return None
+
+
+def record_reachability(chat_id: int, status: str):
+    """Foydalanuvchi holatini yozib qo'yish (keyingi flush da bazaga tushadi)"""
+    # Faqat shaxsiy chatlar (guruhlar manfiy ID ga ega)
+    if isinstance(chat_id, int) and chat_id > 0:
+        _pending[chat_id] = status
+
+
+class ReachabilityMiddleware(BaseRequestMiddleware):
+    """Bot API javoblaridan foydalanuvchi holatini passiv yig'ish"""
+
+    async def __call__(self, make_request, bot: Bot, method):
+        if not isinstance(method, TRACKED_METHODS):
+            return await make_request(bot, method)
+
+        chat_id = getattr(method, "chat_id", None)
+        try:
+            response = await make_request(bot, method)
+        except Exception as e:
+            status = classify_send_error(e)
+            if status:
+                record_reachability(chat_id, status)
+            raise
+
+        record_reachability(chat_id, STATUS_ACTIVE)
+        return response
+
+
+async def flush_reachability() -> int:
+    """Yig'ilgan holatlarni bazaga yozish"""
+    if not _pending:
+        return 0
+
+    statuses = dict(_pending)
+    _pending.clear()
+    try:
+        return await update_users_reachability(statuses)
+    except Exception as e:
+        logger.error(f"Foydalanuvchi holatlarini yozishda xatolik: {e}")
+        # Yozilmaganlarni qaytarish (yangiroq holatlar ustun)
+        for chat_id, status in statuses.items():
+            _pending.setdefault(chat_id, status)
+        return 0
+
+
+async def refresh_stats_snapshot() -> Dict:
+    """Admin statistikasi uchun snapshotni yangilash"""
+    global _snapshot
+
+    counts = await get_reachability_counts()
+    total = sum(counts.values())
+    active = counts.get(STATUS_ACTIVE, 0)
+    unreachable = sum(counts.get(status, 0) for status in UNREACHABLE_STATUSES)
+
+    _snapshot = {
+        'total': total,
+        'active': active,
+        'blocked': counts.get(STATUS_BLOCKED, 0),
+        'deactivated': counts.get(STATUS_DEACTIVATED, 0),
+        'not_found': counts.get(STATUS_NOT_FOUND, 0),
+        'unreachable': unreachable,
+        'unknown': total - active - unreachable,
+        'updated_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    }
+    return _snapshot
+
+
+async def get_stats_snapshot() -> Dict:
+    """Oxirgi snapshot (hali bo'lmasa - hisoblab olinadi)"""
+    if _snapshot is None:
+        return await refresh_stats_snapshot()
+    return _snapshot
+
+
+class ReachabilityRefresher:
+    """Eskirgan foydalanuvchilarni limit ostida tekshirib turuvchi fon vazifasi"""
+
+    def __init__(self, bot: Bot, interval: int = REACHABILITY_INTERVAL,
+                 stale_days: int = REACHABILITY_STALE_DAYS,
+                 batch_size: int = REACHABILITY_BATCH_SIZE,
+                 probe_rate: float = REACHABILITY_PROBE_RATE):
+        self.bot = bot
+        self.interval = interval
+        self.stale_days = stale_days
+        self.batch_size = batch_size
+        self.limiter = TokenBucket(probe_rate)
+        self._task: Optional[asyncio.Task] = None
+
+    async def probe(self, chat_id: int) -> Optional[bool]:
+        """Bitta foydalanuvchini getChat bilan tekshirish - foydalanuvchiga hech narsa ko'rinmaydi.
+
+        getChat botni bloklaganni aniqlamaydi: bu holat oddiy xabarlar va ommaviy xabar
+        natijalaridan (ReachabilityMiddleware) yoziladi. Bu yerda faqat o'chirilgan/topilmagan
+        hisoblar aniqlanadi. True - hisob mavjud, False - holat yozildi, None - vaqtinchalik xato.
+        """
+        await self.limiter.acquire()
+        try:
+            await self.bot.get_chat(chat_id=chat_id)
+            return True
+        except TelegramRetryAfter as e:
+            self.limiter.pause(e.retry_after)
+        except Exception as e:
+            status = classify_send_error(e)
+            if status:
+                record_reachability(chat_id, status)
+                return False
+        return None
+
+    async def run_once(self) -> int:
+        """Bitta tekshirish sikli"""
+        await flush_reachability()
+
+        users = await get_stale_users(self.batch_size, self.stale_days)
+        existing = []
+        for chat_id in users:
+            if await self.probe(chat_id):
+                existing.append(chat_id)
+
+        await mark_users_reach_checked(existing)
+        await flush_reachability()
+        await refresh_stats_snapshot()
+        return len(users)
+
+    async def _loop(self):
+        while True:
+            try:
+                checked = await self.run_once()
+                if checked:
+                    logger.info(f"Foydalanuvchi holati tekshirildi: {checked} ta")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Foydalanuvchi holatini tekshirishda xatolik: {e}")
+            await asyncio.sleep(self.interval)
+
+    def start(self):
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        await flush_reachability()
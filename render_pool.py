@@ -0,0 +1,100 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import time
+from collections import defaultdict
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+# process - alohida jarayonlar (event loop va GIL band bo'lmaydi), thread - oqimlar, inline - loop ichida
+RENDER_POOL = os.getenv("RENDER_POOL", "process")
+RENDER_WORKERS = int(os.getenv("RENDER_WORKERS", str(min(2, os.cpu_count() or 1))))
+
+
+def _init_worker():
+    """Worker jarayonida pptx, fpdf, PIL va fon rasmlarini bir marta yuklash"""
+    from pptx_generator import warm_up
+
+    warm_up()
+
+
+class RenderPool:
+    """PPTX/PDF renderlash (CPU ishi) uchun executor.
+
+    Render bir necha yuz millisekund CPU oladi - loop ichida bo'lsa shu vaqt davomida bot
+    javob bermaydi. Vazifa funksiyalari modul darajasida va argumentlari pickle qilinadigan
+    bo'lishi kerak (process rejimi uchun).
+    """
+
+    def __init__(self, mode: str = RENDER_POOL, workers: int = RENDER_WORKERS):
+        self.mode = mode if mode in ("process", "thread", "inline") else "process"
+        self.workers = max(1, workers)
+        self._executor: Optional[Executor] = None
+        self._running = 0
+        self.counters: Dict[str, int] = defaultdict(int)
+        self.busy_ms = 0.0
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.mode == "process":
+                # spawn: ishlayotgan event loop va oqimlar nusxalanmaydi
+                self._executor = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                                     initializer=_init_worker)
+            else:
+                self._executor = ThreadPoolExecutor(self.workers, thread_name_prefix="render")
+        return self._executor
+
+    async def run(self, fn: Callable[..., Any], *args: Any) -> Any:
+        """fn(*args) ni pool'da bajarish"""
+        started = time.perf_counter()
+        self._running += 1
+        try:
+            if self.mode == "inline":
+                return fn(*args)
+            try:
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+            except BrokenProcessPool:
+                # Worker o'ldi (OOM va h.k.) - pool qayta yaratiladi, vazifa bir marta takrorlanadi
+                logger.error("Render pool buzildi, qayta yaratilmoqda")
+                self.counters["restarts"] += 1
+                self._executor = None
+                return await asyncio.get_running_loop().run_in_executor(self._get_executor(), fn, *args)
+        except Exception:
+            self.counters["failed"] += 1
+            raise
+        finally:
+            self._running -= 1
+            self.counters["jobs"] += 1
+            self.busy_ms += (time.perf_counter() - started) * 1000
+
+    async def warm_up(self):
+        """Worker jarayonlarini oldindan ishga tushirish - birinchi buyurtma spawn va importlarni kutmaydi"""
+        if self.mode != "process":
+            return
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        await asyncio.gather(*(loop.run_in_executor(executor, os.getpid) for _ in range(self.workers)))
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def snapshot(self) -> Dict[str, Any]:
+        jobs = self.counters["jobs"]
+        return {
+            "mode": self.mode,
+            "workers": self.workers,
+            "running": self._running,
+            "avg_ms": round(self.busy_ms / jobs, 1) if jobs else 0.0,
+            **self.counters,
+        }
+
+
+# Jarayon bo'ylab yagona pool
+render_pool = RenderPool()
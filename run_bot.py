@@ -23,7 +23,7 @@ async def main():
     logger.info("Database initialized successfully")
     
     # Webhook ni o'chirish (agar o'rnatilgan bo'lsa)
-    await bot.delete_webhook(drop_pending_updates=True)
+    await bot.delete_webhook(drop_pending_updates=False)
     logger.info("Webhook deleted, starting polling...")
     
     # Botni ishga tushirish
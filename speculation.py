@@ -0,0 +1,164 @@
+import asyncio
+import logging
+import os
+import time
+from collections import defaultdict, deque
+from datetime import date
+from typing import Any, Deque, Dict, Optional
+
+import order_costs
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+SPECULATIVE_ENABLED = os.getenv("SPECULATIVE_ENABLED", "1") == "1"
+# Tayyorlangan matn shuncha soniya kutadi, keyin tashlab yuboriladi
+SPECULATIVE_TTL = float(os.getenv("SPECULATIVE_TTL", "300"))
+# Bir vaqtda ishlaydigan spekulyativ so'rovlar (butun bot bo'yicha)
+SPECULATIVE_SLOTS = int(os.getenv("SPECULATIVE_SLOTS", "8"))
+# Bitta foydalanuvchi uchun soatiga spekulyativ ishlar
+SPECULATIVE_PER_USER_HOURLY = int(os.getenv("SPECULATIVE_PER_USER_HOURLY", "3"))
+# Kuniga behuda ketishi mumkin bo'lgan (buyurtma bo'lmagan) sarf, USD
+SPECULATIVE_DAILY_BUDGET = float(os.getenv("SPECULATIVE_DAILY_BUDGET", "2.0"))
+# O'rtada bekor qilingan so'rov sarfi noma'lum - gpt-4.1, max_tokens=4000 bo'yicha yuqori baho
+CANCELLED_COST_ESTIMATE = 0.035
+# openai_scheduler navbatida haqiqiy buyurtmalardan keyin
+SPECULATIVE_PRIORITY = 1
+
+
+class _Slot:
+    __slots__ = ("topic", "pages", "tariff", "task", "cost", "timer", "created")
+
+    def __init__(self, topic: str, pages: int, tariff: str):
+        self.topic = topic
+        self.pages = pages
+        self.tariff = tariff
+        self.cost = order_costs.OrderCost(None, tariff, pages)
+        self.created = time.monotonic()
+        self.task: Optional[asyncio.Task] = None
+        self.timer: Optional[asyncio.TimerHandle] = None
+
+
+class SpeculativeSlots:
+    """Mavzu va sahifalar soni ma'lum bo'lgach slaydlar matnini oldindan tayyorlash.
+
+    Har bir foydalanuvchida bitta qisqa muddatli slot: tasdiqlash ekranlari davomida matn
+    tayyorlanadi, yakuniy tasdiqda buyurtmaga beriladi (take), "Yo'q" yoki TTL da bekor
+    qilinadi. Suiiste'molga qarshi: global slotlar soni, foydalanuvchi uchun soatlik limit
+    va kunlik behuda sarf byudjeti.
+    """
+
+    def __init__(self, enabled: bool = SPECULATIVE_ENABLED, ttl: float = SPECULATIVE_TTL,
+                 slots: int = SPECULATIVE_SLOTS, per_user_hourly: int = SPECULATIVE_PER_USER_HOURLY,
+                 daily_budget: float = SPECULATIVE_DAILY_BUDGET):
+        self.enabled = enabled
+        self.ttl = ttl
+        self.slots = slots
+        self.per_user_hourly = per_user_hourly
+        self.daily_budget = daily_budget
+        self._slots: Dict[int, _Slot] = {}
+        self._starts: Dict[int, Deque[float]] = defaultdict(deque)
+        self._wasted_day = date.today()
+        self.wasted_usd = 0.0
+        self.counters: Dict[str, int] = defaultdict(int)
+
+    def _running(self) -> int:
+        return sum(1 for slot in self._slots.values() if not slot.task.done())
+
+    def _skip_reason(self, user_id: int) -> Optional[str]:
+        if not self.enabled:
+            return "disabled"
+        if self._wasted_day != date.today():
+            self._wasted_day, self.wasted_usd = date.today(), 0.0
+        if self.wasted_usd >= self.daily_budget:
+            return "budget"
+        if self._running() >= self.slots:
+            return "slots"
+        starts = self._starts[user_id]
+        while starts and starts[0] < time.monotonic() - 3600:
+            starts.popleft()
+        if len(starts) >= self.per_user_hourly:
+            return "user_limit"
+        return None
+
+    def start(self, user_id: int, topic: str, pages: int, tariff: str) -> bool:
+        """Matnni oldindan tayyorlashni boshlash (oldingi slot bekor qilinadi)"""
+        self.cancel(user_id, "replaced")
+        reason = self._skip_reason(user_id)
+        if reason:
+            self.counters[f"skipped_{reason}"] += 1
+            return False
+
+        slot = _Slot(topic, pages, tariff)
+        slot.task = asyncio.create_task(self._generate(slot))
+        slot.timer = asyncio.get_running_loop().call_later(self.ttl, self._expire, user_id, slot)
+        self._slots[user_id] = slot
+        self._starts[user_id].append(time.monotonic())
+        self.counters["started"] += 1
+        return True
+
+    async def _generate(self, slot: _Slot):
+        # Sarf alohida hisobga yoziladi: buyurtmaga qo'shiladi yoki behuda deb hisoblanadi
+        order_costs.use(slot.cost)
+        from pptx_generator import generate_slides_text_with_gpt
+        return await generate_slides_text_with_gpt(slot.topic, slot.pages, priority=SPECULATIVE_PRIORITY)
+
+    def take(self, user_id: int, topic: str, pages: int) -> Optional[_Slot]:
+        """Yakuniy tasdiq: mos slotni buyurtmaga berish (mavzu yoki sahifalar o'zgargan bo'lsa None)"""
+        slot = self._slots.pop(user_id, None)
+        if slot is None:
+            return None
+        slot.timer.cancel()
+        if slot.topic != topic or slot.pages != pages:
+            self._discard(slot, "mismatch")
+            return None
+        if slot.task.done() and (slot.task.cancelled() or slot.task.exception()):
+            self._discard(slot, "failed")
+            return None
+        self.counters["used"] += 1
+        return slot
+
+    async def result(self, slot: _Slot) -> Any:
+        """Slot matnini kutish va sarfini joriy buyurtma hisobiga qo'shish"""
+        try:
+            return await slot.task
+        finally:
+            cost = order_costs.current()
+            if cost is not None:
+                cost.merge(slot.cost)
+
+    def cancel(self, user_id: int, reason: str = "declined"):
+        slot = self._slots.pop(user_id, None)
+        if slot is not None:
+            slot.timer.cancel()
+            self._discard(slot, reason)
+
+    def _expire(self, user_id: int, slot: _Slot):
+        if self._slots.get(user_id) is slot:
+            del self._slots[user_id]
+            self._discard(slot, "expired")
+
+    def _discard(self, slot: _Slot, reason: str):
+        if not slot.task.done():
+            slot.task.cancel()
+            wasted = max(slot.cost.cost_usd, CANCELLED_COST_ESTIMATE)
+        else:
+            if not slot.task.cancelled():
+                slot.task.exception()  # "exception was never retrieved" bo'lmasin
+            wasted = slot.cost.cost_usd
+        self.wasted_usd += wasted
+        self.counters[f"discarded_{reason}"] += 1
+        logger.info(f"Spekulyativ matn tashlandi ({reason}), ${wasted:.3f}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "slots": len(self._slots),
+            "running": self._running(),
+            "wasted_usd_today": round(self.wasted_usd, 4),
+            "daily_budget_usd": self.daily_budget,
+            **self.counters,
+        }
+
+
+# Jarayon bo'ylab yagona slotlar
+speculative_slots = SpeculativeSlots()
@@ -0,0 +1,59 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Ishga tushish bosqichlari va ularning davomiyligi (/health/startup uchun)"""
+
+    def __init__(self):
+        self.started_at = time.time()
+        self._started = time.perf_counter()
+        self.status = "starting"
+        self.error: Optional[str] = None
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.details: Dict[str, Any] = {}
+
+    def elapsed_ms(self) -> float:
+        return round((time.perf_counter() - self._started) * 1000, 1)
+
+    @contextmanager
+    def phase(self, name: str):
+        """Bosqich vaqtini o'lchash. Xatolik bo'lsa bosqich 'failed' deb belgilanadi"""
+        entry = {"status": "running", "started_ms": self.elapsed_ms()}
+        self.phases[name] = entry
+        started = time.perf_counter()
+        try:
+            yield entry
+            entry["status"] = "done"
+        except Exception as e:
+            entry["status"] = "failed"
+            entry["error"] = str(e)[:200]
+            raise
+        finally:
+            entry["duration_ms"] = round((time.perf_counter() - started) * 1000, 1)
+            logger.info(f"Ishga tushish bosqichi '{name}': {entry['status']}, {entry['duration_ms']} ms")
+
+    def mark(self, status: str, error: str = None):
+        self.status = status
+        self.error = error
+        if status in ("ready", "failed"):
+            self.details["ready_ms"] = self.elapsed_ms()
+            summary = ", ".join(f"{name} {p.get('duration_ms', '?')} ms" for name, p in self.phases.items())
+            logger.info(f"Ishga tushish: {status} ({self.details['ready_ms']} ms) - {summary}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "status": self.status,
+            "error": self.error,
+            "uptime_ms": self.elapsed_ms(),
+            "phases": self.phases,
+            **self.details
+        }
+
+
+# Jarayon bo'ylab yagona hisobot
+startup_report = StartupReport()
@@ -0,0 +1,126 @@
+"""FSM storage benchmarki: MemoryStorage, BoundedMemoryStorage va SQLiteStorage.
+
+Ishga tushirish:
+    python -m tools.bench_fsm_storage --users 2000 --rounds 5
+
+Har bir "handler" oddiy bot handleriga o'xshaydi: get_state, 2 ta update_data, set_state.
+Natijada har bir amal uchun p50/p99 (mikrosekund), flush dan keyingi baza hajmi va
+ko'p foydalanuvchi MENU holatida bo'lgandagi xotira sarfi chiqadi.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+import tracemalloc
+
+from aiogram.fsm.storage.base import StorageKey
+from aiogram.fsm.storage.memory import MemoryStorage
+
+from fsm_storage import BoundedMemoryStorage, SQLiteStorage
+
+BOT_ID = 1
+MENU = "OnboardingStates:MENU"
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+async def run_handlers(storage, users: int, rounds: int):
+    timings = {"get_state": [], "update_data": [], "set_state": [], "get_data": []}
+
+    async def timed(name, coro):
+        started = time.perf_counter()
+        result = await coro
+        timings[name].append((time.perf_counter() - started) * 1e6)
+        return result
+
+    for round_no in range(rounds):
+        for user_id in range(1, users + 1):
+            key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+            await timed("get_state", storage.get_state(key))
+            await timed("update_data", storage.update_data(key, {"topic": f"Mavzu {user_id} {round_no}"}))
+            await timed("update_data", storage.update_data(key, {"pages": 10 + round_no, "tariff": "SMART"}))
+            await timed("set_state", storage.set_state(key, f"OrderStates:STEP_{round_no}"))
+            await timed("get_data", storage.get_data(key))
+    return timings
+
+
+def report(name: str, timings: dict, elapsed: float):
+    total_ops = sum(len(v) for v in timings.values())
+    print(f"\n{name}: {total_ops} ta amal, {elapsed:.2f} s, {total_ops / elapsed:,.0f} amal/s")
+    for op, values in timings.items():
+        print(f"  {op:<12} p50={statistics.median(values):8.1f} us   p99={percentile(values, 0.99):8.1f} us")
+
+
+async def measure_memory(storage, users: int, active: int) -> int:
+    """`users` ta foydalanuvchi MENU da, `active` tasi buyurtma jarayonida - xotira (bayt)"""
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    for user_id in range(1, users + 1):
+        key = StorageKey(bot_id=BOT_ID, chat_id=user_id, user_id=user_id)
+        if user_id <= active:
+            await storage.set_state(key, "OrderStates:ASK_PAGES")
+            await storage.update_data(key, {"topic": f"Mavzu {user_id}"})
+        else:
+            await storage.set_state(key, MENU)
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="FSM storage benchmarki")
+    parser.add_argument("--users", type=int, default=2000)
+    parser.add_argument("--rounds", type=int, default=5)
+    parser.add_argument("--memory-users", type=int, default=100000)
+    parser.add_argument("--memory-active", type=int, default=500)
+    args = parser.parse_args()
+
+    memory = MemoryStorage()
+    started = time.perf_counter()
+    timings = await run_handlers(memory, args.users, args.rounds)
+    report("MemoryStorage", timings, time.perf_counter() - started)
+
+    bounded = BoundedMemoryStorage(default_state=MENU)
+    started = time.perf_counter()
+    timings = await run_handlers(bounded, args.users, args.rounds)
+    report("BoundedMemoryStorage", timings, time.perf_counter() - started)
+
+    print(f"\nXotira: {args.memory_users} ta foydalanuvchi, {args.memory_active} tasi faol")
+    for name, storage in (("MemoryStorage", MemoryStorage()),
+                          ("BoundedMemoryStorage", BoundedMemoryStorage(default_state=MENU))):
+        used = await measure_memory(storage, args.memory_users, args.memory_active)
+        print(f"  {name:<22} {used / 1024 / 1024:8.2f} MB")
+    print(f"  gauges: {storage.gauges()}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "fsm.db")
+
+        # Sovuq kesh: har bir foydalanuvchi birinchi marta bazadan o'qiladi
+        sqlite = SQLiteStorage(path)
+        started = time.perf_counter()
+        timings = await run_handlers(sqlite, args.users, args.rounds)
+        await sqlite.flush()
+        report("SQLiteStorage", timings, time.perf_counter() - started)
+        await sqlite.close()
+
+        # Qayta ishga tushgandan keyin: kesh bo'sh, holatlar bazada
+        restarted = SQLiteStorage(path)
+        started = time.perf_counter()
+        timings = await run_handlers(restarted, args.users, 1)
+        report("SQLiteStorage (qayta ishga tushgandan keyin)", timings, time.perf_counter() - started)
+        key = StorageKey(bot_id=BOT_ID, chat_id=1, user_id=1)
+        await restarted.close()
+
+        check = SQLiteStorage(path)
+        print(f"\nSaqlangan holat: {await check.get_state(key)}, ma'lumot: {await check.get_data(key)}")
+        await check.close()
+        print(f"Baza hajmi: {os.path.getsize(path) / 1024:.0f} KB ({args.users} ta foydalanuvchi)")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
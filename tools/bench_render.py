@@ -0,0 +1,154 @@
+"""Renderlash benchmarki: PPTX va PDF, turli slaydlar soni, rasmli va rasmsiz.
+
+Ishga tushirish (OpenAI kaliti kerak emas):
+    python -m tools.bench_render                  # bazaviy natija bilan solishtirish
+    python -m tools.bench_render --save-baseline  # joriy natijani bazaviy qilib saqlash
+    python -m tools.bench_render --sizes 10 25 --formats pptx --repeat 5
+
+Slaydlar tools/fixtures/render/slides_<N>.json dan (parse_slides_content shaklida, lokal
+rasmlar bilan) olinadi. create_ppt/create_pdf ishlatadigan render_ppt/render_pdf o'lchanadi
+(diskka yozishsiz): wall va CPU vaqti (medianasi), tracemalloc bo'yicha eng yuqori xotira
+va fayl hajmi. Chegaradan oshgan regressiya bo'lsa chiqish kodi 1.
+
+Render shu jarayonda bajariladi (RENDER_POOL=inline) - aks holda CPU va xotira worker
+jarayonida sarflanib, o'lchanmay qoladi. PPTX vaqtiga deck_optimizer ham kiradi; uning
+fit_image keshi har bir o'lchovdan oldin tozalanadi - haqiqiy buyurtmalardagi DALL-E rasmlari
+har safar yangi, keshdan qayta kodlash esa vaqtni kam ko'rsatadi.
+"""
+import argparse
+import asyncio
+import copy
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+
+os.environ.setdefault("RENDER_POOL", "inline")
+
+from deck_optimizer import clear_fit_cache
+from pptx_generator import PresentationGenerator, load_slides, warm_up
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures", "render")
+BASELINE_PATH = os.path.join(FIXTURES_DIR, "baseline.json")
+SIZES = (5, 10, 25, 50)
+FORMATS = ("pptx", "pdf")
+
+# Vaqt shovqini: bundan kichik farqlar regressiya hisoblanmaydi
+MIN_TIME_DELTA_MS = 25.0
+
+
+async def render(generator: PresentationGenerator, fmt: str, topic: str, slides: list) -> bytes:
+    if fmt == "pptx":
+        return await generator.render_ppt(topic, slides)
+    return await generator.render_pdf(topic, slides)
+
+
+async def measure(fmt: str, topic: str, slides: list, repeat: int) -> dict:
+    generator = PresentationGenerator()
+    # Birinchi (isituvchi) chaqiruv o'lchanmaydi
+    data = await render(generator, fmt, topic, slides)
+
+    wall, cpu = [], []
+    for _ in range(repeat):
+        clear_fit_cache()
+        started_wall, started_cpu = time.perf_counter(), time.process_time()
+        await render(generator, fmt, topic, slides)
+        wall.append((time.perf_counter() - started_wall) * 1000)
+        cpu.append((time.process_time() - started_cpu) * 1000)
+
+    # Xotira alohida o'lchanadi - tracemalloc vaqtni sekinlashtiradi
+    clear_fit_cache()
+    tracemalloc.start()
+    await render(generator, fmt, topic, slides)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {
+        "wall_ms": round(statistics.median(wall), 1),
+        "cpu_ms": round(statistics.median(cpu), 1),
+        "peak_kb": round(peak / 1024),
+        "size_kb": round(len(data) / 1024),
+    }
+
+
+def compare(name: str, result: dict, base: dict, args) -> list:
+    """Bazaviy natijadan chegaradan ortiq yomonlashgan ko'rsatkichlar"""
+    regressions = []
+    checks = (
+        ("wall_ms", args.time_threshold), ("cpu_ms", args.time_threshold),
+        ("peak_kb", args.memory_threshold), ("size_kb", args.size_threshold),
+    )
+    for metric, threshold in checks:
+        old, new = base.get(metric), result[metric]
+        if not old:
+            continue
+        if metric.endswith("_ms") and new - old < MIN_TIME_DELTA_MS:
+            continue
+        if new > old * (1 + threshold):
+            regressions.append(f"{name} {metric}: {old} -> {new} (+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+def change(new: float, old: float) -> str:
+    if not old:
+        return ""
+    return f"{(new / old - 1) * 100:+.0f}%"
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="PPTX/PDF renderlash benchmarki")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(SIZES))
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--time-threshold", type=float, default=0.25, help="wall/CPU vaqti uchun ruxsat (0.25 = +25%%)")
+    parser.add_argument("--memory-threshold", type=float, default=0.25)
+    parser.add_argument("--size-threshold", type=float, default=0.10)
+    args = parser.parse_args()
+
+    warm_up()
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results, regressions = {}, []
+    print(f"{'holat':<22}{'wall ms':>10}{'cpu ms':>10}{'peak KB':>10}{'hajm KB':>10}   bazaviyga nisbatan (wall / peak / hajm)")
+    for size in args.sizes:
+        topic, slides = load_slides(os.path.join(FIXTURES_DIR, f"slides_{size}.json"))
+        no_images = copy.deepcopy(slides)
+        for slide in no_images:
+            slide["image_url"] = None
+
+        for fmt in args.formats:
+            for variant, deck in (("images", slides), ("no-images", no_images)):
+                name = f"{fmt}/{size}/{variant}"
+                result = await measure(fmt, topic, deck, args.repeat)
+                results[name] = result
+                base = baseline.get(name, {})
+                delta = " / ".join(change(result[m], base.get(m)) for m in ("wall_ms", "peak_kb", "size_kb")) if base else "-"
+                print(f"{name:<22}{result['wall_ms']:>10}{result['cpu_ms']:>10}{result['peak_kb']:>10}{result['size_kb']:>10}   {delta}")
+                if base:
+                    regressions += compare(name, result, base, args)
+
+    if args.save_baseline:
+        baseline.update(results)
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump(baseline, f, indent=1, sort_keys=True)
+        print(f"\nBazaviy natija saqlandi: {args.baseline}")
+        return
+
+    if regressions:
+        print("\nRegressiyalar:")
+        for line in regressions:
+            print(f"  {line}")
+        sys.exit(1)
+    if baseline:
+        print("\nRegressiya yo'q")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
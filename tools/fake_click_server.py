@@ -0,0 +1,106 @@
+"""Click API ning lokal soxta serveri (to'lov oqimini internet va haqiqiy pulsiz sinash uchun).
+
+Ishga tushirish:
+    python -m tools.fake_click_server --port 8081 --delay 0.2 --fail-rate 0.1
+
+Bot tomonda:
+    CLICK_API_URL=http://127.0.0.1:8081 CLICK_SECRET_KEY=test_secret python main.py
+
+Qo'shimcha endpointlar:
+    POST /_confirm/{payment_id}  - to'lovni "confirmed" holatiga o'tkazish
+    POST /_cancel/{payment_id}   - to'lovni "cancelled" holatiga o'tkazish
+    GET  /_payments              - barcha to'lovlar
+"""
+import argparse
+import asyncio
+import itertools
+import random
+
+from aiohttp import web
+
+from click_client import generate_click_signature
+
+
+def create_app(secret_key: str, delay: float = 0.0, fail_rate: float = 0.0,
+               auto_confirm: bool = False) -> web.Application:
+    payments = {}
+    ids = itertools.count(1000)
+
+    async def simulate_network():
+        if delay:
+            await asyncio.sleep(delay)
+        if fail_rate and random.random() < fail_rate:
+            raise web.HTTPServiceUnavailable()
+
+    def check_sign(data: dict, *fields: str) -> bool:
+        expected = generate_click_signature("".join(str(data.get(f)) for f in fields), secret_key)
+        return data.get("sign_string") == expected
+
+    async def card_create(request: web.Request):
+        data = await request.json()
+        await simulate_network()
+        if not check_sign(data, "merchant_id", "service_id", "amount", "transaction_param"):
+            return web.json_response({"error_code": -1, "error_note": "SIGN CHECK FAILED"})
+
+        payment_id = str(next(ids))
+        payments[payment_id] = {
+            "payment_id": payment_id,
+            "amount": data["amount"],
+            "transaction_param": data["transaction_param"],
+            "status": "confirmed" if auto_confirm else "pending"
+        }
+        return web.json_response({
+            "error_code": 0,
+            "payment_id": payment_id,
+            "click_url": f"http://{request.host}/pay/{payment_id}"
+        })
+
+    async def card_status(request: web.Request):
+        data = await request.json()
+        await simulate_network()
+        if not check_sign(data, "merchant_id", "service_id", "payment_id"):
+            return web.json_response({"error_code": -1, "error_note": "SIGN CHECK FAILED"})
+
+        payment = payments.get(str(data.get("payment_id")))
+        if not payment:
+            return web.json_response({"error_code": -5, "error_note": "Payment not found"})
+        return web.json_response({"error_code": 0, **payment})
+
+    def set_status(status: str):
+        async def handler(request: web.Request):
+            payment = payments.get(request.match_info["payment_id"])
+            if not payment:
+                raise web.HTTPNotFound()
+            payment["status"] = status
+            return web.json_response(payment)
+        return handler
+
+    async def list_payments(request: web.Request):
+        return web.json_response(list(payments.values()))
+
+    app = web.Application()
+    app["payments"] = payments
+    app.router.add_post("/card/create", card_create)
+    app.router.add_post("/card/status", card_status)
+    app.router.add_post("/_confirm/{payment_id}", set_status("confirmed"))
+    app.router.add_post("/_cancel/{payment_id}", set_status("cancelled"))
+    app.router.add_get("/_payments", list_payments)
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Soxta Click API serveri")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8081)
+    parser.add_argument("--secret", default="test_secret")
+    parser.add_argument("--delay", type=float, default=0.0, help="Har bir javob oldidan kutish (soniya)")
+    parser.add_argument("--fail-rate", type=float, default=0.0, help="503 qaytarish ehtimoli (0..1)")
+    parser.add_argument("--auto-confirm", action="store_true", help="To'lovlar darhol tasdiqlangan bo'ladi")
+    args = parser.parse_args()
+
+    app = create_app(args.secret, args.delay, args.fail_rate, args.auto_confirm)
+    web.run_app(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
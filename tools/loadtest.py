@@ -0,0 +1,596 @@
+"""Oflayn end-to-end yuklama testi: to'liq foydalanuvchi yo'li dispatcher orqali.
+
+Har bir sintetik foydalanuvchi botdagi haqiqiy yo'ldan o'tadi: /start, ism, kontaktni
+o'tkazib yuborish, "Taqdimot tayyorlash", tarif, mavzu, sahifalar, ikki marta tasdiqlash
+va start_generation. Update'lar to'g'ridan-to'g'ri dp.feed_update ga beriladi.
+
+Tarmoq ishlatilmaydi: Bot sessiyasi lokal soxta Bot API serveriga, OpenAI/DALL-E esa
+sozlanadigan kechikishli stub'ga yo'naltiriladi (ikkalasi alohida oqimda ishlaydi - bot event
+loop'idagi bloklovchi kod stub javoblarini kechiktirmasin). Baza - DataBase.db ning vaqtinchalik nusxasi.
+
+    python -m tools.loadtest --users 50 --concurrency 10 --openai-ms 1500 --image-ms 1000
+
+Stub o'rniga yozib olingan haqiqiy javoblar bilan (OPENAI_MODE=record kassetasi):
+    python -m tools.loadtest --users 50 --cassette cassettes/openai.jsonl.gz --replay-latency 1
+
+Bepul buyurtmalar to'lqini ortida pullik buyurtmalar navbatda qancha kutishini ko'rish:
+    python -m tools.loadtest --users 60 --concurrency 60 --mix START=70,STANDARD=20,SMART=10
+
+OpenAI limitlari bilan (stub 429 va x-ratelimit-* sarlavhalarini qaytaradi):
+    python -m tools.loadtest --users 20 --image-rpm 12
+
+Natija: update/s, har bir qadam uchun handler p50/p95/p99, baza amallari va lock kutishlari,
+generatsiya tugash vaqtlari va event loop kechikishi. Deploy oldidan regressiyalarni ushlash uchun.
+"""
+import argparse
+import asyncio
+import base64
+import contextlib
+import importlib
+import itertools
+import json
+import os
+import random
+import shutil
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+from io import BytesIO
+
+from aiohttp import web
+
+TOKEN = "123456:LOADTEST"
+FIRST_USER_ID = 9_100_000_000
+TOPIC = "Sun'iy intellekt - ta'limdagi o'rni"
+
+update_ids = itertools.count(1)
+callback_ids = itertools.count(1)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+def fake_slides(num_slides: int) -> str:
+    """parse_slides_content kutgan formatdagi GPT javobi"""
+    parts = [
+        "SLIDE kirish", "TITLE: Kirish", "CONTENT:",
+        "- Birinchi nuqta", "- Ikkinchi nuqta", "- Uchinchi nuqta",
+        "IMAGE_PROMPT: Students using laptops in a modern classroom", "",
+        "SLIDE reja", "SECTION_1: Tarix", "SECTION_2: Hozirgi holat", "SECTION_3: Kelajak", "",
+    ]
+    for i in range(1, max(1, num_slides - 3) + 1):
+        parts += [f"SLIDE {i}", f"TITLE: {i}-bo'lim", "CONTENT:"]
+        if i <= 2:
+            parts += [f"- {i}.{j} nuqta" for j in range(1, 5)]
+            parts.append(f"IMAGE_PROMPT: Illustration number {i}")
+        else:
+            parts += ["Bu bo'lim haqida batafsil matn. " * 12, "Ikkinchi paragraf matni. " * 10]
+        parts.append("")
+    parts += ["SLIDE xulosa", "TITLE: Xulosa", "CONTENT:", "Yakuniy xulosa matni. " * 15]
+    return "\n".join(parts)
+
+
+class FakeServers:
+    """Soxta Telegram Bot API va OpenAI stub - alohida oqimdagi event loop'da"""
+
+    def __init__(self, openai_ms: float, image_ms: float, bot_api_ms: float, rpm: dict = None):
+        self.openai_ms = openai_ms
+        self.image_ms = image_ms
+        self.bot_api_ms = bot_api_ms
+        # model -> daqiqalik so'rov limiti (OpenAI kabi 429 va x-ratelimit-* sarlavhalari)
+        self.rpm = rpm or {}
+        self._windows = defaultdict(deque)
+        self.calls = defaultdict(int)
+        # chat_id -> hujjat(lar) kelgan vaqt (perf_counter)
+        self.documents_at = {}
+        self._message_ids = itertools.count(1000)
+        self._file_ids = itertools.count(1)
+        self._image = self._make_image()
+        self._loop = None
+        self._runner = None
+        self._ready = threading.Event()
+        self.url = None
+
+    @staticmethod
+    def _make_image() -> bytes:
+        from PIL import Image
+
+        out = BytesIO()
+        Image.new("RGB", (256, 256), (40, 90, 160)).save(out, format="PNG")
+        return out.getvalue()
+
+    @staticmethod
+    async def _delay(ms: float):
+        if ms > 0:
+            await asyncio.sleep(ms * random.uniform(0.8, 1.2) / 1000)
+
+    def _message(self, chat_id: int, **extra) -> dict:
+        return {
+            "message_id": next(self._message_ids),
+            "date": int(time.time()),
+            "chat": {"id": chat_id, "type": "private" if chat_id > 0 else "supergroup"},
+            **extra
+        }
+
+    def _document(self) -> dict:
+        n = next(self._file_ids)
+        return {"document": {"file_id": f"DOC{n}", "file_unique_id": f"U{n}", "file_name": f"{n}.pptx"}}
+
+    # --- Bot API ---
+
+    async def bot_api(self, request: web.Request) -> web.Response:
+        method = request.match_info["method"].lower()
+        form = await request.post()
+        self.calls[method] += 1
+        await self._delay(self.bot_api_ms)
+
+        chat_id = int(form.get("chat_id") or 0)
+        if method == "getme":
+            result = {"id": 123456, "is_bot": True, "first_name": "LoadTest", "username": "loadtest_bot"}
+        elif method == "senddocument":
+            result = self._message(chat_id, **self._document())
+            self.documents_at.setdefault(chat_id, time.perf_counter())
+        elif method == "sendmediagroup":
+            media = json.loads(form.get("media") or "[]")
+            result = [self._message(chat_id, **self._document()) for _ in media]
+            self.documents_at.setdefault(chat_id, time.perf_counter())
+        elif method == "copymessage":
+            result = {"message_id": next(self._message_ids)}
+        elif method.startswith(("send", "edit", "forward")):
+            result = self._message(chat_id, text=form.get("text") or "")
+        else:
+            result = True
+        return web.json_response({"ok": True, "result": result})
+
+    # --- OpenAI ---
+
+    def _rate_limit(self, model: str):
+        """(ruxsat, sarlavhalar) - oxirgi 60 soniyadagi so'rovlar bo'yicha"""
+        rpm = self.rpm.get(model)
+        if not rpm:
+            return True, {}
+        now = time.monotonic()
+        window = self._windows[model]
+        while window and window[0] <= now - 60:
+            window.popleft()
+        headers = {"x-ratelimit-limit-requests": str(rpm)}
+        if len(window) >= rpm:
+            self.calls[f"429.{model}"] += 1
+            headers["x-ratelimit-remaining-requests"] = "0"
+            headers["x-ratelimit-reset-requests"] = f"{window[0] + 60 - now:.3f}s"
+            return False, headers
+        window.append(now)
+        headers["x-ratelimit-remaining-requests"] = str(rpm - len(window))
+        return True, headers
+
+    def _too_many_requests(self, model: str, headers: dict) -> web.Response:
+        return web.json_response({"error": {
+            "message": f"Rate limit reached for {model}", "type": "requests", "code": "rate_limit_exceeded"
+        }}, status=429, headers=headers)
+
+    async def chat_completions(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        allowed, headers = self._rate_limit(body.get("model", ""))
+        if not allowed:
+            return self._too_many_requests(body.get("model", ""), headers)
+        self.calls["openai.chat"] += 1
+        prompt = body["messages"][-1]["content"]
+        num_slides = 10
+        for line in prompt.splitlines():
+            if line.startswith("JAMI "):
+                num_slides = int(line.split()[1])
+        await self._delay(self.openai_ms)
+        return web.json_response({
+            "id": f"chatcmpl-{self.calls['openai.chat']}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "gpt-4.1"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": fake_slides(num_slides)},
+                "finish_reason": "stop"
+            }],
+            "usage": {"prompt_tokens": 900, "completion_tokens": 2500, "total_tokens": 3400}
+        }, headers=headers)
+
+    async def images_generations(self, request: web.Request) -> web.Response:
+        body = await request.json()
+        allowed, headers = self._rate_limit(body.get("model", ""))
+        if not allowed:
+            return self._too_many_requests(body.get("model", ""), headers)
+        self.calls["openai.image"] += 1
+        await self._delay(self.image_ms)
+        if body.get("response_format") == "b64_json":
+            item = {"b64_json": base64.b64encode(self._image).decode("ascii")}
+        else:
+            item = {"url": f"{self.url}/image.png"}
+        return web.json_response({"created": int(time.time()), "data": [item]}, headers=headers)
+
+    async def image(self, request: web.Request) -> web.Response:
+        self.calls["image.download"] += 1
+        return web.Response(body=self._image, content_type="image/png")
+
+    # --- boshqaruv ---
+
+    def _serve(self):
+        self._loop = asyncio.new_event_loop()
+        app = web.Application(client_max_size=64 * 1024 * 1024)
+        app.router.add_post("/bot{token}/{method}", self.bot_api)
+        app.router.add_post("/v1/chat/completions", self.chat_completions)
+        app.router.add_post("/v1/images/generations", self.images_generations)
+        app.router.add_get("/image.png", self.image)
+
+        async def start():
+            self._runner = web.AppRunner(app, access_log=None)
+            await self._runner.setup()
+            site = web.TCPSite(self._runner, "127.0.0.1", 0)
+            await site.start()
+            port = site._server.sockets[0].getsockname()[1]
+            self.url = f"http://127.0.0.1:{port}"
+
+        self._loop.run_until_complete(start())
+        self._ready.set()
+        self._loop.run_forever()
+        self._loop.run_until_complete(self._runner.cleanup())
+        self._loop.close()
+
+    def start(self) -> str:
+        threading.Thread(target=self._serve, name="loadtest-fake-servers", daemon=True).start()
+        self._ready.wait(10)
+        return self.url
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+
+
+class DbTimer:
+    """aiosqlite amallarini (baza oqimi ichida) o'lchash.
+
+    SQLite lock kutishi (busy timeout) yozish va commit ichida o'tadi, shuning uchun
+    `lock_ms` dan uzoq davom etgan yozish/commit amallari lock kutish deb hisoblanadi.
+    """
+
+    WRITE_SQL = ("INSERT", "UPDATE", "DELETE", "REPLACE", "BEGIN")
+
+    def __init__(self, lock_ms: float):
+        self.lock_ms = lock_ms
+        self.timings = defaultdict(list)
+        self.locked_errors = 0
+
+    def _kind(self, fn, args) -> str:
+        name = getattr(fn, "__name__", "")
+        if name == "commit":
+            return "commit"
+        if name in ("execute", "executemany", "executescript") and args and isinstance(args[0], str):
+            return "write" if args[0].lstrip().upper().startswith(self.WRITE_SQL) else "read"
+        return "other"
+
+    def install(self):
+        import aiosqlite.core
+
+        original = aiosqlite.core.Connection._execute
+        timer = self
+
+        async def _execute(connection, fn, *args, **kwargs):
+            kind = timer._kind(fn, args)
+
+            def timed():
+                started = time.perf_counter()
+                try:
+                    return fn(*args, **kwargs)
+                except sqlite3.OperationalError as e:
+                    if "locked" in str(e):
+                        timer.locked_errors += 1
+                    raise
+                finally:
+                    timer.timings[kind].append((time.perf_counter() - started) * 1000)
+
+            return await original(connection, timed)
+
+        aiosqlite.core.Connection._execute = _execute
+
+    def lock_waits(self):
+        return [ms for kind in ("write", "commit") for ms in self.timings[kind] if ms >= self.lock_ms]
+
+
+class Journey:
+    """Bitta foydalanuvchining update'lari (har bir qadam oldingisi tugagach yuboriladi)"""
+
+    def __init__(self, user_id: int, tariff: str, pages: int):
+        self.user_id = user_id
+        self.user = {"id": user_id, "is_bot": False, "first_name": f"Load{user_id}", "username": f"load{user_id}"}
+        self.chat = {"id": user_id, "type": "private", "first_name": f"Load{user_id}"}
+        self.steps = [
+            ("start", self.message("/start")),
+            ("fullname", self.message(f"Yuklama Foydalanuvchi {user_id}")),
+            ("skip_contact", self.message("⏩ O'tkazib yuborish")),
+            ("order_menu", self.message("📊 Taqdimot tayyorlash")),
+            ("tariff", self.callback(f"tariff_{tariff}")),
+            ("topic", self.message(TOPIC)),
+            ("pages", self.message(str(pages))),
+            ("confirm_yes", self.callback("confirm_yes")),
+            ("confirm_final", self.callback("confirm_final")),
+            ("start_generation", self.callback("start_generation")),
+        ]
+
+    def message(self, text: str) -> dict:
+        update_id = next(update_ids)
+        return {
+            "update_id": update_id,
+            "message": {
+                "message_id": update_id, "date": int(time.time()),
+                "chat": self.chat, "from": self.user, "text": text
+            }
+        }
+
+    def callback(self, data: str) -> dict:
+        return {
+            "update_id": next(update_ids),
+            "callback_query": {
+                "id": str(next(callback_ids)),
+                "from": self.user,
+                "chat_instance": str(self.user_id),
+                "data": data,
+                "message": {
+                    "message_id": 1, "date": int(time.time()), "chat": self.chat,
+                    "from": {"id": 123456, "is_bot": True, "first_name": "LoadTest"},
+                    "text": "..."
+                }
+            }
+        }
+
+
+async def run(args, servers: FakeServers, db_timer: DbTimer):
+    from aiogram.client.telegram import TelegramAPIServer
+    from aiogram.types import Update
+
+    import handlers.ordering as ordering
+    from database_adapter import get_order_cost_report, init_db, update_user_balance
+    from handlers.common import TARIFFS
+    from loader import bot, dp, storage
+    from handlers import setup_routers
+    from loop_monitor import loop_monitor
+    from generation_queue import generation_queue, parse_tariff_map
+
+    setup_routers(dp)
+    bot.session.api = TelegramAPIServer.from_base(servers.url)
+    await init_db()
+    # Botdagi kabi (main.warm_up): generatsiya kutubxonalari va render worker'lari oldindan
+    from render_pool import render_pool
+    await asyncio.to_thread(importlib.import_module, "pptx_generator")
+    await render_pool.warm_up()
+    loop_monitor.start()
+
+    step_timings = defaultdict(list)
+    errors = defaultdict(int)
+    generation = {}
+    generation_tasks = set()
+    updates_fed = 0
+
+    # Generatsiya vazifasini o'rab, tugash vaqtini yozish (handler modul global nomidan chaqiradi)
+    original_task = ordering.generate_presentation_task
+
+    async def timed_generation(user_tg_id, *task_args, **task_kwargs):
+        generation_tasks.add(asyncio.current_task())
+        generation[user_tg_id]["launches"] = generation[user_tg_id].get("launches", 0) + 1
+        try:
+            await original_task(user_tg_id, *task_args, **task_kwargs)
+        finally:
+            generation[user_tg_id]["done"] = time.perf_counter()
+
+    ordering.generate_presentation_task = timed_generation
+
+    mix = parse_tariff_map(args.mix) if args.mix else {args.tariff: 1}
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def journey(user_id: int):
+        nonlocal updates_fed
+        async with semaphore:
+            # Tarif aralashmasidan foydalanuvchi uchun barqaror tanlov
+            tariff = random.Random(user_id).choices(list(mix), weights=list(mix.values()))[0]
+            for step, data in Journey(user_id, tariff, args.pages).steps:
+                if step == "order_menu" and tariff != "START":
+                    # Pullik tarif - foydalanuvchi hisobini oldindan to'ldirish (ro'yxatdan o'tgach)
+                    await update_user_balance(user_id, TARIFFS[tariff]["price_per_page"] * args.pages)
+                if step == "start_generation":
+                    generation[user_id] = {"started": time.perf_counter(), "tariff": tariff}
+                updates = [Update.model_validate(data, context={"bot": bot})]
+                if step == "start_generation" and args.double_tap:
+                    # Ikki marta bosish: bir xil xabardagi tugma, boshqa update/callback id
+                    duplicate = dict(data, update_id=next(update_ids))
+                    duplicate["callback_query"] = dict(data["callback_query"], id=str(next(callback_ids)))
+                    updates.append(Update.model_validate(duplicate, context={"bot": bot}))
+                started = time.perf_counter()
+                try:
+                    await asyncio.gather(*(dp.feed_update(bot, update) for update in updates))
+                except Exception as e:
+                    errors[f"{step}: {type(e).__name__}"] += 1
+                step_timings[step].append((time.perf_counter() - started) * 1000)
+                updates_fed += len(updates)
+                if args.think_ms:
+                    await asyncio.sleep(args.think_ms / 1000)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(journey(FIRST_USER_ID + i) for i in range(args.users)))
+    dialog_elapsed = time.perf_counter() - started
+
+    # Fon generatsiyalarini kutish (navbatda turganlari ham)
+    await generation_queue.drain(timeout=args.generation_timeout)
+    pending = [task for task in generation_tasks if not task.done()]
+    if pending:
+        await asyncio.wait(pending, timeout=args.generation_timeout)
+    total_elapsed = time.perf_counter() - started
+
+    lag = loop_monitor.snapshot()
+    from openai_scheduler import openai_scheduler
+    scheduler = openai_scheduler.snapshot()
+    from image_index import image_index
+    images = image_index.snapshot()
+    queue = generation_queue.snapshot()
+    costs = await get_order_cost_report(days=1)
+    await loop_monitor.stop()
+    ordering.generate_presentation_task = original_task
+    await storage.close()
+    await bot.session.close()
+
+    return {
+        "dialog_elapsed": dialog_elapsed,
+        "total_elapsed": total_elapsed,
+        "updates": updates_fed,
+        "steps": step_timings,
+        "errors": errors,
+        "generation": generation,
+        "loop_lag": lag,
+        "scheduler": scheduler,
+        "image_index": images,
+        "queue": queue,
+        "costs": costs,
+    }
+
+
+def report(args, result: dict, servers: FakeServers, db_timer: DbTimer):
+    updates = result["updates"]
+    print(f"\n{args.users} foydalanuvchi, parallel {args.concurrency}, tarif {args.mix or args.tariff}, {args.pages} sahifa")
+    print(f"  dialog: {updates} update, {result['dialog_elapsed']:.2f} s, "
+          f"{updates / result['dialog_elapsed']:,.1f} update/s")
+
+    print("\nHandlerlar (feed_update, ms):")
+    for step, values in result["steps"].items():
+        print(f"  {step:<17} n={len(values):<5} p50={percentile(values, 0.5):8.1f}  "
+              f"p95={percentile(values, 0.95):8.1f}  p99={percentile(values, 0.99):8.1f}  max={max(values):8.1f}")
+    if result["errors"]:
+        print(f"  xatoliklar: {dict(result['errors'])}")
+
+    print("\nBaza amallari (ms, oqim ichida):")
+    for kind in ("read", "write", "commit", "other"):
+        values = db_timer.timings.get(kind)
+        if values:
+            print(f"  {kind:<7} n={len(values):<6} p50={percentile(values, 0.5):7.2f}  "
+                  f"p95={percentile(values, 0.95):7.2f}  p99={percentile(values, 0.99):7.2f}  max={max(values):8.1f}")
+    waits = db_timer.lock_waits()
+    print(f"  lock kutishlari (yozish/commit >= {args.lock_ms:g} ms): {len(waits)} ta, "
+          f"jami {sum(waits):.0f} ms; 'database is locked': {db_timer.locked_errors}")
+
+    generation = result["generation"]
+    durations, delivered = [], 0
+    for user_id, entry in generation.items():
+        if "done" in entry:
+            durations.append((entry["done"] - entry["started"]) * 1000)
+        if user_id in servers.documents_at:
+            delivered += 1
+    launches = sum(entry.get("launches", 0) for entry in generation.values())
+    print(f"\nGeneratsiya: {len(generation)} buyurtma, {launches} ishga tushdi, {len(durations)} tugadi, "
+          f"{delivered} fayl yuborildi")
+    if durations:
+        print(f"  tugash vaqti: p50={percentile(durations, 0.5) / 1000:.2f} s  "
+              f"p95={percentile(durations, 0.95) / 1000:.2f} s  max={max(durations) / 1000:.2f} s  "
+              f"(jami {result['total_elapsed']:.1f} s)")
+    by_tariff = defaultdict(list)
+    for entry in generation.values():
+        if "done" in entry:
+            by_tariff[entry["tariff"]].append(entry["done"] - entry["started"])
+    if len(by_tariff) > 1:
+        for tariff, values in sorted(by_tariff.items()):
+            print(f"  {tariff:<8} n={len(values):<4} p50={percentile(values, 0.5):.2f} s  "
+                  f"p95={percentile(values, 0.95):.2f} s")
+    queue = result["queue"]
+    print(f"  navbat (parallel {queue['concurrency']}):")
+    for tariff, stats in queue["tariffs"].items():
+        slo = f"  SLO {stats['slo_s']:g} s: {'OK' if stats['slo_ok'] else 'BUZILDI'}" if stats["slo_s"] else ""
+        print(f"    {tariff:<8} kutish p50={stats['wait_p50_s']:.2f} s  p95={stats['wait_p95_s']:.2f} s  "
+              f"max={stats['wait_max_s']:.2f} s{slo}")
+    print("  bosqichlar (order_costs, o'rtacha s):")
+    for row in result["costs"]["by_tariff"]:
+        print(f"    {row['tariff']:<8} matn={row['avg_text_ms'] / 1000:.2f}  rasm={row['avg_images_ms'] / 1000:.2f}  "
+              f"render={row['avg_render_ms'] / 1000:.2f}  yuborish={row['avg_send_ms'] / 1000:.2f}  "
+              f"tokenlar={row['avg_prompt_tokens']:.0f}/{row['avg_completion_tokens']:.0f}  ${row['avg_cost_usd']:.3f}")
+
+    lag = result["loop_lag"]
+    print(f"\nEvent loop kechikishi: p50={lag['p50_ms']} ms  p99={lag['p99_ms']} ms  "
+          f"max={lag['max_ms']} ms  to'xtashlar={lag['stalls']}")
+    for model, stats in result["scheduler"].items():
+        print(f"OpenAI {model}: {stats}")
+    print(f"Rasm indeksi: {result['image_index']}")
+    print(f"Soxta API chaqiruvlari: {dict(sorted(servers.calls.items()))}")
+
+
+def prepare_environment(args) -> str:
+    """Bot modullari import qilinishidan oldin: soxta token, baza nusxasi, stub manzillari"""
+    workdir = tempfile.mkdtemp(prefix="loadtest_")
+    database = os.path.join(workdir, "DataBase.db")
+    if os.path.exists(args.database):
+        shutil.copy(args.database, database)
+    os.environ["DATABASE_PATH"] = database
+    os.environ["BOT_TOKEN"] = TOKEN
+    os.environ["OPENAI_API_KEY"] = "sk-loadtest"
+    os.environ["FSM_STORAGE"] = args.fsm
+    # Har bir yugurish bo'sh rasm indeksi bilan (qayta ishlatish ulushi shu yugurishniki)
+    os.environ["IMAGE_INDEX_DIR"] = os.path.join(workdir, "image_index")
+    os.environ.setdefault("HANDLER_PROFILE_RATE", "0")
+    # Scheduler boshlang'ich limitlari; stub --*-rpm bilan cheklasa, sarlavhalardan o'rganiladi
+    os.environ["OPENAI_LIMITS"] = args.openai_limits
+    if args.cassette:
+        # Stub o'rniga yozib olingan haqiqiy javoblar (va ularning kechikishi)
+        os.environ["OPENAI_MODE"] = "replay"
+        os.environ["OPENAI_CASSETTE"] = args.cassette
+        os.environ["OPENAI_REPLAY_LATENCY"] = str(args.replay_latency)
+    return workdir
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Oflayn end-to-end yuklama testi")
+    parser.add_argument("--users", type=int, default=50)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--tariff", default="START", choices=("START", "STANDARD", "SMART"))
+    parser.add_argument("--mix", help="tarif aralashmasi, masalan START=70,STANDARD=20,SMART=10 (--tariff o'rniga)")
+    parser.add_argument("--pages", type=int, default=10)
+    parser.add_argument("--think-ms", type=float, default=0, help="qadamlar orasidagi pauza")
+    parser.add_argument("--openai-ms", type=float, default=1500, help="chat completion kechikishi")
+    parser.add_argument("--image-ms", type=float, default=1000, help="DALL-E kechikishi")
+    parser.add_argument("--openai-rpm", type=int, default=0, help="stub'dagi gpt-4.1 RPM limiti (0 - cheksiz)")
+    parser.add_argument("--image-rpm", type=int, default=0, help="stub'dagi dall-e-3 IPM limiti (0 - cheksiz)")
+    parser.add_argument("--openai-limits", default="gpt-4.1=100000/100000000,dall-e-3=100000",
+                        help="OPENAI_LIMITS (standart - amalda cheksiz, stub limitini sarlavhalardan o'rganadi)")
+    parser.add_argument("--bot-api-ms", type=float, default=20, help="Bot API kechikishi")
+    parser.add_argument("--lock-ms", type=float, default=50, help="lock kutish deb hisoblanadigan chegara")
+    parser.add_argument("--generation-timeout", type=float, default=300)
+    parser.add_argument("--database", default="DataBase.db", help="nusxasi olinadigan baza")
+    parser.add_argument("--fsm", default=os.getenv("FSM_STORAGE", "sqlite"), choices=("sqlite", "memory"))
+    parser.add_argument("--double-tap", action="store_true", help="start_generation tugmasini ikki marta bosish")
+    parser.add_argument("--cassette", help="OpenAI kassetasi (OPENAI_MODE=record bilan yozilgan) - replay rejimi")
+    parser.add_argument("--replay-latency", type=float, default=1.0, help="yozilgan kechikishning qancha qismi kutiladi")
+    parser.add_argument("--verbose", action="store_true", help="bot loglari va print'larini ko'rsatish")
+    args = parser.parse_args()
+
+    workdir = prepare_environment(args)
+    rpm = {"gpt-4.1": args.openai_rpm, "dall-e-3": args.image_rpm}
+    servers = FakeServers(args.openai_ms, args.image_ms, args.bot_api_ms, {k: v for k, v in rpm.items() if v})
+    os.environ["OPENAI_BASE_URL"] = f"{servers.start()}/v1"
+    db_timer = DbTimer(args.lock_ms)
+    db_timer.install()
+
+    import logging
+
+    with contextlib.ExitStack() as stack:
+        if not args.verbose:
+            # Bot print'lari (masalan, butun GPT javobi) hisobotni ko'mib yubormasligi uchun
+            stack.enter_context(contextlib.redirect_stdout(open(os.devnull, "w")))
+            logging.disable(logging.WARNING)
+        result = asyncio.run(run(args, servers, db_timer))
+
+    logging.disable(logging.NOTSET)
+    servers.stop()
+    report(args, result, servers, db_timer)
+    shutil.rmtree(workdir, ignore_errors=True)
+    if result["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""Webhook rejimini sintetik update'lar bilan sinash.
+
+Ishlayotgan serverga update yuborish (BOT_MODE=webhook bilan ishga tushirilgan main.py):
+    python -m tools.webhook_load --url http://127.0.0.1:8000/webhook --secret <WEBHOOK_SECRET> --count 2000
+
+Server kerak bo'lmagan lokal rejim: soxta handler (--handler-ms) bilan UpdateQueue ni
+turli workerlar soni bilan solishtiradi (1 worker = polling'dagi ketma-ket ishlashga yaqin):
+    python -m tools.webhook_load --local --count 2000 --handler-ms 20 --workers 1 8 32
+"""
+import argparse
+import asyncio
+import itertools
+import statistics
+import time
+
+import aiohttp
+from aiogram import Bot, Dispatcher
+from aiogram.types import Message
+
+from webhook import SECRET_HEADER, UpdateQueue
+
+update_ids = itertools.count(1)
+
+
+def make_update(user_id: int, text: str = "/start") -> dict:
+    update_id = next(update_ids)
+    return {
+        "update_id": update_id,
+        "message": {
+            "message_id": update_id,
+            "date": int(time.time()),
+            "chat": {"id": user_id, "type": "private", "first_name": f"User{user_id}"},
+            "from": {"id": user_id, "is_bot": False, "first_name": f"User{user_id}"},
+            "text": text
+        }
+    }
+
+
+def percentile(values, q):
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))] if values else 0.0
+
+
+async def run_remote(url: str, secret: str, count: int, users: int, concurrency: int):
+    statuses = {}
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with aiohttp.ClientSession(headers={SECRET_HEADER: secret}) as session:
+        async def post(i):
+            async with semaphore:
+                started = time.perf_counter()
+                try:
+                    async with session.post(url, json=make_update(100000 + i % users)) as response:
+                        await response.read()
+                        status = response.status
+                except aiohttp.ClientError as e:
+                    status = type(e).__name__
+                latencies.append((time.perf_counter() - started) * 1000)
+                statuses[status] = statuses.get(status, 0) + 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(post(i) for i in range(count)))
+        elapsed = time.perf_counter() - started
+
+        metrics_url = url.rsplit("/", 1)[0] + "/metrics"
+        try:
+            async with session.get(metrics_url) as response:
+                metrics = await response.json()
+        except Exception:
+            metrics = None
+
+    print(f"{count} ta update, {elapsed:.2f} s, {count / elapsed:,.0f} update/s")
+    print(f"  javob kodlari: {statuses}")
+    print(f"  ack p50={statistics.median(latencies):.1f} ms  p99={percentile(latencies, 0.99):.1f} ms")
+    if metrics:
+        print(f"  /metrics: {metrics}")
+
+
+async def run_local(count: int, users: int, handler_ms: float, workers: int, queue_size: int):
+    dp = Dispatcher()
+    bot = Bot(token="1:local")
+    seen = {}
+
+    @dp.message()
+    async def handler(message: Message):
+        # Bir chat ichidagi tartib saqlanishini tekshirish
+        last = seen.get(message.chat.id, 0)
+        if message.message_id < last:
+            raise RuntimeError("tartib buzildi")
+        seen[message.chat.id] = message.message_id
+        await asyncio.sleep(handler_ms / 1000)
+
+    queue = UpdateQueue(dp, bot, workers=workers, maxsize=queue_size)
+    queue.start()
+    started = time.perf_counter()
+    for i in range(count):
+        # Navbat to'lsa Telegram kabi biroz kutib qayta yuboramiz
+        while not queue.submit(make_update(100000 + i % users)):
+            await asyncio.sleep(0.005)
+    await queue.stop(timeout=600)
+    elapsed = time.perf_counter() - started
+    await bot.session.close()
+
+    metrics = queue.metrics()
+    print(f"workers={workers:<3} {elapsed:6.2f} s  {count / elapsed:8,.0f} update/s  "
+          f"rad etilgan={metrics['rejected']:<6} xato={metrics['failed']}  "
+          f"max_depth={metrics['max_depth']}  avg_wait={metrics['avg_wait_ms']} ms")
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Webhook uchun sintetik update'lar")
+    parser.add_argument("--url", default="http://127.0.0.1:8000/webhook")
+    parser.add_argument("--secret", default="")
+    parser.add_argument("--count", type=int, default=1000)
+    parser.add_argument("--users", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--local", action="store_true", help="Serversiz, soxta handler bilan")
+    parser.add_argument("--handler-ms", type=float, default=20.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--queue-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    if args.local:
+        for workers in args.workers:
+            await run_local(args.count, args.users, args.handler_ms, workers, args.queue_size)
+    else:
+        await run_remote(args.url, args.secret, args.count, args.users, args.concurrency)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
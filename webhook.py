@@ -0,0 +1,161 @@
+import asyncio
+import hashlib
+import logging
+import os
+import time
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
+
+if TYPE_CHECKING:
+    from aiogram import Bot, Dispatcher
+
+# aiogram bu yerda import qilinmaydi: main.py /health ni bot yuklanishidan oldin ochadi
+
+logger = logging.getLogger(__name__)
+
+# Sozlamalar
+BOT_MODE = os.getenv("BOT_MODE", "polling").lower()
+WEBHOOK_BASE_URL = os.getenv("WEBHOOK_BASE_URL") or (
+    f"https://{os.getenv('RAILWAY_STATIC_URL')}" if os.getenv("RAILWAY_STATIC_URL") else ""
+)
+WEBHOOK_PATH = os.getenv("WEBHOOK_PATH", "/webhook")
+WEBHOOK_SECRET = os.getenv("WEBHOOK_SECRET", "")
+WEBHOOK_WORKERS = int(os.getenv("WEBHOOK_WORKERS", "8"))
+WEBHOOK_QUEUE_SIZE = int(os.getenv("WEBHOOK_QUEUE_SIZE", "1000"))
+WEBHOOK_MAX_CONNECTIONS = int(os.getenv("WEBHOOK_MAX_CONNECTIONS", "40"))
+SECRET_HEADER = "X-Telegram-Bot-Api-Secret-Token"
+
+
+def webhook_secret(bot_token: str) -> str:
+    """Webhook maxfiy tokeni. Berilmagan bo'lsa bot tokenidan barqaror qilib hosil qilinadi"""
+    if WEBHOOK_SECRET:
+        return WEBHOOK_SECRET
+    return hashlib.sha256(f"webhook:{bot_token}".encode("utf-8")).hexdigest()[:48]
+
+
+def update_partition_key(data: Dict[str, Any]) -> int:
+    """Update qaysi chat/foydalanuvchiga tegishli - bir chat update'lari tartib bilan ishlanadi"""
+    for field, value in data.items():
+        if not isinstance(value, dict):
+            continue
+        chat = value.get("chat") or (value.get("message") or {}).get("chat")
+        if isinstance(chat, dict) and "id" in chat:
+            return int(chat["id"])
+        user = value.get("from") or value.get("user")
+        if isinstance(user, dict) and "id" in user:
+            return int(user["id"])
+    return int(data.get("update_id", 0))
+
+
+class UpdateQueue:
+    """Webhook update'larini chegaralangan navbatga olib, N ta worker orqali dispatcher'ga uzatadi.
+
+    Har bir worker o'z navbatiga ega, update chat id bo'yicha taqsimlanadi: bitta chat
+    xabarlari ketma-ket, turli chatlar esa parallel ishlanadi. Navbat to'lsa update qabul
+    qilinmaydi (503) va Telegram uni keyinroq qayta yuboradi.
+    """
+
+    def __init__(self, dp: "Dispatcher", bot: "Bot", workers: int = WEBHOOK_WORKERS,
+                 maxsize: int = WEBHOOK_QUEUE_SIZE):
+        self.dp = dp
+        self.bot = bot
+        self.workers = max(1, workers)
+        self.maxsize = max(self.workers, maxsize)
+        self._queues: List[asyncio.Queue] = []
+        self._tasks: List[asyncio.Task] = []
+        self.received = 0
+        self.processed = 0
+        self.failed = 0
+        self.rejected = 0
+        self.max_depth = 0
+        self._handle_time = 0.0
+        self._wait_time = 0.0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._tasks)
+
+    def depth(self) -> int:
+        return sum(q.qsize() for q in self._queues)
+
+    def submit(self, data: Dict[str, Any]) -> bool:
+        """Update'ni navbatga qo'yish. Navbat to'la bo'lsa False"""
+        if not self._queues:
+            return False
+        queue = self._queues[update_partition_key(data) % self.workers]
+        try:
+            queue.put_nowait((time.monotonic(), data))
+        except asyncio.QueueFull:
+            self.rejected += 1
+            return False
+        self.received += 1
+        self.max_depth = max(self.max_depth, self.depth())
+        return True
+
+    async def _worker(self, queue: asyncio.Queue):
+        from aiogram.types import Update
+
+        while True:
+            queued_at, data = await queue.get()
+            started = time.monotonic()
+            self._wait_time += started - queued_at
+            try:
+                update = Update.model_validate(data, context={"bot": self.bot})
+                await self.dp.feed_update(self.bot, update)
+                self.processed += 1
+            except Exception as e:
+                self.failed += 1
+                logger.error(f"Update #{data.get('update_id')} ni ishlashda xatolik: {e}")
+            finally:
+                self._handle_time += time.monotonic() - started
+                queue.task_done()
+
+    def start(self):
+        if self._tasks:
+            return
+        per_worker = max(1, self.maxsize // self.workers)
+        self._queues = [asyncio.Queue(maxsize=per_worker) for _ in range(self.workers)]
+        self._tasks = [asyncio.create_task(self._worker(q)) for q in self._queues]
+
+    async def stop(self, timeout: float = 10.0):
+        """Navbatdagi update'larni tugatishga vaqt berib, workerlarni to'xtatish"""
+        if not self._tasks:
+            return
+        try:
+            await asyncio.wait_for(asyncio.gather(*(q.join() for q in self._queues)), timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Webhook navbatida {self.depth()} ta update ishlanmay qoldi")
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+
+    def metrics(self) -> Dict[str, Any]:
+        done = self.processed + self.failed
+        return {
+            "workers": self.workers,
+            "queue_depth": self.depth(),
+            "queue_capacity": self.maxsize,
+            "max_depth": self.max_depth,
+            "received": self.received,
+            "processed": self.processed,
+            "failed": self.failed,
+            "rejected": self.rejected,
+            "avg_wait_ms": round(self._wait_time / done * 1000, 2) if done else 0.0,
+            "avg_handle_ms": round(self._handle_time / done * 1000, 2) if done else 0.0,
+        }
+
+
+async def setup_webhook(bot: "Bot", dp: "Dispatcher", secret: str) -> Optional[str]:
+    """Webhook'ni Telegram'da o'rnatish. Kutilayotgan update'lar saqlanib qoladi"""
+    if not WEBHOOK_BASE_URL:
+        logger.error("WEBHOOK_BASE_URL (yoki RAILWAY_STATIC_URL) topilmadi - webhook o'rnatilmadi")
+        return None
+    url = f"{WEBHOOK_BASE_URL.rstrip('/')}{WEBHOOK_PATH}"
+    await bot.set_webhook(
+        url,
+        secret_token=secret,
+        allowed_updates=dp.resolve_used_update_types(),
+        max_connections=WEBHOOK_MAX_CONNECTIONS,
+        drop_pending_updates=False
+    )
+    return url